@@ -1,8 +1,14 @@
-from matrix_input import input_matrix
+import sys
+from matrix_input import input_matrix, load_matrix
 
 def main():
-    print("=== Тест ручного ввода матрицы ===")
-    matrix = input_matrix()
+    if len(sys.argv) > 1:
+        # Пакетная загрузка матрицы из файла: python main.py matrix.txt
+        with open(sys.argv[1], encoding="utf-8") as stream:
+            matrix = load_matrix(stream)
+    else:
+        print("=== Тест ручного ввода матрицы ===")
+        matrix = input_matrix()
     print("\nВведённая матрица:")
     for row in matrix:
         print(row)
@@ -1,12 +1,21 @@
+import itertools
+import sys
+
+
 def input_matrix():
     """
     Ввод матрицы пользователем вручную.
     Пользователь вводит размеры N и M, затем элементы построчно.
+    Если stdin не терминал (конвейер или файл), строки после размеров
+    загружаются одним блоком через load_matrix.
     Возвращает матрицу (список списков).
     """
     n = int(input("Введите количество строк (N): "))
     m = int(input("Введите количество столбцов (M): "))
 
+    if not sys.stdin.isatty():
+        return load_matrix(sys.stdin, n, m)
+
     matrix = []
     print("Введите элементы матрицы построчно:")
     for i in range(n):
@@ -16,3 +25,46 @@ def input_matrix():
             row = list(map(int, input(f"Строка {i + 1}: ").split()))
         matrix.append(row)
     return matrix
+
+
+def parse_matrix(lines, n=None, m=None):
+    """
+    Разбор строк текста в матрицу за один проход.
+    Пустые строки пропускаются, ошибки собираются с номерами строк.
+    Возвращает матрицу (список списков).
+    """
+    matrix = []
+    errors = []
+    row_count = 0
+    for line_number, line in enumerate(lines, 1):
+        values = line.split()
+        if not values:
+            continue
+        row_count += 1
+        if m is None:
+            m = len(values)
+        if len(values) != m:
+            errors.append(f"строка {line_number}: должно быть {m} элементов, получено {len(values)}")
+            continue
+        try:
+            matrix.append(list(map(int, values)))
+        except ValueError:
+            errors.append(f"строка {line_number}: ожидались целые числа")
+
+    if n is not None and row_count != n:
+        errors.append(f"должно быть {n} строк, получено {row_count}")
+    if errors:
+        raise ValueError("Ошибка ввода матрицы: " + "; ".join(errors))
+    return matrix
+
+
+def load_matrix(stream, n=None, m=None):
+    """
+    Пакетная загрузка матрицы из потока (stdin или файла).
+    Без n весь блок читается одним вызовом, без запросов input() по строкам;
+    с n читается ровно n непустых строк, остаток потока не затрагивается.
+    Возвращает матрицу (список списков).
+    """
+    if n is None:
+        return parse_matrix(stream.read().splitlines(), n, m)
+    return parse_matrix(itertools.islice((line for line in stream if line.strip()), n), n, m)
@@ -0,0 +1,210 @@
+"""
+Модуль асинхронного клиента сервера матричных операций.
+
+Клиент подключается к AsyncMatrixServer по TCP или через Unix-сокет и
+обменивается с ним двоичными кадрами протокола (модуль protocol). Все
+клиенты работают в одном цикле событий, поэтому тысячи сессий не требуют
+тысяч потоков ОС.
+
+При запуске как скрипт модуль демонстрирует работу: поднимает сервер
+в том же процессе, открывает заданное число простаивающих сессий и
+параллельно выполняет несколько поворотов от активных клиентов.
+
+Используемые модули:
+    asyncio - цикл событий и сокеты
+    protocol - двоичный формат кадров
+    async_server - асинхронный сервер матричных операций
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+from array import array
+from matrix import Matrix, fit_typecode
+from protocol import OP_ERROR, encode_request
+from async_server import AsyncMatrixServer, FrameConnection, DEFAULT_HOST, DEFAULT_PORT
+
+
+# Дескрипторы, оставляемые под слушающий сокет, пул исполнителей и стандартные потоки
+FD_RESERVE = 256
+
+
+class AsyncMatrixClient:
+    """
+    Асинхронный клиент матричных операций.
+
+    Несколько запросов одного клиента могут выполняться параллельно в одном
+    соединении: каждому присваивается request_id, по которому сервер
+    сопоставляет ответ.
+
+    Attributes:
+        client_name (str): Имя клиента для идентификации в логах сервера
+        host (str): Адрес сервера
+        port (int): TCP-порт сервера
+        path (str): Путь к Unix-сокету сервера; если задан, TCP не используется
+    """
+
+    def __init__(self, client_name, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+        self.client_name = client_name
+        self.host = host
+        self.port = port
+        self.path = path
+        self._connection = None
+        self._pending = {}
+        self._ids = itertools.count(1)
+
+    async def connect(self):
+        """Открывает соединение с сервером."""
+        loop = asyncio.get_running_loop()
+
+        def factory():
+            return FrameConnection(self._on_frame, self._on_lost)
+
+        if self.path:
+            _, self._connection = await loop.create_unix_connection(factory, self.path)
+        else:
+            _, self._connection = await loop.create_connection(factory, self.host, self.port)
+        return self
+
+    async def close(self):
+        """Закрывает соединение с сервером."""
+        if self._connection is not None:
+            self._connection.close()
+            await self._connection.wait_closed()
+            self._connection = None
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def _on_frame(self, connection, frame):
+        """Передает ответ ожидающему его запросу."""
+        future = self._pending.pop(frame.request_id, None)
+        if future is None or future.done():
+            return
+        if frame.op == OP_ERROR:
+            future.set_result({'error': frame.error})
+        else:
+            future.set_result({'result': frame.matrix})
+
+    def _on_lost(self, connection, exc):
+        """Завершает ошибкой все запросы, оставшиеся без ответа."""
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Сервер закрыл соединение"))
+
+    async def rotate(self, matrix, direction):
+        """
+        Запрашивает у сервера поворот матрицы.
+
+        Args:
+            matrix: Матрица (Matrix или список списков)
+            direction (str): Направление поворота ('clockwise' или 'counterclockwise')
+
+        Returns:
+            dict: {'result': Matrix} или {'error': str}
+
+        Raises:
+            ConnectionError: Если соединение с сервером закрыто
+        """
+        if self._connection is None or self._connection.is_closing:
+            raise ConnectionError("Нет соединения с сервером")
+
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._connection.send(encode_request(matrix, direction, request_id, self.client_name))
+        await self._connection.drain()
+        return await future
+
+
+async def run_active_client(client_name, server_address, rows, cols, direction):
+    """
+    Генерирует матрицу, отправляет ее на поворот и выводит результат.
+    """
+    dtype = fit_typecode(1, rows * cols)
+    matrix = Matrix(rows, cols, dtype, array(dtype, range(1, rows * cols + 1)))
+    async with AsyncMatrixClient(client_name, *server_address) as client:
+        print(f"{time.strftime('%H:%M:%S')} {client_name}: отправлен запрос на поворот матрицы")
+        response = await client.rotate(matrix, direction)
+
+    if 'error' in response:
+        print(f"{time.strftime('%H:%M:%S')} {client_name}: ошибка сервера - {response['error']}")
+        return
+    print(f"{time.strftime('%H:%M:%S')} {client_name}: получен результат поворота")
+    for row in response['result']:
+        print(row)
+
+
+async def demonstrate(idle_sessions, path=None):
+    """
+    Демонстрирует работу тысяч сессий в одном процессе.
+
+    Args:
+        idle_sessions (int): Количество простаивающих сессий
+        path (str): Путь к Unix-сокету вместо TCP
+    """
+    server = AsyncMatrixServer(port=0, path=path)
+    await server.start()
+    server_address = (None, None, path) if path else (*server.address, None)
+
+    idle = []
+    try:
+        # Подключение простаивающих клиентов пачками, чтобы не переполнить очередь приема
+        for start in range(0, idle_sessions, 1000):
+            batch = [AsyncMatrixClient(f"Простой{i}", *server_address)
+                     for i in range(start, min(start + 1000, idle_sessions))]
+            idle.extend(await asyncio.gather(*(client.connect() for client in batch)))
+        await asyncio.sleep(0)
+        print(f"Открыто сессий на сервере: {server.sessions}")
+
+        await asyncio.gather(
+            run_active_client("Клиент1", server_address, 2, 2, 'clockwise'),
+            run_active_client("Клиент2", server_address, 3, 3, 'counterclockwise'),
+            run_active_client("Клиент3", server_address, 4, 2, 'clockwise'),
+        )
+    finally:
+        await asyncio.gather(*(client.close() for client in idle))
+        print(f"\nСервер обработал {server.requests_processed} запросов")
+        await server.close()
+
+
+def raise_open_files_limit():
+    """
+    Поднимает мягкий лимит открытых файлов до жесткого (только Unix).
+
+    Returns:
+        int: Действующий лимит или None, если он неизвестен
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return None if hard == resource.RLIM_INFINITY else hard
+
+
+def main():
+    """Точка входа демонстрации асинхронного клиента."""
+    parser = argparse.ArgumentParser(description="Демонстрация асинхронного сервера матриц")
+    parser.add_argument('--sessions', type=int, default=1000, help="количество простаивающих сессий")
+    parser.add_argument('--unix', help="путь к Unix-сокету вместо TCP")
+    args = parser.parse_args()
+
+    # Каждая сессия демонстрации занимает два дескриптора: у клиента и у сервера
+    limit = raise_open_files_limit()
+    sessions = args.sessions
+    if limit is not None and sessions * 2 + FD_RESERVE > limit:
+        sessions = max(0, (limit - FD_RESERVE) // 2)
+        print(f"Лимит открытых файлов {limit}: число сессий уменьшено до {sessions}")
+    asyncio.run(demonstrate(sessions, args.unix))
+
+
+if __name__ == "__main__":
+    main()
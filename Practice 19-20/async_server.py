@@ -0,0 +1,342 @@
+"""
+Модуль асинхронного сервера матричных операций.
+
+Сервер слушает локальный TCP-порт или Unix-сокет через loop.create_server
+и обслуживает каждое соединение объектом протокола в цикле событий, а не
+потоком ОС. Поэтому простаивающий клиент стоит серверу лишь одного сокета и
+нескольких килобайт памяти, и в одном процессе можно держать десятки тысяч сессий.
+
+Запросы и ответы передаются двоичными кадрами (модуль protocol).
+Соединение обслуживает asyncio.BufferedProtocol: цикл событий читает
+данные через recv_into прямо в буферы FrameDecoder, а матрица ответа
+отправляется без копирования. Запросы одного соединения обрабатываются
+параллельно и сопоставляются с ответами по request_id.
+
+Поворот матрицы - CPU-bound работа, поэтому он выполняется вне цикла
+событий в пуле потоков или процессов через loop.run_in_executor.
+
+Используемые модули:
+    asyncio - цикл событий и сокеты
+    protocol - двоичный формат кадров
+    matrix_operations - ядра поворота матриц
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from matrix_operations import execute_operation, resolve_backend
+from protocol import FrameDecoder, ProtocolError, MAX_PAYLOAD, OP_ROTATE, encode_error, encode_result
+from server import default_workers
+from server_logging import setup_logging
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Очередь входящих соединений для одновременного подключения тысяч клиентов
+BACKLOG = 4096
+
+# Наибольшее количество кадров одного соединения, обрабатываемых одновременно
+MAX_INFLIGHT_FRAMES = 64
+
+
+class FrameConnection(asyncio.BufferedProtocol):
+    """
+    Соединение, обменивающееся кадрами протокола.
+
+    Цикл событий вызывает get_buffer() и читает данные сокета прямо в
+    выданный участок буфера декодера; каждый полученный кадр передается
+    в on_frame. Запись учитывает обратное давление транспорта: drain()
+    ждет, пока буфер отправки не опустеет до нижней границы. Чтение тоже
+    ограничено: когда обрабатывается max_inflight кадров, чтение из сокета
+    приостанавливается до завершения одного из них.
+
+    Attributes:
+        max_inflight (int): Предел одновременно обрабатываемых кадров
+        inflight (int): Количество кадров в обработке
+    """
+
+    def __init__(self, on_frame, on_lost=None, max_inflight=MAX_INFLIGHT_FRAMES, max_payload=MAX_PAYLOAD):
+        """
+        Args:
+            on_frame: Функция, вызываемая с (соединение, кадр)
+            on_lost: Функция, вызываемая с (соединение, исключение) при закрытии
+            max_inflight (int): Предел одновременно обрабатываемых кадров
+            max_payload (int): Предельный размер полезной нагрузки кадра в байтах
+        """
+        self.on_frame = on_frame
+        self.on_lost = on_lost
+        self.max_inflight = max_inflight
+        self.inflight = 0
+        self.decoder = FrameDecoder(max_payload)
+        self.transport = None
+        self._writable = asyncio.Event()
+        self._writable.set()
+        self._closed = asyncio.get_running_loop().create_future()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def get_buffer(self, sizehint):
+        return self.decoder.buffer()
+
+    def buffer_updated(self, nbytes):
+        try:
+            frame = self.decoder.advance(nbytes)
+        except ProtocolError as e:
+            # После ошибки в заголовке границы кадров потеряны: соединение закрывается
+            self.send(encode_error(str(e)))
+            self.transport.close()
+            return
+        except Exception as e:
+            logger.exception("Ошибка разбора кадра")
+            self.send(encode_error(f"Некорректный кадр: {e}"))
+            self.transport.close()
+            return
+        if frame is not None:
+            self.on_frame(self, frame)
+
+    def eof_received(self):
+        return False
+
+    def connection_lost(self, exc):
+        self._writable.set()
+        if not self._closed.done():
+            self._closed.set_result(None)
+        if self.on_lost is not None:
+            self.on_lost(self, exc)
+
+    def pause_writing(self):
+        self._writable.clear()
+
+    def resume_writing(self):
+        self._writable.set()
+
+    @property
+    def is_closing(self):
+        """True, если соединение закрыто или закрывается."""
+        return self.transport is None or self.transport.is_closing()
+
+    def frame_started(self):
+        """Учитывает кадр, принятый в обработку; на пределе приостанавливает чтение."""
+        self.inflight += 1
+        if self.inflight == self.max_inflight:
+            self.transport.pause_reading()
+
+    def frame_finished(self):
+        """Учитывает обработанный кадр и возобновляет чтение, если оно было приостановлено."""
+        self.inflight -= 1
+        if self.inflight == self.max_inflight - 1:
+            self.transport.resume_reading()
+
+    def send(self, buffers):
+        """Ставит кадр в очередь отправки транспорта."""
+        if not self.is_closing:
+            self.transport.writelines(buffers)
+
+    async def drain(self):
+        """Ожидает освобождения буфера отправки."""
+        await self._writable.wait()
+
+    def close(self):
+        """Закрывает соединение."""
+        if self.transport is not None:
+            self.transport.close()
+
+    async def wait_closed(self):
+        """Ожидает закрытия соединения."""
+        await self._closed
+
+
+class AsyncMatrixServer:
+    """
+    Асинхронный сервер матричных операций.
+
+    Attributes:
+        host (str): Адрес для прослушивания TCP
+        port (int): TCP-порт (0 - выбрать свободный)
+        path (str): Путь к Unix-сокету; если задан, TCP не используется
+        backend (str): Бэкенд поворота матриц ('python' или 'numpy')
+        sessions (int): Количество открытых клиентских сессий
+        requests_processed (int): Счетчик успешно обработанных запросов
+        max_payload (int): Предельный размер полезной нагрузки кадра запроса
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None,
+                 backend='auto', executor='thread', max_workers=None, max_payload=MAX_PAYLOAD):
+        """
+        Инициализирует сервер и пул исполнителей.
+
+        Args:
+            host (str): Адрес для прослушивания TCP
+            port (int): TCP-порт
+            path (str): Путь к Unix-сокету вместо TCP
+            backend (str): Бэкенд поворота - 'auto', 'python' или 'numpy'
+            executor (str): Вид пула - 'thread' или 'process'
+            max_workers (int): Размер пула (по умолчанию - default_workers(executor))
+            max_payload (int): Предельный размер полезной нагрузки кадра в байтах;
+                кадры больше отклоняются до выделения памяти
+
+        Raises:
+            ValueError: Если вид пула неизвестен
+        """
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"Неизвестный вид пула исполнителей: {executor}")
+
+        self.host = host
+        self.port = port
+        self.path = path
+        self.backend = resolve_backend(backend)
+        self.sessions = 0
+        self.requests_processed = 0
+        self.max_payload = max_payload
+        pool = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+        self.executor = pool(max_workers=max_workers or default_workers(executor))
+        self._server = None
+        self._connections = set()
+        self._tasks = set()
+
+    @property
+    def address(self):
+        """Фактический адрес прослушивания: путь Unix-сокета или (host, port)."""
+        if self.path:
+            return self.path
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def start(self):
+        """Начинает прослушивание порта или Unix-сокета."""
+        loop = asyncio.get_running_loop()
+        if self.path:
+            self._server = await loop.create_unix_server(
+                self.make_connection, path=self.path, backlog=BACKLOG
+            )
+        else:
+            self._server = await loop.create_server(
+                self.make_connection, self.host, self.port, backlog=BACKLOG
+            )
+        logger.info("Асинхронный сервер запущен на %s (бэкенд: %s)", self.address, self.backend)
+        print(f"Сервер: слушает {self.address}")
+
+    async def serve_forever(self):
+        """Запускает сервер и обслуживает соединения до отмены."""
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """
+        Прекращает прием соединений, закрывает открытые сессии
+        и останавливает пул исполнителей.
+        """
+        if self._server is not None:
+            self._server.close()
+            for connection in list(self._connections):
+                connection.close()
+            await asyncio.gather(*(c.wait_closed() for c in list(self._connections)))
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=False)
+        logger.info("Асинхронный сервер остановлен")
+
+    def make_connection(self):
+        """Создает объект протокола для нового соединения."""
+        connection = FrameConnection(self.handle_frame, self.connection_lost, max_payload=self.max_payload)
+        self._connections.add(connection)
+        self.sessions += 1
+        return connection
+
+    def connection_lost(self, connection, exc):
+        """Учитывает закрытие клиентской сессии."""
+        if connection in self._connections:
+            self._connections.discard(connection)
+            self.sessions -= 1
+
+    def handle_frame(self, connection, frame):
+        """
+        Запускает обработку полученного кадра отдельной задачей.
+
+        Количество задач одного соединения ограничено его max_inflight:
+        на пределе соединение перестает читать новые кадры.
+
+        Args:
+            connection (FrameConnection): Соединение, из которого пришел кадр
+            frame (Frame): Кадр запроса
+        """
+        connection.frame_started()
+        task = asyncio.get_running_loop().create_task(self.respond(connection, frame))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        task.add_done_callback(lambda task: connection.frame_finished())
+
+    async def respond(self, connection, frame):
+        """Обрабатывает запрос и отправляет ответ с тем же request_id."""
+        response = await self.handle_request(frame)
+        if 'error' in response:
+            connection.send(encode_error(response['error'], frame.request_id))
+        else:
+            connection.send(encode_result(response['result'], frame.request_id))
+        await connection.drain()
+
+    async def handle_request(self, frame):
+        """
+        Проверяет запрос и выполняет операцию в пуле исполнителей.
+
+        Args:
+            frame (Frame): Кадр запроса
+
+        Returns:
+            dict: Результат операции (Matrix) или сообщение об ошибке
+        """
+        client_name = frame.client_name
+        matrix = frame.matrix
+        direction = frame.direction
+        logger.debug("Сервер %s: получен запрос %d (код операции %d)", client_name, frame.request_id, frame.op)
+
+        if frame.op != OP_ROTATE:
+            return self._reject(client_name, f'Неподдерживаемая операция: {frame.op}')
+        if not matrix:
+            return self._reject(client_name, "Матрица не предоставлена")
+        if direction not in ['clockwise', 'counterclockwise']:
+            return self._reject(client_name, f"Неверное направление поворота: {direction}")
+
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(
+                self.executor, execute_operation, 'rotate', matrix, direction, self.backend
+            )
+        except Exception as e:
+            error_msg = f"Ошибка выполнения операции: {e}"
+            logger.error("Сервер %s: %s", client_name, error_msg)
+            return {'error': error_msg}
+
+        # Счетчик меняется только в потоке цикла событий, блокировка не нужна
+        self.requests_processed += 1
+        logger.info("Сервер %s: запрос %d rows=%d cols=%d direction=%s status=ok",
+                    client_name, frame.request_id, matrix.rows, matrix.cols, direction)
+        return {'result': result}
+
+    @staticmethod
+    def _reject(client_name, error_msg):
+        """Логирует ошибку проверки запроса и возвращает ответ с ошибкой."""
+        logger.error("Сервер %s: %s", client_name, error_msg)
+        return {'error': error_msg}
+
+
+async def main(host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+    """Запускает асинхронный сервер до прерывания с клавиатуры."""
+    setup_logging("Practice 19-20/server.log")
+    server = AsyncMatrixServer(host, port, path)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\nСервер остановлен")
@@ -8,23 +8,38 @@
 Основные возможности:
     - Ручной ввод матриц с валидацией данных
     - Генерация случайных матриц заданного размера
-    - Отправка запросов на поворот матриц серверу
+    - Отправка запросов на поворот матриц серверу без ожидания ответа
+      (submit_rotate) с ограниченным количеством запросов в работе
     - Просмотр результатов выполненных операций
-    - Синхронизированный вывод в консоль для многопоточной работы
+    - Потоковый прием больших результатов блоками строк
+    - Вывод в консоль целыми блоками через общий поток вывода (console),
+      так что потоки клиентов не ждут терминал и не перемешивают вывод
 
 Используемые модули:
     threading - для работы с потоками и синхронизации
     time - для временных меток операций
+    console - общий для процесса поток вывода в консоль
     matrix_input - функции для ручного ввода матриц
     matrix_generate - функции для генерации случайных матриц
 """
 
+import itertools
 import threading
 import time
+from concurrent.futures import Future, InvalidStateError, wait
+from console import format_matrix, get_console
+from matrix import Matrix
 from matrix_input import input_matrix
 from matrix_generate import generate_matrix
 
 
+# Результат с таким количеством элементов принимается потоком блоков строк
+STREAM_MIN_CELLS = 64 * 1024
+
+# Количество запросов клиента, одновременно находящихся на сервере
+DEFAULT_IN_FLIGHT = 4
+
+
 class MatrixClient(threading.Thread):
     """
     Класс клиента для работы с матричными операциями в многопоточной среде.
@@ -35,27 +50,45 @@ class MatrixClient(threading.Thread):
     
     Attributes:
         client_name (str): Уникальное имя клиента для идентификации в логах
-        data (list): Текущая матрица клиента в виде списка списков
-        result (list): Результат последней выполненной операции
+        data (Matrix): Текущая матрица клиента
+        result (Matrix): Результат последней выполненной операции
+        result_streamed (bool): Последний результат выведен потоком блоков
+            и не сохранен
         server (MatrixServer): Ссылка на сервер для обработки запросов
-        lock (threading.Lock): Блокировка для синхронизации вывода в консоль
+        console (ConsoleRenderer): Общий для процесса поток вывода в консоль
+        lock (threading.RLock): Общая для всех клиентов блокировка диалогов с вводом
+        max_in_flight (int): Наибольшее количество запросов в работе
+        in_flight (dict): Future ответов по идентификатору запроса
+        last_future (Future): Future последнего отправленного поворота
     """
     
-    def __init__(self, client_name, server):
+    def __init__(self, client_name, server, max_in_flight=DEFAULT_IN_FLIGHT):
         """
         Инициализирует клиента с указанным именем и ссылкой на сервер.
         
         Args:
             client_name (str): Уникальное имя клиента для идентификации
             server (MatrixServer): Экземпляр сервера для обработки запросов
+            max_in_flight (int): Наибольшее количество запросов в работе;
+                submit_rotate ждет, пока окно не освободится
         """
         super().__init__()
         self.client_name = client_name
         self.data = None
         self.result = None
+        self.result_streamed = False
         self.server = server
         self.daemon = True
-        self.lock = threading.Lock()  # Блокировка для синхронизации вывода
+        self.console = get_console()
+        self.lock = self.console.input_lock  # Диалоги разных клиентов не перемежаются
+        self.max_in_flight = max_in_flight
+        self.in_flight = {}
+        self.last_future = None
+        self._window = threading.BoundedSemaphore(max_in_flight)
+        self._request_ids = itertools.count(1)
+        self._last_request_id = 0
+        self._result_id = 0
+        self._pending_lock = threading.Lock()  # Блокировка таблицы запросов и результата
     
     def run(self):
         """
@@ -65,13 +98,13 @@ class MatrixClient(threading.Thread):
         обрабатывает команды меню и управляет жизненным циклом клиента.
         Все операции защищены обработкой исключений для устойчивой работы.
         """
-        print(f"{time.strftime('%H:%M:%S')} {self.client_name}: клиент запущен")
+        self.console.print(f"{time.strftime('%H:%M:%S')} {self.client_name}: клиент запущен")
         
         while True:
             try:
                 with self.lock:
                     self.show_menu()
-                    choice = input(f"Введите команду для {self.client_name}: ").strip()
+                    choice = self.console.input(f"Введите команду для {self.client_name}: ").strip()
                 
                 if choice == '1':
                     self.handle_manual_input()
@@ -82,30 +115,31 @@ class MatrixClient(threading.Thread):
                 elif choice == '4':
                     self.handle_show_result()
                 elif choice == '5':
-                    print(f"{time.strftime('%H:%M:%S')} {self.client_name}: выход из программы")
+                    self.console.print(f"{time.strftime('%H:%M:%S')} {self.client_name}: выход из программы")
                     break
                 else:
-                    with self.lock:
-                        print("Неверный выбор, попробуйте снова.")
-                    
+                    self.console.print("Неверный выбор, попробуйте снова.")
+            
             except Exception as e:
-                with self.lock:
-                    print(f"Ошибка в клиенте {self.client_name}: {e}")
+                self.console.print(f"Ошибка в клиенте {self.client_name}: {e}")
     
     def show_menu(self):
         """
         Отображает главное меню клиента с доступными операциями.
         
         Выводит форматированное меню с номерами операций и их описаниями.
-        Меню включает все основные операции работы с матрицами.
+        Меню включает все основные операции работы с матрицами и выводится
+        одним блоком.
         """
-        print(f"\n=== Клиент {self.client_name} ===")
-        print("1. Ручной ввод матрицы")
-        print("2. Генерация случайной матрицы")
-        print("3. Поворот матрицы")
-        print("4. Вывод результата")
-        print("5. Выход")
-        print("=" * 25)
+        self.console.write(
+            f"\n=== Клиент {self.client_name} ===\n"
+            "1. Ручной ввод матрицы\n"
+            "2. Генерация случайной матрицы\n"
+            "3. Поворот матрицы\n"
+            "4. Вывод результата\n"
+            "5. Выход\n"
+            f"{'=' * 25}\n"
+        )
     
     def handle_manual_input(self):
         """
@@ -116,10 +150,12 @@ class MatrixClient(threading.Thread):
         последующих операций.
         """
         with self.lock:
+            # input_matrix выводит подсказки сам, поэтому накопленные блоки выводятся заранее
+            self.console.flush()
             self.data = input_matrix()
-            self.result = None
-            print(f"{time.strftime('%H:%M:%S')} {self.client_name}: матрица введена вручную")
-            self.print_matrix(self.data, "Введенная матрица")
+        self.reset_result()
+        self.console.write(f"{time.strftime('%H:%M:%S')} {self.client_name}: матрица введена вручную\n"
+                           + format_matrix(self.data, "Введенная матрица"))
     
     def handle_generate_matrix(self):
         """
@@ -129,42 +165,40 @@ class MatrixClient(threading.Thread):
         со случайными значениями и сохраняет ее для последующих операций.
         Выполняет валидацию вводимых размеров матрицы.
         """
-        with self.lock:
-            try:
-                n = int(input("Введите количество строк: "))
-                m = int(input("Введите количество столбцов: "))
-                
-                if n <= 0 or m <= 0:
-                    print("Ошибка: Размеры матрицы должны быть положительными числами")
-                    return
-                
-                self.data = generate_matrix(n, m)
-                self.result = None
-                print(f"{time.strftime('%H:%M:%S')} {self.client_name}: сгенерированы данные")
-                self.print_matrix(self.data, "Сгенерированная матрица")
-                
-            except ValueError:
-                print("Ошибка: Введите целые числа для размеров матрицы")
+        try:
+            with self.lock:
+                n = int(self.console.input("Введите количество строк: "))
+                m = int(self.console.input("Введите количество столбцов: "))
+            
+            if n <= 0 or m <= 0:
+                self.console.print("Ошибка: Размеры матрицы должны быть положительными числами")
+                return
+            
+            self.data = generate_matrix(n, m)
+            self.reset_result()
+            self.console.write(f"{time.strftime('%H:%M:%S')} {self.client_name}: сгенерированы данные\n"
+                               + format_matrix(self.data, "Сгенерированная матрица"))
+        
+        except ValueError:
+            self.console.print("Ошибка: Введите целые числа для размеров матрицы")
     
     def handle_rotate_matrix(self):
         """
         Отправляет запрос на поворот матрицы серверу.
         
         Проверяет наличие данных матрицы, запрашивает направление поворота
-        и отправляет асинхронный запрос на сервер. Обрабатывает ответ
-        сервера и сохраняет результат операции.
+        и отправляет асинхронный запрос на сервер. Меню сразу становится
+        доступно снова; о готовности результата сообщает обратный вызов.
         """
         if self.data is None:
-            with self.lock:
-                print("Ошибка: Сначала введите или сгенерируйте матрицу!")
+            self.console.print("Ошибка: Сначала введите или сгенерируйте матрицу!")
             return
         
-        with self.lock:
-            direction = input("Введите направление поворота ('clockwise' или 'counterclockwise'): ").strip().lower()
+        direction = self.console.input(
+            "Введите направление поворота ('clockwise' или 'counterclockwise'): ").strip().lower()
         
         if direction not in ['clockwise', 'counterclockwise']:
-            with self.lock:
-                print("Ошибка: Направление поворота должно быть 'clockwise' или 'counterclockwise'")
+            self.console.print("Ошибка: Направление поворота должно быть 'clockwise' или 'counterclockwise'")
             return
         
         # Формирование запроса для сервера
@@ -175,21 +209,174 @@ class MatrixClient(threading.Thread):
             'client_name': self.client_name
         }
         
-        with self.lock:
-            print(f"{time.strftime('%H:%M:%S')} {self.client_name}: отправлен запрос на поворот матрицы")
+        self.console.print(f"{time.strftime('%H:%M:%S')} {self.client_name}: отправлен запрос на поворот матрицы")
+        
+        # Большой результат выводится по мере получения блоков строк
+        if self.should_stream(self.data):
+            self.receive_stream(request)
+            return
         
-        # Асинхронная отправка запроса серверу
-        response = self.server.process_request(request, self.client_name)
+        # Асинхронная отправка запроса серверу; результат выводится командой меню
+        self.submit_rotate(direction, callback=self._report_response)
+    
+    def _report_response(self, future):
+        """
+        Выводит ответ на запрос: повернутую матрицу или ошибку.
         
-        # Обработка ответа от сервера
+        Вызывается в потоке сервера и только ставит сообщение в очередь
+        вывода, не дожидаясь терминала.
+        """
+        if future.cancelled():
+            self.console.print(f"{time.strftime('%H:%M:%S')} {self.client_name}: запрос на поворот отменен")
+            return
+        response = future.result()
         if 'error' in response:
-            with self.lock:
-                print(f"Ошибка сервера: {response['error']}")
+            self.console.print(f"Ошибка сервера (запрос #{response['request_id']}): {response['error']}")
         else:
-            self.result = response['result']
-            with self.lock:
-                print(f"{time.strftime('%H:%M:%S')} {self.client_name}: получен результат поворота")
-                self.print_matrix(self.result, "Результат поворота")
+            self.console.write(f"{time.strftime('%H:%M:%S')} {self.client_name}: получен результат поворота "
+                               f"(запрос #{response['request_id']})\n"
+                               + format_matrix(response['result'], "Результат поворота"))
+    
+    def submit_rotate(self, direction, matrix=None, callback=None, timeout=None, priority=0):
+        """
+        Отправляет запрос на поворот, не дожидаясь ответа.
+        
+        Если в работе уже max_in_flight запросов, вызов ждет ответа на
+        один из них. Ответ сопоставляется с запросом по идентификатору;
+        результат последнего отправленного поворота сохраняется в result.
+        Отмена возвращенного Future отменяет запрос на сервере.
+        
+        Args:
+            direction (str): Направление поворота
+            matrix (Matrix): Матрица (по умолчанию текущая матрица клиента)
+            callback: Функция, вызываемая с Future после получения ответа;
+                выполняется в потоке сервера и должна быть короткой
+            timeout (float): Срок выполнения запроса в секундах
+            priority (int): Приоритет запроса в очереди сервера
+        
+        Returns:
+            Future: Будущий ответ сервера с полем 'request_id' -
+                {'result': Matrix, ...} или {'error': str, ...}
+        """
+        request = {
+            'operation': 'rotate',
+            'matrix': self.data if matrix is None else matrix,
+            'direction': direction,
+            'client_name': self.client_name,
+            'timeout': timeout,
+            'priority': priority
+        }
+        
+        self._window.acquire()
+        future = Future()
+        with self._pending_lock:
+            request_id = request['request_id'] = next(self._request_ids)
+            self._last_request_id = request_id
+            self.in_flight[request_id] = future
+            self.last_future = future
+        if callback is not None:
+            future.add_done_callback(callback)
+        
+        try:
+            response = self.server.submit(request, self.client_name)
+        except Exception as e:
+            response = Future()
+            response.set_exception(e)
+        response.add_done_callback(lambda done: self._complete_request(request_id, done))
+        future.add_done_callback(lambda done: response.cancel() if done.cancelled() else None)
+        return future
+    
+    def _complete_request(self, request_id, done):
+        """Освобождает место в окне запросов и передает ответ в Future клиента."""
+        if done.cancelled():
+            response = {'error': 'cancelled', 'request_id': request_id}
+        else:
+            try:
+                response = dict(done.result(), request_id=request_id)
+            except Exception as e:
+                response = {'error': f"Ошибка выполнения запроса: {e}", 'request_id': request_id}
+        
+        with self._pending_lock:
+            future = self.in_flight.pop(request_id)
+            # Ответ на устаревший запрос не заменяет результат более нового
+            if 'result' in response and request_id > self._result_id:
+                self._result_id = request_id
+                self.result = response['result']
+                self.result_streamed = False
+        self._window.release()
+        try:
+            future.set_result(response)
+        except InvalidStateError:
+            pass  # Запрос отменен клиентом
+    
+    def wait_all(self, timeout=None):
+        """
+        Ожидает ответы на все запросы в работе.
+        
+        Returns:
+            bool: True, если все ответы получены за timeout секунд
+        """
+        with self._pending_lock:
+            futures = list(self.in_flight.values())
+        return not wait(futures, timeout).not_done
+    
+    def store_streamed_result(self):
+        """
+        Отмечает, что последний результат выведен потоком блоков и не сохранен.
+        
+        Такой результат считается самым новым: ответы на ранее отправленные
+        запросы его не заменяют.
+        """
+        with self._pending_lock:
+            self._last_request_id = self._result_id = next(self._request_ids)
+            self.result = None
+            self.result_streamed = True
+    
+    def reset_result(self):
+        """
+        Сбрасывает результат при смене матрицы клиента.
+        
+        Ответы на повороты прежней матрицы, полученные позже, результат
+        не меняют.
+        """
+        with self._pending_lock:
+            self.result = None
+            self.result_streamed = False
+            self._result_id = self._last_request_id
+    
+    @staticmethod
+    def should_stream(matrix):
+        """Решает, принимать ли результат поворота потоком блоков строк."""
+        matrix = Matrix.coerce(matrix)
+        return matrix.rows * matrix.cols >= STREAM_MIN_CELLS
+    
+    def receive_stream(self, request):
+        """
+        Принимает результат поворота блоками строк и выводит каждый блок сразу.
+        
+        Результат целиком не собирается: на стороне клиента хранится только
+        текущий блок. Следующий блок запрашивается у сервера только после
+        того, как поток вывода записал предыдущий, поэтому медленный терминал
+        сдерживает и вычисление блоков на сервере. После успешного приема
+        результат отмечается как выведенный потоком (store_streamed_result).
+        
+        Args:
+            request (dict): Запрос на поворот
+        
+        Returns:
+            bool: True, если результат получен, или False при ошибке сервера
+        """
+        self.console.print("\nРезультат поворота (по мере получения):")
+        for response in self.server.stream_request(request, self.client_name):
+            if 'error' in response:
+                self.console.print(f"Ошибка сервера: {response['error']}")
+                return False
+            self.console.write("".join(f"{row}\n" for row in response['block']))
+            self.console.flush()
+        
+        self.store_streamed_result()
+        self.console.print(f"{time.strftime('%H:%M:%S')} {self.client_name}: получен результат поворота")
+        return True
     
     def handle_show_result(self):
         """
@@ -198,22 +385,21 @@ class MatrixClient(threading.Thread):
         Выводит матрицу-результат предыдущей операции поворота.
         Если операция не выполнялась, выводит соответствующее сообщение.
         """
+        if self.result_streamed:
+            self.console.print("Результат был выведен по мере получения и не сохраняется.")
+            return
         if self.result is None:
-            with self.lock:
-                print("Ошибка: Сначала выполните операцию поворота!")
+            self.console.print("Ошибка: Сначала выполните операцию поворота!")
             return
         
-        with self.lock:
-            self.print_matrix(self.result, "Результат операции")
+        self.print_matrix(self.result, "Результат операции")
     
     def print_matrix(self, matrix, title="Матрица"):
         """
-        Выводит матрицу в консоль в читаемом формате.
+        Выводит матрицу в консоль в читаемом формате одним блоком.
         
         Args:
-            matrix (list): Матрица для вывода в виде списка списков
+            matrix (Matrix): Матрица для вывода (строки выводятся как списки)
             title (str): Заголовок для отображения над матрицей
         """
-        print(f"\n{title}:")
-        for row in matrix:
-            print(row)
\ No newline at end of file
+        self.console.write(format_matrix(matrix, title))
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""
+Модуль планирования сценариев автоматических клиентов.
+
+Переписывает список команд клиента перед выполнением так, чтобы серверу
+уходило как можно меньше запросов, а наблюдаемый результат не менялся.
+
+Правила планирования:
+    - Команды 'generate' и 'show' являются границами и сохраняются как есть
+    - Поворот всегда применяется к текущей матрице клиента (self.data),
+      а не к предыдущему результату, поэтому из подряд идущих поворотов
+      значение имеет только последний корректный: остальные корректные
+      повороты отбрасываются
+    - Повороты с некорректным направлением сохраняются на своих местах:
+      сервер отклоняет их, не меняя результат, и клиент выводит ошибку
+    - Между двумя границами остается не более одного корректного поворота
+      и все повороты с некорректным направлением
+
+Пример:
+    >>> plan_commands([
+    ...     {'type': 'rotate', 'direction': 'clockwise'},
+    ...     {'type': 'rotate', 'direction': 'counterclockwise'},
+    ...     {'type': 'show'}
+    ... ])
+    [{'type': 'rotate', 'direction': 'counterclockwise'}, {'type': 'show'}]
+"""
+
+
+# Направления, с которыми поворот меняет результат клиента
+VALID_DIRECTIONS = ('clockwise', 'counterclockwise')
+
+
+def plan_commands(commands):
+    """
+    Сворачивает цепочки поворотов в списке команд клиента.
+    
+    Args:
+        commands (list): Список команд в формате словарей
+            ('generate', 'rotate', 'show')
+    
+    Returns:
+        list: Новый список команд, в котором между соседними командами
+            'generate'/'show' не более одного корректного поворота плюс
+            все повороты с некорректным направлением
+    """
+    planned = []
+    chain = []
+    
+    for command in commands:
+        if command.get('type') == 'rotate':
+            if command.get('direction') in VALID_DIRECTIONS:
+                # Результат цепочки определяется последним корректным поворотом
+                chain = [rotate for rotate in chain if rotate.get('direction') not in VALID_DIRECTIONS]
+            chain.append(command)
+            continue
+        
+        planned.extend(chain)
+        chain = []
+        planned.append(command)
+    
+    planned.extend(chain)
+    return planned
@@ -0,0 +1,165 @@
+"""
+Модуль буферизованного вывода в консоль для многопоточных клиентов.
+
+Потоки клиентов и сервера не пишут в stdout сами. Каждое сообщение -
+например, заголовок вместе со всеми строками матрицы - формируется
+целиком в вызывающем потоке и ставится в очередь единственного потока
+вывода. Поток вывода забирает из очереди все накопившиеся блоки и
+записывает их одним вызовом write с одним flush, поэтому блоки разных
+потоков не перемешиваются, а вызывающие потоки не ждут терминал.
+
+Блок выводится в тот sys.stdout, который был текущим в момент постановки
+в очередь, так что contextlib.redirect_stdout действует и на отложенный
+вывод. Диалоги с вводом выполняются под общей блокировкой input_lock и
+перед приглашением дожидаются вывода накопленных блоков.
+"""
+
+import atexit
+import queue
+import sys
+import threading
+
+
+# Наибольший объем текста, записываемый одним вызовом write
+MAX_WRITE_CHARS = 64 * 1024
+
+# Общий для процесса поток вывода
+_console = None
+_console_lock = threading.Lock()
+
+
+def format_matrix(matrix, title="Матрица"):
+    """
+    Формирует блок вывода матрицы: заголовок и строки матрицы как списки.
+    
+    Returns:
+        str: Текст блока, оканчивающийся переводом строки
+    """
+    lines = [f"\n{title}:"]
+    lines.extend(str(row) for row in matrix)
+    lines.append("")
+    return "\n".join(lines)
+
+
+class ConsoleRenderer:
+    """
+    Поток вывода в консоль с очередью готовых блоков текста.
+    
+    Attributes:
+        input_lock (threading.RLock): Блокировка диалогов с вводом
+        blocks (int): Количество выведенных блоков
+        writes (int): Количество вызовов write
+    """
+    
+    def __init__(self):
+        self.input_lock = threading.RLock()
+        self.blocks = 0
+        self.writes = 0
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="ConsoleRenderer", daemon=True)
+        self._thread.start()
+    
+    def write(self, text):
+        """
+        Ставит блок текста в очередь вывода, не дожидаясь записи.
+        
+        Блок выводится целиком и не перемежается с блоками других потоков.
+        После закрытия потока вывода блок записывается сразу.
+        """
+        if self._closed:
+            self._write(sys.stdout, [text])
+            return
+        self._queue.put((sys.stdout, text))
+    
+    def print(self, *values, sep=' ', end='\n'):
+        """Аналог print: все значения выводятся одним блоком."""
+        self.write(sep.join(map(str, values)) + end)
+    
+    def flush(self, timeout=None):
+        """
+        Ожидает вывода всех блоков, поставленных в очередь до вызова.
+        
+        Returns:
+            bool: True, если блоки выведены за timeout секунд
+        """
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+    
+    def input(self, prompt=""):
+        """Выводит накопленные блоки и запрашивает строку ввода под общей блокировкой."""
+        with self.input_lock:
+            self.flush()
+            return input(prompt)
+    
+    def close(self, timeout=None):
+        """Выводит оставшиеся блоки и останавливает поток вывода."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+    
+    def _run(self):
+        """
+        Цикл потока вывода.
+        
+        Блоки, накопившиеся в очереди для одного потока вывода, склеиваются
+        и записываются одним вызовом, но не больше MAX_WRITE_CHARS за раз.
+        """
+        while True:
+            item = self._queue.get()
+            stream, parts, size, waiters = None, [], 0, []
+            while True:
+                if item is None:
+                    self._write(stream, parts)
+                    for done in waiters:
+                        done.set()
+                    return
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    if item[0] is not stream or size >= MAX_WRITE_CHARS:
+                        self._write(stream, parts)
+                        stream, parts, size = item[0], [], 0
+                    parts.append(item[1])
+                    size += len(item[1])
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            
+            self._write(stream, parts)
+            for done in waiters:
+                done.set()
+    
+    def _write(self, stream, parts):
+        """Записывает блоки одним вызовом write."""
+        if not parts:
+            return
+        try:
+            stream.write("".join(parts))
+            stream.flush()
+        except (OSError, ValueError):
+            pass  # Закрытый или недоступный поток вывода не останавливает вывод остальных
+        self.blocks += len(parts)
+        self.writes += 1
+
+
+def get_console():
+    """
+    Возвращает общий для процесса поток вывода, запуская его при первом вызове.
+    
+    Returns:
+        ConsoleRenderer: Поток вывода; при завершении программы он выводит
+            оставшиеся блоки
+    """
+    global _console
+    with _console_lock:
+        if _console is None:
+            _console = ConsoleRenderer()
+            atexit.register(_console.close)
+        return _console
@@ -20,4 +20,14 @@ class InvalidInputError(MatrixError):
 
 class AlgorithmNotExecutedError(MatrixError):
     """Исключение для попытки вывода результата до выполнения алгоритма."""
-    pass
\ No newline at end of file
+    pass
+
+
+class OperationCancelledError(MatrixError):
+    """Исключение для операции, отмененной до или во время выполнения."""
+    pass
+
+
+class DeadlineExceededError(OperationCancelledError):
+    """Исключение для операции, срок выполнения которой истек."""
+    pass
@@ -0,0 +1,75 @@
+"""
+Модуль кольца консистентного хэширования.
+
+Каждый узел (шард) размещается на кольце в нескольких виртуальных точках.
+Ключ (имя клиента) обслуживает узел, ближайший к хэшу ключа по часовой
+стрелке. При удалении узла на другие узлы переходят только его ключи,
+а клиенты остальных узлов сохраняют привязку к своему шарду.
+"""
+
+import bisect
+import hashlib
+
+
+def _hash(value):
+    """64-битный хэш строки для размещения на кольце."""
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class HashRing:
+    """
+    Кольцо консистентного хэширования.
+    
+    Attributes:
+        replicas (int): Количество виртуальных точек на узел
+        nodes (set): Узлы на кольце
+    """
+    
+    def __init__(self, nodes=(), replicas=64):
+        """
+        Args:
+            nodes: Начальные узлы (любые значения с устойчивым str())
+            replicas (int): Количество виртуальных точек на узел; чем больше
+                точек, тем равномернее распределяются ключи
+        """
+        self.replicas = replicas
+        self.nodes = set()
+        self._points = []
+        self._owners = []
+        for node in nodes:
+            self.add(node)
+    
+    def add(self, node):
+        """Размещает узел на кольце."""
+        if node in self.nodes:
+            return
+        self.nodes.add(node)
+        for replica in range(self.replicas):
+            point = _hash(f"{node}#{replica}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+    
+    def remove(self, node):
+        """Убирает узел с кольца; его ключи переходят к соседним узлам."""
+        if node not in self.nodes:
+            return
+        self.nodes.discard(node)
+        kept = [(point, owner) for point, owner in zip(self._points, self._owners) if owner != node]
+        self._points = [point for point, _ in kept]
+        self._owners = [owner for _, owner in kept]
+    
+    def get(self, key):
+        """
+        Возвращает узел, обслуживающий ключ.
+        
+        Returns:
+            Узел или None, если кольцо пусто
+        """
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, _hash(str(key))) % len(self._points)
+        return self._owners[index]
+    
+    def __len__(self):
+        return len(self.nodes)
@@ -0,0 +1,445 @@
+"""
+Модуль нагрузочного тестирования сервера матричных операций.
+
+Нагрузку создают N виртуальных клиентов LoadClient - наследников
+сценарного клиента Client из main. Профиль нагрузки (спецификация)
+задает распределение размеров матриц, доли направлений поворота,
+время обдумывания и модель поступления запросов:
+    closed  - замкнутый цикл: клиент отправляет следующий запрос только
+              после ответа на предыдущий и паузы обдумывания
+    poisson - открытый цикл: запросы поступают пуассоновским потоком
+              с заданной суммарной интенсивностью независимо от ответов
+
+В открытом цикле задержка отсчитывается от запланированного момента
+поступления запроса, а не от фактической отправки, поэтому отставание
+генератора не скрывает очередь на сервере.
+
+После заданного времени работы выводится таблица с пропускной
+способностью, квантилями задержки p50/p99/p999 и долей ошибок; тот же
+отчет можно сохранить в формате JSON.
+
+Пример:
+    python "Practice 19-20/load_test.py" --clients 32 --duration 30 --arrival poisson --rate 200 --json report.json
+"""
+
+import argparse
+import contextlib
+import copy
+import json
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import wait
+from functools import partial
+from main import Client
+from matrix_generate import generate_matrix
+from request_queue import POLICIES
+from server import MatrixServer
+
+
+# Модели поступления запросов
+ARRIVALS = ('closed', 'poisson')
+
+# Итоги запросов по машиночитаемым кодам ошибок сервера
+RESPONSE_ERRORS = {
+    'overloaded': 'overloaded',
+    'deadline_exceeded': 'expired',
+    'cancelled': 'cancelled',
+}
+
+# Квантили задержки в отчете
+REPORT_QUANTILES = (('p50', 0.5), ('p99', 0.99), ('p999', 0.999))
+
+# Профиль нагрузки по умолчанию
+DEFAULT_SPEC = {
+    'clients': 8,                   # количество виртуальных клиентов
+    'duration': 10.0,               # время подачи нагрузки в секундах
+    'arrival': 'closed',            # модель поступления запросов из ARRIVALS
+    'rate': 100.0,                  # суммарная интенсивность для 'poisson', запросов в секунду
+    'think_time': 0.0,              # среднее время обдумывания для 'closed' в секундах
+    'drain': 30.0,                  # ожидание ответов на запросы после окончания подачи
+    'timeout': None,                # срок выполнения запроса в секундах (None - без срока)
+    'sizes': [                      # распределение размеров матриц; 'priority' - приоритет размера
+        {'rows': 8, 'cols': 8, 'weight': 4},
+        {'rows': 64, 'cols': 64, 'weight': 2},
+        {'rows': 256, 'cols': 128, 'weight': 1},
+    ],
+    'directions': {'clockwise': 1, 'counterclockwise': 1},
+    'matrices_per_size': 8,         # различных матриц каждого размера
+    'seed': None,
+    'server': {                     # параметры MatrixServer
+        'processing_delay': None,
+        'cache_bytes': 0,
+    },
+}
+
+
+def load_spec(path=None, **overrides):
+    """
+    Собирает профиль нагрузки из значений по умолчанию, файла и параметров.
+    
+    Args:
+        path (str): JSON-файл с профилем; заданные в нем ключи заменяют
+            значения по умолчанию, а раздел 'server' дополняет их
+        **overrides: Отдельные ключи профиля; значения None пропускаются
+    
+    Returns:
+        dict: Профиль нагрузки
+    
+    Raises:
+        ValueError: Если профиль некорректен
+    """
+    spec = copy.deepcopy(DEFAULT_SPEC)
+    if path:
+        with open(path, encoding='utf-8') as file:
+            loaded = json.load(file)
+        spec['server'].update(loaded.pop('server', {}))
+        spec.update(loaded)
+    spec.update({key: value for key, value in overrides.items() if value is not None})
+    
+    if spec['arrival'] not in ARRIVALS:
+        raise ValueError(f"Неизвестная модель поступления запросов: {spec['arrival']}")
+    if spec['clients'] <= 0 or spec['duration'] <= 0:
+        raise ValueError("Количество клиентов и время теста должны быть положительными")
+    if spec['arrival'] == 'poisson' and spec['rate'] <= 0:
+        raise ValueError("Интенсивность потока запросов должна быть положительной")
+    if not spec['sizes'] or any(size['rows'] <= 0 or size['cols'] <= 0 for size in spec['sizes']):
+        raise ValueError("Размеры матриц должны быть положительными")
+    labels = [f"{size['rows']}x{size['cols']}" for size in spec['sizes']]
+    if len(set(labels)) != len(labels):
+        # Матрицы и веса выбираются по размеру, поэтому повтор размера нарушил бы их соответствие
+        raise ValueError(f"Размеры матриц не должны повторяться: {', '.join(labels)}")
+    if not spec['directions'] or set(spec['directions']) - {'clockwise', 'counterclockwise'}:
+        raise ValueError("Направления поворота должны быть 'clockwise' или 'counterclockwise'")
+    return spec
+
+
+class LatencyRecorder:
+    """
+    Потокобезопасный сборщик результатов запросов.
+    
+    Attributes:
+        latencies (dict): Задержки успешных запросов в секундах по размеру матрицы
+        statuses (dict): Количество запросов по паре (размер, итог)
+    """
+    
+    def __init__(self):
+        self.latencies = {}
+        self.statuses = {}
+        self._answered = set()
+        self._closed = False
+        self._lock = threading.Lock()
+    
+    def record(self, label, status, latency, request=None):
+        """
+        Учитывает завершенный запрос.
+        
+        Args:
+            label (str): Размер матрицы, например '64x64'
+            status (str): Итог - 'ok', 'overloaded', 'expired', 'error' или 'timeout'
+            latency (float): Задержка в секундах
+            request: Future запроса открытого цикла, ответ на который учтен
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._count(label, status, latency)
+            if request is not None:
+                self._answered.add(request)
+    
+    def close(self, pending=(), latency=0.0):
+        """
+        Прекращает учет: ответы, пришедшие позже, в отчет не попадают.
+        
+        Запросы из pending, ответ на которые к этому моменту не учтен,
+        учитываются как 'timeout'. Проверка и закрытие выполняются под
+        одной блокировкой, поэтому запрос не может попасть в отчет дважды.
+        
+        Args:
+            pending (list): Пары (размер, Future) запросов открытого цикла
+            latency (float): Задержка, записываемая для 'timeout'
+        """
+        with self._lock:
+            self._closed = True
+            for label, request in pending:
+                if request not in self._answered:
+                    self._count(label, 'timeout', latency)
+            self._answered.clear()
+    
+    def _count(self, label, status, latency):
+        self.statuses[label, status] = self.statuses.get((label, status), 0) + 1
+        if status == 'ok':
+            self.latencies.setdefault(label, []).append(latency)
+
+
+def response_status(response):
+    """Определяет итог запроса по ответу сервера."""
+    if 'result' in response:
+        return 'ok'
+    return RESPONSE_ERRORS.get(response.get('error'), 'error')
+
+
+class LoadClient(Client):
+    """
+    Виртуальный клиент, отправляющий запросы по профилю нагрузки.
+    
+    Attributes:
+        spec (dict): Профиль нагрузки
+        matrices (dict): Заранее сгенерированные матрицы по размеру
+        recorder (LatencyRecorder): Сборщик результатов
+        deadline (float): Момент окончания подачи нагрузки (time.perf_counter)
+        pending (list): Пары (размер, Future) запросов открытого цикла
+    """
+    
+    def __init__(self, client_name, server, spec, matrices, recorder, deadline, seed=None):
+        """
+        Args:
+            client_name (str): Имя клиента
+            server (MatrixServer): Тестируемый сервер
+            spec (dict): Профиль нагрузки
+            matrices (dict): Матрицы по размеру {'RxC': [Matrix, ...]}
+            recorder (LatencyRecorder): Сборщик результатов
+            deadline (float): Момент окончания подачи нагрузки
+            seed: Зерно генератора выбора запросов
+        """
+        super().__init__(client_name, server, [], optimize=False)
+        self.spec = spec
+        self.matrices = matrices
+        self.recorder = recorder
+        self.deadline = deadline
+        self.pending = []
+        self.rng = random.Random(seed)
+        self.labels = list(matrices)
+        self.size_weights = [size['weight'] for size in spec['sizes']]
+        self.priorities = {f"{size['rows']}x{size['cols']}": size.get('priority', 0) for size in spec['sizes']}
+        self.directions = list(spec['directions'])
+        self.direction_weights = list(spec['directions'].values())
+    
+    def run(self):
+        """Подает нагрузку до момента deadline."""
+        if self.spec['arrival'] == 'poisson':
+            self.run_open_loop()
+        else:
+            self.run_closed_loop()
+    
+    def next_request(self):
+        """
+        Выбирает размер матрицы и направление поворота по профилю.
+        
+        Returns:
+            tuple: (размер матрицы, словарь запроса)
+        """
+        label = self.rng.choices(self.labels, self.size_weights)[0]
+        direction = self.rng.choices(self.directions, self.direction_weights)[0]
+        request = {
+            'operation': 'rotate',
+            'matrix': self.rng.choice(self.matrices[label]),
+            'direction': direction,
+            'client_name': self.client_name,
+            'timeout': self.spec['timeout'],
+            'priority': self.priorities[label]
+        }
+        return label, request
+    
+    def run_closed_loop(self):
+        """Отправляет запросы по одному, ожидая ответ и паузу обдумывания."""
+        think_time = self.spec['think_time']
+        while True:
+            if think_time > 0:
+                time.sleep(self.rng.expovariate(1 / think_time))
+            if time.perf_counter() >= self.deadline:
+                break
+            
+            label, request = self.next_request()
+            started = time.perf_counter()
+            try:
+                status = response_status(self.server.process_request(request, self.client_name))
+            except Exception:
+                status = 'error'
+            self.recorder.record(label, status, time.perf_counter() - started)
+    
+    def run_open_loop(self):
+        """Отправляет запросы пуассоновским потоком, не дожидаясь ответов."""
+        # Сумма независимых пуассоновских потоков клиентов - пуассоновский поток с интенсивностью rate
+        rate = self.spec['rate'] / self.spec['clients']
+        scheduled = time.perf_counter() + self.rng.expovariate(rate)
+        while scheduled < self.deadline:
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            
+            label, request = self.next_request()
+            future = self.server.submit(request, self.client_name)
+            future.add_done_callback(partial(self._on_response, label, scheduled))
+            self.pending.append((label, future))
+            scheduled += self.rng.expovariate(rate)
+    
+    def _on_response(self, label, scheduled, future):
+        """Учитывает ответ на запрос открытого цикла."""
+        try:
+            status = response_status(future.result())
+        except Exception:
+            status = 'error'
+        self.recorder.record(label, status, time.perf_counter() - scheduled, future)
+
+
+def _percentile(ordered, q):
+    """Квантиль по отсортированной выборке (метод ближайшего ранга)."""
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def _latency_summary(latencies):
+    """Сводка задержек в миллисекундах."""
+    if not latencies:
+        return {name: None for name in ('mean', *dict(REPORT_QUANTILES), 'max')}
+    ordered = sorted(latencies)
+    summary = {'mean': sum(ordered) / len(ordered) * 1000}
+    for name, q in REPORT_QUANTILES:
+        summary[name] = _percentile(ordered, q) * 1000
+    summary['max'] = ordered[-1] * 1000
+    return summary
+
+
+def summarize(recorder, elapsed, spec):
+    """
+    Формирует отчет нагрузочного теста.
+    
+    Args:
+        recorder (LatencyRecorder): Собранные результаты
+        elapsed (float): Время теста в секундах
+        spec (dict): Профиль нагрузки
+    
+    Returns:
+        dict: Отчет с общей сводкой и сводками по размерам матриц
+    """
+    def section(labels):
+        counts = {}
+        for (label, status), count in recorder.statuses.items():
+            if label in labels:
+                counts[status] = counts.get(status, 0) + count
+        total = sum(counts.values())
+        errors = {status: count for status, count in counts.items() if status != 'ok'}
+        return {
+            'requests': total,
+            'ok': counts.get('ok', 0),
+            'errors': errors,
+            'error_rate': sum(errors.values()) / total if total else 0.0,
+            'throughput_rps': counts.get('ok', 0) / elapsed if elapsed else 0.0,
+            'latency_ms': _latency_summary([latency for label in labels
+                                            for latency in recorder.latencies.get(label, ())]),
+        }
+    
+    labels = [f"{size['rows']}x{size['cols']}" for size in spec['sizes']]
+    report = {
+        'spec': spec,
+        'elapsed_s': elapsed,
+        'total': section(labels),
+        'by_size': {label: section([label]) for label in labels},
+    }
+    return report
+
+
+def format_table(report):
+    """Форматирует отчет в виде текстовой таблицы."""
+    columns = ('requests', 'ok/s', 'errors', 'mean', 'p50', 'p99', 'p999', 'max')
+    lines = [f"{'размер':>10} " + " ".join(f"{column:>9}" for column in columns)]
+    rows = list(report['by_size'].items()) + [('всего', report['total'])]
+    for label, section in rows:
+        latency = section['latency_ms']
+        values = [f"{section['requests']:>9}", f"{section['throughput_rps']:>9.1f}",
+                  f"{section['error_rate']:>9.2%}"]
+        values += ["        -" if latency[name] is None else f"{latency[name]:>9.2f}"
+                   for name in ('mean', 'p50', 'p99', 'p999', 'max')]
+        lines.append(f"{label:>10} " + " ".join(values))
+    
+    errors = report['total']['errors']
+    lines.append(f"Время теста: {report['elapsed_s']:.1f} с, задержки в мс, "
+                 f"ошибки: {', '.join(f'{k}={v}' for k, v in sorted(errors.items())) or 'нет'}")
+    return "\n".join(lines)
+
+
+def run_load_test(spec):
+    """
+    Запускает нагрузочный тест по профилю.
+    
+    Сервер создается с параметрами из spec['server']. На время теста
+    вывод сервера в консоль отключается, чтобы он не ограничивал нагрузку.
+    
+    Args:
+        spec (dict): Профиль нагрузки из load_spec
+    
+    Returns:
+        dict: Отчет summarize
+    """
+    rng = random.Random(spec['seed'])
+    matrices = {
+        f"{size['rows']}x{size['cols']}": [generate_matrix(size['rows'], size['cols'], seed=rng.getrandbits(64))
+                                          for _ in range(spec['matrices_per_size'])]
+        for size in spec['sizes']
+    }
+    server_options = dict(spec['server'])
+    delay = server_options.get('processing_delay')
+    server_options['processing_delay'] = tuple(delay) if delay and max(delay) > 0 else None
+    
+    recorder = LatencyRecorder()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        server = MatrixServer(**server_options)
+        try:
+            started = time.perf_counter()
+            deadline = started + spec['duration']
+            clients = [LoadClient(f"Нагрузка{index + 1}", server, spec, matrices, recorder, deadline,
+                                  rng.getrandbits(64))
+                       for index in range(spec['clients'])]
+            for client in clients:
+                client.start()
+            for client in clients:
+                client.join()
+            
+            # Ответы на запросы открытого цикла дожидаются не дольше drain секунд
+            pending = [item for client in clients for item in client.pending]
+            wait([future for _, future in pending], timeout=spec['drain'])
+            elapsed = time.perf_counter() - started
+            recorder.close(pending, elapsed)
+        finally:
+            server.shutdown()
+    
+    report = summarize(recorder, elapsed, spec)
+    report['server'] = {'backend': server.backend, 'executor': server.executor_kind,
+                        'max_workers': server.max_workers}
+    return report
+
+
+def main():
+    """Точка входа нагрузочного теста."""
+    parser = argparse.ArgumentParser(description="Нагрузочный тест сервера матричных операций")
+    parser.add_argument('--spec', help="JSON-файл с профилем нагрузки")
+    parser.add_argument('--clients', type=int, help="количество виртуальных клиентов")
+    parser.add_argument('--duration', type=float, help="время подачи нагрузки в секундах")
+    parser.add_argument('--arrival', choices=ARRIVALS, help="модель поступления запросов")
+    parser.add_argument('--rate', type=float, help="суммарная интенсивность для poisson, запросов/с")
+    parser.add_argument('--think-time', type=float, help="среднее время обдумывания для closed, с")
+    parser.add_argument('--timeout', type=float, help="срок выполнения запроса в секундах")
+    parser.add_argument('--policy', choices=POLICIES, help="политика планирования очереди сервера")
+    parser.add_argument('--seed', type=int, help="зерно генератора нагрузки")
+    parser.add_argument('--json', help="файл для отчета в формате JSON ('-' - вывод в консоль)")
+    args = parser.parse_args()
+    
+    spec = load_spec(args.spec, clients=args.clients, duration=args.duration, arrival=args.arrival,
+                     rate=args.rate, think_time=args.think_time, timeout=args.timeout, seed=args.seed)
+    if args.policy:
+        spec['server']['policy'] = args.policy
+    print(f"Нагрузка: {spec['clients']} клиентов, {spec['arrival']}, {spec['duration']} с")
+    report = run_load_test(spec)
+    print(format_table(report))
+    
+    if args.json == '-':
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    elif args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
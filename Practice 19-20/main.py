@@ -18,12 +18,18 @@
     threading - для работы с потоками
     server - модуль сервера матричных операций
     client - базовый класс клиента матричных операций
+    console - общий поток вывода, через который клиенты печатают целыми блоками
+    command_planner - сворачивание цепочек поворотов в сценариях клиентов
 """
 
 import time
 import threading
-from server import server_instance
-from client import MatrixClient
+from array import array
+from matrix import Matrix, fit_typecode
+from server import get_server_instance
+from client import DEFAULT_IN_FLIGHT, MatrixClient
+from console import format_matrix, get_console
+from command_planner import plan_commands
 
 
 class Client(MatrixClient):
@@ -34,6 +40,10 @@ class Client(MatrixClient):
     возможность автоматического выполнения заранее определенной
     последовательности матричных операций.
     
+    Повороты отправляются без ожидания ответа (submit_rotate), поэтому
+    независимые команды выполняются на сервере одновременно; команда
+    'show' дожидается ответа на последний поворот.
+    
     Attributes:
         client_name (str): Уникальное имя клиента для идентификации
         server (MatrixServer): Ссылка на сервер для обработки запросов
@@ -41,7 +51,7 @@ class Client(MatrixClient):
         command_index (int): Текущий индекс выполняемой команды
     """
     
-    def __init__(self, client_name, server, commands):
+    def __init__(self, client_name, server, commands, optimize=True, max_in_flight=DEFAULT_IN_FLIGHT):
         """
         Инициализирует клиента с набором команд.
         
@@ -51,9 +61,12 @@ class Client(MatrixClient):
             commands (list): Список команд в формате словарей:
                 - type (str): Тип операции ('generate', 'rotate', 'show')
                 - rows/cols/direction: Параметры операции
+            optimize (bool): Свернуть цепочки поворотов перед выполнением,
+                чтобы между командами 'generate'/'show' уходил один запрос
+            max_in_flight (int): Наибольшее количество запросов в работе
         """
-        super().__init__(client_name, server)
-        self.commands = commands
+        super().__init__(client_name, server, max_in_flight)
+        self.commands = plan_commands(commands) if optimize else list(commands)
         self.command_index = 0
     
     def run(self):
@@ -65,7 +78,7 @@ class Client(MatrixClient):
         Каждая команда выполняется в отдельном временном интервале,
         что позволяет наблюдать параллельную работу клиентов.
         """
-        print(f"{time.strftime('%H:%M:%S')} {self.client_name}: клиент запущен")
+        self.console.print(f"{time.strftime('%H:%M:%S')} {self.client_name}: клиент запущен")
         
         for command in self.commands:
             # Пауза между командами для наглядности параллельной работы
@@ -78,7 +91,9 @@ class Client(MatrixClient):
             elif command['type'] == 'show':
                 self.show_result()
         
-        print(f"{time.strftime('%H:%M:%S')} {self.client_name}: выполнение завершено")
+        # Клиент завершается, только получив ответы на все запросы
+        self.wait_all()
+        self.console.print(f"{time.strftime('%H:%M:%S')} {self.client_name}: выполнение завершено")
     
     def generate_matrix(self, rows, cols):
         """
@@ -92,26 +107,25 @@ class Client(MatrixClient):
             cols (int): Количество столбцов генерируемой матрицы
         """
         # Генерация матрицы с последовательными значениями 1, 2, 3...
-        self.data = [
-            [i * cols + j + 1 for j in range(cols)]
-            for i in range(rows)
-        ]
-        self.result = None
-        print(f"{time.strftime('%H:%M:%S')} {self.client_name}: сгенерированы данные")
-        self.print_matrix(self.data, "Сгенерированная матрица")
+        dtype = fit_typecode(1, rows * cols)
+        self.data = Matrix(rows, cols, dtype, array(dtype, range(1, rows * cols + 1)))
+        self.reset_result()
+        self.console.write(f"{time.strftime('%H:%M:%S')} {self.client_name}: сгенерированы данные\n"
+                           + format_matrix(self.data, "Сгенерированная матрица"))
     
     def rotate_matrix(self, direction):
         """
         Автоматически отправляет запрос на поворот матрицы серверу.
         
         Формирует и отправляет запрос на поворот текущей матрицы
-        в указанном направлении, обрабатывает ответ сервера.
+        в указанном направлении, не дожидаясь ответа: ответ выводится
+        обратным вызовом, а следующая команда выполняется сразу.
         
         Args:
             direction (str): Направление поворота ('clockwise' или 'counterclockwise')
         """
         if self.data is None:
-            print(f"{time.strftime('%H:%M:%S')} {self.client_name}: ошибка - нет данных")
+            self.console.print(f"{time.strftime('%H:%M:%S')} {self.client_name}: ошибка - нет данных")
             return
         
         # Формирование запроса к серверу
@@ -122,42 +136,52 @@ class Client(MatrixClient):
             'client_name': self.client_name
         }
         
-        print(f"{time.strftime('%H:%M:%S')} {self.client_name}: отправлен запрос на поворот матрицы")
+        self.console.print(f"{time.strftime('%H:%M:%S')} {self.client_name}: отправлен запрос на поворот матрицы")
+        
+        # Большой результат выводится по мере получения блоков строк
+        if self.should_stream(self.data):
+            self.receive_stream(request)
+            return
         
-        # Отправка запроса и обработка ответа
-        response = self.server.process_request(request, self.client_name)
+        # Отправка запроса без ожидания ответа
+        self.submit_rotate(direction, request['matrix'], callback=self._report_response)
+    
+    def _report_response(self, future):
+        """
+        Выводит ответ сервера на поворот.
         
+        Args:
+            future (Future): Завершенный Future из submit_rotate
+        """
+        if future.cancelled():
+            self.console.print(f"{time.strftime('%H:%M:%S')} {self.client_name}: запрос на поворот отменен")
+            return
+        response = future.result()
         if 'error' in response:
-            print(f"{time.strftime('%H:%M:%S')} {self.client_name}: ошибка сервера - {response['error']}")
+            self.console.print(f"{time.strftime('%H:%M:%S')} {self.client_name}: ошибка сервера - {response['error']}")
         else:
-            self.result = response['result']
-            print(f"{time.strftime('%H:%M:%S')} {self.client_name}: получен результат поворота")
-            self.print_matrix(self.result, "Результат поворота")
+            self.console.write(f"{time.strftime('%H:%M:%S')} {self.client_name}: получен результат поворота\n"
+                               + format_matrix(response['result'], "Результат поворота"))
     
     def show_result(self):
         """
         Автоматически отображает результат последней операции.
         
-        Выводит в консоль матрицу-результат предыдущей операции.
-        Если операция не выполнялась, выводит сообщение об ошибке.
+        Дожидается ответа на последний отправленный поворот и выводит
+        в консоль матрицу-результат. Если операция не выполнялась, выводит
+        сообщение об ошибке.
         """
+        if self.last_future is not None:
+            self.last_future.result()
+        if self.result_streamed:
+            self.console.print(f"{time.strftime('%H:%M:%S')} {self.client_name}: результат выведен "
+                               f"по мере получения и не сохраняется")
+            return
         if self.result is None:
-            print(f"{time.strftime('%H:%M:%S')} {self.client_name}: ошибка - нет результата")
+            self.console.print(f"{time.strftime('%H:%M:%S')} {self.client_name}: ошибка - нет результата")
             return
         
         self.print_matrix(self.result, "Результат операции")
-    
-    def print_matrix(self, matrix, title="Матрица"):
-        """
-        Выводит матрицу в консоль в форматированном виде.
-        
-        Args:
-            matrix (list): Матрица для отображения
-            title (str): Заголовок для вывода
-        """
-        print(f"\n{title}:")
-        for row in matrix:
-            print(row)
 
 
 def demonstrate_threading():
@@ -214,34 +238,52 @@ def main():
         {'type': 'show'}
     ]
     
+    # Повороты двух разных матриц выполняются на сервере одновременно
+    client4_commands = [
+        {'type': 'generate', 'rows': 2, 'cols': 3},
+        {'type': 'rotate', 'direction': 'clockwise'},
+        {'type': 'generate', 'rows': 3, 'cols': 2},
+        {'type': 'rotate', 'direction': 'counterclockwise'},
+        {'type': 'show'}
+    ]
+    
     # Создание клиентов
+    server_instance = get_server_instance()
     clients = [
         Client("Клиент1", server_instance, client1_commands),
         Client("Клиент2", server_instance, client2_commands),
-        Client("Клиент3", server_instance, client3_commands)
+        Client("Клиент3", server_instance, client3_commands),
+        Client("Клиент4", server_instance, client4_commands)
     ]
     
-    print("Запуск автоматической демонстрации...")
-    print("Клиенты будут выполнять команды автоматически\n")
+    # После запуска клиентов основной поток тоже печатает через общий поток вывода
+    console = get_console()
+    console.print("Запуск автоматической демонстрации...")
+    console.print("Клиенты будут выполнять команды автоматически\n")
     
     # Параллельный запуск клиентов в отдельных потоках
     for client in clients:
         client.start()
         time.sleep(0.5)  # Задержка для стабильного запуска
     
-    print(f"Запущено клиентов: {len(clients)}")
-    print(f"Всего активных потоков: {threading.active_count()}")
-    print("\nНаблюдайте за параллельной работой клиентов!\n")
+    console.print(f"Запущено клиентов: {len(clients)}\n"
+                  f"Всего активных потоков: {threading.active_count()}\n"
+                  "\nНаблюдайте за параллельной работой клиентов!\n")
     
     # Ожидание завершения всех клиентов
     try:
         for client in clients:
             client.join()
     except KeyboardInterrupt:
-        print("\nДемонстрация прервана...")
+        console.print("\nДемонстрация прервана...")
     
-    # Отображение финальной статистики
+    # Отображение финальной статистики после вывода всех блоков клиентов
+    console.flush()
     print(f"\nСервер обработал {server_instance.requests_processed} запросов")
+    latency = server_instance.metrics.snapshot()['matrix_request_latency_seconds']['values']
+    for (operation,), histogram in sorted(latency.items(), key=lambda item: str(item[0])):
+        quantiles = histogram['quantiles']
+        print(f"Задержка {operation}: p50={quantiles[0.5] * 1000:.1f} мс, p99={quantiles[0.99] * 1000:.1f} мс")
 
 
 if __name__ == "__main__":
@@ -1,11 +1,76 @@
 """
 Модуль для генерации случайных матриц.
+
+Значения генерируются целыми блоками, а не вызовом random.randint для
+каждого элемента:
+    - без NumPy: random.Random.randbytes (getrandbits) дает сразу весь блок
+      случайных байтов, которые переводятся в диапазон с отбраковкой,
+      чтобы сохранить равномерность
+    - с NumPy: numpy.random.Generator.integers
+
+Большие матрицы делятся на блоки строк. У каждого блока свой независимый
+генератор, зерно которого выводится из общего seed и номера блока, поэтому
+блоки можно генерировать параллельно в отдельных процессах, а результат
+при заданном seed не зависит от числа процессов.
 """
 
+import hashlib
 import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from matrix import Matrix, fit_typecode
+
+try:
+    import numpy as np
+except ImportError:  # NumPy - необязательная зависимость
+    np = None
+
+
+# Количество элементов в одном блоке генерации по умолчанию
+CHUNK_CELLS = 1 << 20
+
+# Беззнаковые типы array для сырых случайных значений
+RAW_TYPECODES = ('B', 'H', 'I', 'Q')
 
 
-def generate_matrix(rows, cols, min_val=1, max_val=100):
+def _chunk_seed(seed, index):
+    """
+    Выводит зерно независимого потока для блока из общего seed.
+    """
+    digest = hashlib.blake2b(f"{seed}:{index}".encode(), digest_size=16).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def _generate_chunk(count, min_val, max_val, seed, dtype):
+    """
+    Генерирует count случайных значений одним блоком.
+    
+    Returns:
+        array.array с типом dtype
+    """
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        values = rng.integers(min_val, max_val, size=count, dtype=np.dtype(dtype), endpoint=True)
+        return array(dtype, values.tobytes())
+    
+    rng = random.Random(seed)
+    span = max_val - min_val + 1
+    raw_type = next((code for code in RAW_TYPECODES if span <= 1 << (array(code).itemsize * 8)), None)
+    if raw_type is None:
+        return array(dtype, (rng.randint(min_val, max_val) for _ in range(count)))
+    
+    itemsize = array(raw_type).itemsize
+    # Значения не меньше limit отбрасываются, чтобы остаток от деления был равномерным
+    limit = ((1 << (itemsize * 8)) // span) * span
+    values = array(dtype)
+    while len(values) < count:
+        raw = array(raw_type)
+        raw.frombytes(rng.randbytes((count - len(values)) * itemsize))
+        values.extend(value % span + min_val for value in raw if value < limit)
+    return values
+
+
+def generate_matrix(rows, cols, min_val=1, max_val=100, seed=None, workers=1, chunk_rows=None):
     """
     Генерирует случайную матрицу указанного размера.
     
@@ -14,11 +79,38 @@ def generate_matrix(rows, cols, min_val=1, max_val=100):
         cols: Количество столбцов
         min_val: Минимальное значение элемента
         max_val: Максимальное значение элемента
+        seed: Зерно генератора для воспроизводимого результата
+        workers: Количество процессов для параллельной генерации блоков
+        chunk_rows: Количество строк в блоке генерации
+            (по умолчанию около CHUNK_CELLS элементов)
         
     Returns:
-        Случайная матрица указанного размера
+        Случайная матрица указанного размера (Matrix)
+    
+    Raises:
+        ValueError: Если min_val больше max_val
     """
-    return [
-        [random.randint(min_val, max_val) for _ in range(cols)]
-        for _ in range(rows)
-    ]
\ No newline at end of file
+    if min_val > max_val:
+        raise ValueError("Минимальное значение больше максимального")
+    
+    dtype = fit_typecode(min_val, max_val)
+    if seed is None:
+        seed = random.getrandbits(64)
+    if chunk_rows is None:
+        chunk_rows = max(1, CHUNK_CELLS // max(cols, 1))
+    
+    tasks = [
+        (min(chunk_rows, rows - start) * cols, min_val, max_val, _chunk_seed(seed, index), dtype)
+        for index, start in enumerate(range(0, rows, chunk_rows))
+    ]
+    
+    data = array(dtype)
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk in pool.map(_generate_chunk, *zip(*tasks)):
+                data.extend(chunk)
+    else:
+        for task in tasks:
+            data.extend(_generate_chunk(*task))
+    
+    return Matrix(rows, cols, dtype, data)
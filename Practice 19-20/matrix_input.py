@@ -1,38 +1,155 @@
 """
 Модуль для ручного ввода матриц.
+
+Помимо интерактивного ввода по строкам поддерживается пакетная загрузка:
+load_matrix читает весь блок текста из потока (stdin или файла) за один
+вызов и разбирает его за один проход с проверкой размеров.
 """
 
+import itertools
+import sys
+from array import array
+from exceptions import InvalidInputError
+from matrix import Matrix, fit_typecode
+
+
+def parse_matrix(lines, rows=None, cols=None):
+    """
+    Разбирает строки текста в матрицу за один проход.
+    
+    Пустые строки пропускаются. Все ошибки собираются вместе с номерами
+    строк и сообщаются одним исключением после разбора.
+    
+    Args:
+        lines: Итерируемый объект со строками текста
+        rows: Ожидаемое количество строк матрицы (если известно)
+        cols: Ожидаемое количество столбцов; если не указано,
+            берется по первой непустой строке
+    
+    Returns:
+        Разобранная матрица (Matrix)
+    
+    Raises:
+        InvalidInputError: Если есть нечисловые значения или размеры не совпадают
+    """
+    data = array('q')
+    errors = []
+    row_count = 0
+    
+    for line_number, line in enumerate(lines, 1):
+        values = line.split()
+        if not values:
+            continue
+        row_count += 1
+        
+        if cols is None:
+            cols = len(values)
+        if len(values) != cols:
+            errors.append(f"строка {line_number}: ожидалось {cols} чисел, получено {len(values)}")
+            continue
+        
+        try:
+            data.extend(map(int, values))
+        except (ValueError, OverflowError):
+            errors.append(f"строка {line_number}: ожидались целые числа через пробел")
+    
+    if rows is not None and row_count != rows:
+        errors.append(f"ожидалось {rows} строк, получено {row_count}")
+    if row_count == 0 and not errors:
+        errors.append("матрица не содержит ни одной строки")
+    
+    if errors:
+        raise InvalidInputError("Ошибка ввода матрицы: " + "; ".join(errors))
+    
+    return _build_matrix(data, row_count, cols)
+
+
+def _build_matrix(data, rows, cols):
+    """Создает матрицу из буфера 'q', сужая тип элементов по диапазону значений."""
+    dtype = fit_typecode(min(data), max(data))
+    if dtype != 'q':
+        data = array(dtype, data)
+    return Matrix(rows, cols, dtype, data)
+
+
+def load_matrix(stream, rows=None, cols=None):
+    """
+    Загружает матрицу из потока одним блоком без интерактивных запросов.
+    
+    Если количество строк не указано, поток читается до конца одним
+    вызовом. Если указано, читается ровно rows непустых строк, а остаток потока
+    (например, следующие команды меню) остается непрочитанным.
+    
+    Args:
+        stream: Текстовый или двоичный поток (sys.stdin, открытый файл)
+            с элементами матрицы построчно через пробел
+        rows: Ожидаемое количество строк (если известно)
+        cols: Ожидаемое количество столбцов (если известно)
+    
+    Returns:
+        Загруженная матрица (Matrix)
+    
+    Raises:
+        InvalidInputError: Если данные некорректны (с номерами строк)
+    """
+    if rows is None:
+        lines = stream.read()
+        lines = (lines.decode('utf-8') if isinstance(lines, bytes) else lines).splitlines()
+    else:
+        lines = [line.decode('utf-8') if isinstance(line, bytes) else line
+                 # Пустые строки (например, разделитель после размеров) не считаются строками матрицы
+                 for line in itertools.islice((line for line in stream if line.strip()), rows)]
+    return parse_matrix(lines, rows, cols)
+
+
+def _input_size(prompt):
+    """Запрашивает положительный размер матрицы."""
+    value = input(prompt)
+    try:
+        size = int(value)
+    except ValueError:
+        size = 0
+    if size <= 0:
+        raise InvalidInputError(f"Размер матрицы должен быть положительным целым числом: {value!r}")
+    return size
+
 
 def input_matrix():
     """
     Обеспечивает ручной ввод матрицы от пользователя.
     
+    Если стандартный ввод не терминал (конвейер или файл), после размеров
+    строки матрицы читаются и разбираются одним блоком через load_matrix,
+    без запроса каждой строки отдельно.
+    
     Returns:
-        Матрица в виде списка списков чисел
-        
+        Введенная матрица (Matrix)
+    
     Raises:
-        ValueError: При вводе некорректных числовых значений
+        InvalidInputError: При некорректных размерах или, при неинтерактивном
+            вводе, некорректных элементах матрицы
     """
     print("\nРучной ввод матрицы")
-    rows = int(input("Введите количество строк: "))
-    cols = int(input("Введите количество столбцов: "))
+    rows = _input_size("Введите количество строк: ")
+    cols = _input_size("Введите количество столбцов: ")
     
-    matrix = []
+    if not sys.stdin.isatty():
+        return load_matrix(sys.stdin, rows, cols)
+    
+    data = array('q')
     print("Введите элементы матрицы построчно:")
     
     for i in range(rows):
         while True:
+            row_input = input(f"Строка {i+1} (через пробел): ")
             try:
-                row_input = input(f"Строка {i+1} (через пробел): ")
-                row = list(map(int, row_input.split()))
-                
-                if len(row) != cols:
-                    print(f"Ошибка: должно быть {cols} элементов")
-                    continue
-                    
-                matrix.append(row)
-                break
-            except ValueError:
-                print("Ошибка: введите целые числа через пробел")
-    
-    return matrix
\ No newline at end of file
+                row = parse_matrix([row_input], 1, cols)
+            except InvalidInputError:
+                print(f"Ошибка: введите {cols} целых чисел через пробел")
+                continue
+            
+            # Строка уже разобрана, поэтому ее элементы переносятся без повторного разбора
+            data.extend(row.data.tolist())
+            break
+    
+    return _build_matrix(data, rows, cols)
@@ -1,48 +1,565 @@
 """
 Модуль операций с матрицами.
 Содержит функции для выполнения матричных операций.
+
+Поворот выполняется одним из бэкендов:
+    python - срезы плоского буфера Matrix (работает всегда)
+    numpy - np.rot90 над непрерывным массивом (если установлен NumPy)
+Оба бэкенда дают одинаковый результат.
+
+Дополнительно поддерживаются блочные (tiled) ядра: поворот квадратной
+матрицы на месте и поворот прямоугольной матрицы в новый буфер по плиткам
+размером tile x tile, чтобы рабочий набор каждой плитки помещался в кэш.
+
+rotate_rows вычисляет только блок строк результата: так сервер может
+передавать большой результат клиенту по частям, не собирая его целиком.
+
+Долгий поворот можно прервать признаком отмены CancelToken: ядра
+проверяют его на границах полос столбцов и плиток, поэтому отмененный или
+просроченный запрос освобождает рабочий поток, не дожидаясь конца поворота.
 """
 
+import threading
+import time
+from array import array
+from exceptions import DeadlineExceededError, OperationCancelledError
+from matrix import Matrix
+
+try:
+    import numpy as np
+except ImportError:  # NumPy - необязательная зависимость
+    np = None
+
+
+# Размер стороны плитки для блочных ядер поворота
+DEFAULT_TILE = 64
+
+# Количество элементов, которое ядро поворота обрабатывает между проверками отмены
+CANCEL_CHECK_CELLS = 256 * 1024
+
+
+class CancelToken:
+    """
+    Признак отмены операции со сроком выполнения.
+    
+    Отмену выставляет владелец запроса вызовом cancel(), срок истекает сам.
+    При передаче в другой процесс сохраняется только срок: time.monotonic()
+    общий для процессов одной машины, а явная отмена туда не доходит.
+    
+    Attributes:
+        deadline (float): Срок выполнения по time.monotonic() или None
+    """
+    
+    __slots__ = ('deadline', '_event')
+    
+    def __init__(self, deadline=None):
+        self.deadline = deadline
+        self._event = threading.Event()
+    
+    def __reduce__(self):
+        return CancelToken, (self.deadline,)
+    
+    def cancel(self):
+        """Отменяет операцию."""
+        self._event.set()
+    
+    def error(self):
+        """
+        Возвращает исключение, которым прерывается операция.
+        
+        Returns:
+            OperationCancelledError: DeadlineExceededError, если срок истек,
+                OperationCancelledError, если операция отменена, иначе None
+        """
+        if self._event.is_set():
+            return OperationCancelledError("Операция отменена")
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return DeadlineExceededError("Срок выполнения операции истек")
+        return None
+    
+    def check(self):
+        """
+        Прерывает операцию, если она отменена или ее срок истек.
+        
+        Raises:
+            OperationCancelledError: Если операция отменена
+            DeadlineExceededError: Если срок выполнения истек
+        """
+        error = self.error()
+        if error is not None:
+            raise error
+    
+    def sleep(self, delay):
+        """
+        Ожидает delay секунд с досрочным выходом при отмене или истечении срока.
+        
+        Raises:
+            OperationCancelledError: Если операция отменена
+            DeadlineExceededError: Если срок выполнения истек
+        """
+        if self.deadline is not None:
+            delay = min(delay, max(0.0, self.deadline - time.monotonic()))
+        self._event.wait(delay)
+        self.check()
+
+
+def _check_step(rows):
+    """Количество столбцов исходной матрицы между проверками отмены."""
+    return max(1, CANCEL_CHECK_CELLS // max(rows, 1))
+
+
+def _rotate_python(matrix, clockwise, cancel=None):
+    """
+    Поворот на чистом Python.
+    
+    Каждая строка результата - это столбец исходной матрицы, который
+    извлекается из плоского буфера одним срезом с шагом cols.
+    """
+    rows, cols = matrix.shape
+    data = matrix.data
+    rotated = array(matrix.dtype)
+    step = _check_step(rows) if cancel is not None else cols
+    
+    if clockwise:
+        # Поворот по часовой стрелке: столбец j снизу вверх
+        last = (rows - 1) * cols
+        for j in range(cols):
+            if cancel is not None and j % step == 0:
+                cancel.check()
+            rotated.extend(data[last + j::-cols])
+    else:
+        # Поворот против часовой стрелки: столбцы справа налево сверху вниз
+        for k, j in enumerate(range(cols - 1, -1, -1)):
+            if cancel is not None and k % step == 0:
+                cancel.check()
+            rotated.extend(data[j::cols])
+    
+    return Matrix(cols, rows, matrix.dtype, rotated)
+
+
+def _rotate_numpy(matrix, clockwise, cancel=None):
+    """
+    Поворот через np.rot90 без копирования исходного буфера.
+    
+    С признаком отмены результат заполняется полосами строк, и отмена
+    проверяется перед каждой полосой.
+    """
+    source = np.frombuffer(matrix.data, dtype=matrix.dtype).reshape(matrix.shape)
+    if cancel is None:
+        rotated = np.ascontiguousarray(np.rot90(source, k=-1 if clockwise else 1))
+    else:
+        rows, cols = matrix.shape
+        step = _check_step(rows)
+        rotated = np.empty((cols, rows), dtype=matrix.dtype)
+        for start in range(0, cols, step):
+            cancel.check()
+            stop = min(start + step, cols)
+            if clockwise:
+                rotated[start:stop] = np.rot90(source[:, start:stop], k=-1)
+            else:
+                rotated[start:stop] = np.rot90(source[:, cols - stop:cols - start], k=1)
+    return Matrix(matrix.cols, matrix.rows, matrix.dtype, array(matrix.dtype, rotated.tobytes()))
+
+
+def _rotate_tiled(matrix, clockwise, tile=DEFAULT_TILE, cancel=None):
+    """
+    Блочный поворот прямоугольной матрицы в новый буфер.
+    
+    Исходная матрица обходится плитками tile x tile; каждая плитка целиком
+    переносится в результат отрезками столбцов, поэтому чтение и запись
+    затрагивают ограниченный участок памяти.
+    """
+    rows, cols = matrix.shape
+    data = matrix.data
+    rotated = Matrix(cols, rows, matrix.dtype)
+    out = rotated.data
+    
+    for i0 in range(0, rows, tile):
+        i1 = min(i0 + tile, rows)
+        for j0 in range(0, cols, tile):
+            j1 = min(j0 + tile, cols)
+            if cancel is not None:
+                cancel.check()
+            for j in range(j0, j1):
+                if clockwise:
+                    # Строка j результата: столбец j снизу вверх
+                    stop = (i0 - 1) * cols + j if i0 else None
+                    start = j * rows + rows - i1
+                    out[start:start + i1 - i0] = data[(i1 - 1) * cols + j:stop:-cols]
+                else:
+                    # Строка cols-1-j результата: столбец j сверху вниз
+                    start = (cols - 1 - j) * rows + i0
+                    out[start:start + i1 - i0] = data[i0 * cols + j:i1 * cols + j:cols]
+    
+    return rotated
+
+
+def _rotate_inplace(matrix, clockwise, tile=DEFAULT_TILE):
+    """
+    Поворот квадратной матрицы на месте четверными перестановками.
+    
+    Каждый элемент левой верхней четверти образует цикл из четырех позиций
+    (A - верх, B - лево, C - низ, D - право). Четверть обходится плитками,
+    и для каждой строки плитки цикл выполняется срезами буфера, так что
+    дополнительная память ограничена одной строкой плитки.
+    """
+    n = matrix.rows
+    data = matrix.data
+    
+    for i0 in range(0, n // 2, tile):
+        i1 = min(i0 + tile, n // 2)
+        for j0 in range(0, (n + 1) // 2, tile):
+            j1 = min(j0 + tile, (n + 1) // 2)
+            for i in range(i0, i1):
+                top = slice(i * n + j0, i * n + j1)
+                left = slice((n - 1 - j0) * n + i, (n - 1 - j1) * n + i, -n)
+                bottom = slice((n - 1 - i) * n + n - 1 - j0, (n - 1 - i) * n + n - 1 - j1, -1)
+                right = slice(j0 * n + n - 1 - i, j1 * n + n - 1 - i, n)
+                
+                saved = data[top]
+                if clockwise:
+                    data[top] = data[left]
+                    data[left] = data[bottom]
+                    data[bottom] = data[right]
+                    data[right] = saved
+                else:
+                    data[top] = data[right]
+                    data[right] = data[bottom]
+                    data[bottom] = data[left]
+                    data[left] = saved
+    
+    return matrix
+
+
+def _rotate_stack_python(stack, count, rows, cols, clockwise):
+    """
+    Поворот пачки матриц, уложенных подряд в один буфер, на чистом Python.
+    
+    Элемент (i, j) всех матриц пачки лежит в буфере с шагом rows * cols,
+    поэтому один срез переносит его сразу для всей пачки: число операций
+    равно rows * cols и не зависит от количества матриц.
+    """
+    size = rows * cols
+    rotated = array(stack.typecode, [0]) * len(stack)
+    
+    for i in range(rows):
+        for j in range(cols):
+            if clockwise:
+                target = j * rows + rows - 1 - i
+            else:
+                target = (cols - 1 - j) * rows + i
+            rotated[target::size] = stack[i * cols + j::size]
+    
+    return rotated
+
+
+def _rotate_stack_numpy(stack, count, rows, cols, clockwise):
+    """
+    Поворот пачки матриц одним вызовом np.rot90 по осям (1, 2).
+    """
+    source = np.frombuffer(stack, dtype=stack.typecode).reshape(count, rows, cols)
+    rotated = np.ascontiguousarray(np.rot90(source, k=-1 if clockwise else 1, axes=(1, 2)))
+    return array(stack.typecode, rotated.tobytes())
+
+
+def _rotate_rows_python(matrix, clockwise, start, stop, cancel=None):
+    """
+    Строки start..stop-1 повернутой матрицы на чистом Python.
+    
+    Строка результата - столбец исходной матрицы, поэтому блок строк
+    собирается теми же срезами с шагом cols, что и полный поворот.
+    """
+    rows, cols = matrix.shape
+    data = matrix.data
+    block = array(matrix.dtype)
+    step = _check_step(rows) if cancel is not None else stop - start
+    
+    if clockwise:
+        last = (rows - 1) * cols
+        for j in range(start, stop):
+            if cancel is not None and (j - start) % step == 0:
+                cancel.check()
+            block.extend(data[last + j::-cols])
+    else:
+        for k, j in enumerate(range(cols - 1 - start, cols - 1 - stop, -1)):
+            if cancel is not None and k % step == 0:
+                cancel.check()
+            block.extend(data[j::cols])
+    
+    return Matrix(stop - start, rows, matrix.dtype, block)
+
+
+def _rotate_rows_numpy(matrix, clockwise, start, stop, cancel=None):
+    """
+    Строки start..stop-1 повернутой матрицы через np.rot90 над полосой столбцов.
+    
+    Полоса поворачивается одним вызовом, поэтому отмена проверяется перед ним.
+    """
+    if cancel is not None:
+        cancel.check()
+    cols = matrix.cols
+    source = np.frombuffer(matrix.data, dtype=matrix.dtype).reshape(matrix.shape)
+    if clockwise:
+        band = np.rot90(source[:, start:stop], k=-1)
+    else:
+        band = np.rot90(source[:, cols - stop:cols - start], k=1)
+    block = np.ascontiguousarray(band)
+    return Matrix(stop - start, matrix.rows, matrix.dtype, array(matrix.dtype, block.tobytes()))
+
+
+# Реестр бэкендов поворота
+BACKENDS = {
+    'python': _rotate_python,
+    'numpy': _rotate_numpy,
+}
+
+# Ядра поворота пачки матриц для каждого бэкенда
+STACK_BACKENDS = {
+    'python': _rotate_stack_python,
+    'numpy': _rotate_stack_numpy,
+}
 
-def rotate_matrix(matrix, direction):
+# Ядра вычисления блока строк результата для каждого бэкенда
+ROWS_BACKENDS = {
+    'python': _rotate_rows_python,
+    'numpy': _rotate_rows_numpy,
+}
+
+
+def available_backends():
+    """
+    Возвращает список бэкендов, которые можно использовать в текущем окружении.
+    """
+    if np is None:
+        return ['python']
+    return list(BACKENDS)
+
+
+def resolve_backend(backend='auto'):
+    """
+    Выбирает бэкенд поворота по имени.
+    
+    Args:
+        backend: 'auto' (numpy, если установлен, иначе python), 'python' или 'numpy'
+    
+    Returns:
+        Имя выбранного бэкенда
+    
+    Raises:
+        ValueError: Если бэкенд неизвестен или недоступен
+    """
+    if backend in (None, 'auto'):
+        return 'numpy' if np is not None else 'python'
+    if backend not in BACKENDS:
+        raise ValueError(f"Неизвестный бэкенд поворота: {backend}")
+    if backend not in available_backends():
+        raise ValueError(f"Бэкенд {backend} недоступен: NumPy не установлен")
+    return backend
+
+
+def rotate_matrix(matrix, direction, backend='auto', inplace=False, tile=None, cancel=None):
     """
     Поворачивает матрицу на 90 градусов в указанном направлении.
     
     Args:
-        matrix: Исходная матрица в виде списка списков
+        matrix: Исходная матрица (Matrix или список списков)
         direction: Направление поворота - 'clockwise' или 'counterclockwise'
+        backend: Бэкенд поворота - 'auto', 'python' или 'numpy'
+        inplace: Повернуть квадратную Matrix на месте, без второго буфера
+        tile: Размер плитки; если указан, используется блочное ядро
+            (для inplace по умолчанию DEFAULT_TILE)
+        cancel: Признак отмены CancelToken; поворот на месте его не проверяет,
+            так как прерванный поворот оставил бы матрицу испорченной
     
     Returns:
-        Повернутая матрица
+        Повернутая матрица (Matrix); при inplace=True - та же самая матрица
     
     Raises:
-        ValueError: Если направление поворота некорректно
+        ValueError: Если направление поворота или бэкенд некорректны,
+            либо поворот на месте запрошен для неквадратной матрицы
+        OperationCancelledError: Если поворот отменен или его срок истек
     """
-    if not matrix:
+    kernel = BACKENDS[resolve_backend(backend)]
+    
+    if direction not in ('clockwise', 'counterclockwise'):
+        raise ValueError("Некорректное направление поворота")
+    clockwise = direction == 'clockwise'
+    
+    if inplace:
+        if not isinstance(matrix, Matrix) or matrix.rows != matrix.cols:
+            raise ValueError("Поворот на месте возможен только для квадратной матрицы Matrix")
+        return _rotate_inplace(matrix, clockwise, tile or DEFAULT_TILE)
+    
+    matrix = Matrix.coerce(matrix)
+    if not matrix.rows or not matrix.cols:
+        return Matrix(matrix.cols, matrix.rows, matrix.dtype)
+    
+    if tile is not None:
+        return _rotate_tiled(matrix, clockwise, tile, cancel)
+    return kernel(matrix, clockwise, cancel)
+
+
+def rotate_rows(matrix, direction, start, stop, backend='auto', cancel=None):
+    """
+    Вычисляет строки start..stop-1 матрицы, повернутой на 90 градусов.
+    
+    Склейка блоков по всем строкам дает тот же результат, что и rotate_matrix.
+    
+    Args:
+        matrix: Исходная матрица (Matrix или список списков)
+        direction: Направление поворота - 'clockwise' или 'counterclockwise'
+        start: Первая строка блока в повернутой матрице
+        stop: Строка, следующая за последней строкой блока
+        backend: Бэкенд поворота - 'auto', 'python' или 'numpy'
+        cancel: Признак отмены CancelToken
+    
+    Returns:
+        Блок строк повернутой матрицы (Matrix размером (stop - start) x rows)
+    
+    Raises:
+        ValueError: Если направление, бэкенд или границы блока некорректны
+        OperationCancelledError: Если вычисление отменено или его срок истек
+    """
+    kernel = ROWS_BACKENDS[resolve_backend(backend)]
+    
+    if direction not in ('clockwise', 'counterclockwise'):
+        raise ValueError("Некорректное направление поворота")
+    matrix = Matrix.coerce(matrix)
+    if not 0 <= start <= stop <= matrix.cols:
+        raise ValueError(f"Некорректный блок строк {start}:{stop} для результата из {matrix.cols} строк")
+    if start == stop or not matrix:
+        return Matrix(stop - start, matrix.rows, matrix.dtype)
+    return kernel(matrix, direction == 'clockwise', start, stop, cancel)
+
+
+def rotate_stack(matrices, direction, backend='auto'):
+    """
+    Поворачивает пачку матриц одинакового размера и типа за один проход.
+    
+    Матрицы укладываются подряд в один непрерывный буфер (трехмерный массив
+    count x rows x cols), который поворачивается одним вызовом ядра,
+    после чего результат разрезается обратно на отдельные матрицы.
+    Для пачек из многих маленьких матриц это убирает накладные расходы
+    на каждую матрицу.
+    
+    Args:
+        matrices: Список матриц (Matrix) одинакового размера и типа
+        direction: Направление поворота - 'clockwise' или 'counterclockwise'
+        backend: Бэкенд поворота - 'auto', 'python' или 'numpy'
+    
+    Returns:
+        Список повернутых матриц (Matrix) в том же порядке
+    
+    Raises:
+        ValueError: Если направление некорректно или матрицы различаются
+            размером или типом элементов
+    """
+    backend = resolve_backend(backend)
+    
+    if direction not in ('clockwise', 'counterclockwise'):
+        raise ValueError("Некорректное направление поворота")
+    clockwise = direction == 'clockwise'
+    
+    if not matrices:
         return []
+    first = matrices[0]
+    rows, cols, dtype = first.rows, first.cols, first.dtype
+    if any(m.shape != (rows, cols) or m.dtype != dtype for m in matrices):
+        raise ValueError("Матрицы пачки должны иметь одинаковый размер и тип элементов")
     
-    rows = len(matrix)
-    cols = len(matrix[0])
+    size = rows * cols
+    count = len(matrices)
+    if size == 0:
+        return [Matrix(cols, rows, dtype) for _ in matrices]
+    if backend == 'python' and rows > count:
+        # Для крупных матриц срезы по столбцам дешевле поэлементных срезов пачки
+        return [_rotate_python(m, clockwise) for m in matrices]
     
-    if direction == 'clockwise':
-        # Поворот по часовой стрелке
-        rotated = []
-        for j in range(cols):
-            new_row = []
-            for i in range(rows-1, -1, -1):
-                new_row.append(matrix[i][j])
-            rotated.append(new_row)
-        return rotated
-    
-    elif direction == 'counterclockwise':
-        # Поворот против часовой стрелки
-        rotated = []
-        for j in range(cols-1, -1, -1):
-            new_row = []
-            for i in range(rows):
-                new_row.append(matrix[i][j])
-            rotated.append(new_row)
-        return rotated
+    stack = array(dtype)
+    for m in matrices:
+        stack.extend(m.data)
+    rotated = STACK_BACKENDS[backend](stack, count, rows, cols, clockwise)
     
-    else:
-        raise ValueError("Некорректное направление поворота")
\ No newline at end of file
+    return [Matrix(cols, rows, dtype, rotated[k * size:(k + 1) * size]) for k in range(count)]
+
+
+def execute_operation(operation, matrix, direction, backend='auto', delay=0.0, cancel=None):
+    """
+    Выполняет матричную операцию в рабочем потоке или процессе сервера.
+    
+    Функция определена на уровне модуля и не имеет побочных эффектов
+    при импорте, поэтому подходит и для пула процессов.
+    
+    Args:
+        operation: Название операции (поддерживается 'rotate')
+        matrix: Исходная матрица (Matrix)
+        direction: Направление поворота
+        backend: Бэкенд поворота
+        delay: Эмулируемое время вычислений в секундах
+        cancel: Признак отмены CancelToken
+    
+    Returns:
+        Результат операции (Matrix)
+    
+    Raises:
+        ValueError: Если операция не поддерживается
+        OperationCancelledError: Если операция отменена или ее срок истек
+    """
+    if cancel is not None:
+        cancel.sleep(delay)
+    elif delay:
+        time.sleep(delay)  # I/O операция - GIL освобождается
+    
+    if operation == 'rotate':
+        return rotate_matrix(matrix, direction, backend, cancel=cancel)
+    raise ValueError(f"Неподдерживаемая операция: {operation}")
+
+
+def execute_rows(operation, matrix, direction, start, stop, backend='auto', delay=0.0, cancel=None):
+    """
+    Вычисляет блок строк результата операции в рабочем потоке или процессе сервера.
+    
+    Args:
+        operation: Название операции (поддерживается 'rotate')
+        matrix: Исходная матрица (Matrix)
+        direction: Направление поворота
+        start: Первая строка блока результата
+        stop: Строка, следующая за последней строкой блока
+        backend: Бэкенд поворота
+        delay: Эмулируемое время вычислений в секундах
+        cancel: Признак отмены CancelToken
+    
+    Returns:
+        Блок строк результата (Matrix)
+    
+    Raises:
+        ValueError: Если операция не поддерживается
+        OperationCancelledError: Если вычисление отменено или его срок истек
+    """
+    if cancel is not None:
+        cancel.sleep(delay)
+    elif delay:
+        time.sleep(delay)  # I/O операция - GIL освобождается
+    
+    if operation == 'rotate':
+        return rotate_rows(matrix, direction, start, stop, backend, cancel)
+    raise ValueError(f"Неподдерживаемая операция: {operation}")
+
+
+def execute_batch(matrices, direction, backend='auto', delay=0.0):
+    """
+    Выполняет поворот пачки матриц в рабочем потоке или процессе сервера.
+    
+    Args:
+        matrices: Список матриц (Matrix) одинакового размера и типа
+        direction: Направление поворота
+        backend: Бэкенд поворота
+        delay: Эмулируемое время вычислений пачки в секундах
+    
+    Returns:
+        Список повернутых матриц (Matrix)
+    """
+    if delay:
+        time.sleep(delay)  # I/O операция - GIL освобождается
+    
+    return rotate_stack(matrices, direction, backend)
@@ -0,0 +1,426 @@
+"""
+Модуль метрик сервера матричных операций.
+
+Реестр MetricsRegistry хранит инструменты трех видов:
+    Counter   - монотонный счетчик (запросы, ошибки, байты)
+    Gauge     - текущее значение (запросы в работе, глубина очереди)
+    Histogram - распределение по фиксированным логарифмическим корзинам
+                (задержки), из которого оцениваются p50/p90/p99
+
+Каждый инструмент разбит на шарды по потокам: поток пишет только в
+собственный шард без блокировок, а снимок snapshot() суммирует шарды.
+Шард завершившегося потока переносится в общий итог инструмента, поэтому
+число шардов не растет при смене рабочих потоков.
+Метки (например, operation или status) задаются кортежем значений.
+
+Снимок можно периодически выгружать в текстовом формате Prometheus
+в локальный файл (PrometheusFileExporter) или отдавать по HTTP
+на localhost (start_http_server). Снимки нескольких серверов (например,
+шардов в разных процессах) объединяются функцией merge_snapshots.
+"""
+
+import bisect
+import itertools
+import os
+import threading
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Границы корзин задержек в секундах: от 10 мкс до ~168 с с шагом x2
+LATENCY_BUCKETS = tuple(1e-5 * 2 ** k for k in range(25))
+
+# Квантили, которые оцениваются по гистограммам в снимке
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class _ShardOwner:
+    """Владелец шарда в данных потока; удаляется вместе с потоком."""
+    
+    __slots__ = ('shard', '__weakref__')
+    
+    def __init__(self):
+        self.shard = {}
+
+
+class _Instrument:
+    """
+    Базовый класс инструмента с шардами по потокам.
+    
+    Шард потока создается при первой записи и регистрируется в общем
+    словаре под блокировкой; дальнейшие записи блокировок не требуют.
+    Когда поток завершается, его данные threading.local удаляются, и
+    финализатор владельца переносит шард в итог завершившихся потоков.
+    """
+    
+    kind = None
+    
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = {}
+        self._retired = {}
+        self._ids = itertools.count()
+        # Финализатор может сработать в любом потоке, поэтому блокировка повторно входимая
+        self._lock = threading.RLock()
+    
+    @staticmethod
+    def _merge(total, value):
+        """Добавляет значение шарда к итогу (None - итога еще нет)."""
+        return (total or 0) + value
+    
+    def _shard(self):
+        """Возвращает шард текущего потока."""
+        owner = getattr(self._local, 'owner', None)
+        if owner is None:
+            owner = self._local.owner = _ShardOwner()
+            shard_id = next(self._ids)
+            with self._lock:
+                self._shards[shard_id] = owner.shard
+            weakref.finalize(owner, self._retire, shard_id)
+        return owner.shard
+    
+    def _retire(self, shard_id):
+        """Переносит шард завершившегося потока в итог завершившихся потоков."""
+        with self._lock:
+            shard = self._shards.pop(shard_id)
+            for labels, value in shard.items():
+                self._retired[labels] = self._merge(self._retired.get(labels), value)
+    
+    def _check_labels(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"Метрика {self.name} ожидает метки {self.labelnames}")
+    
+    def _merged(self):
+        """Объединяет итог завершившихся потоков и шарды работающих функцией _merge."""
+        with self._lock:
+            shards = list(self._shards.values())
+            total = {labels: self._merge(None, value) for labels, value in self._retired.items()}
+        for shard in shards:
+            # Копия защищает от изменения словаря потоком-владельцем во время обхода
+            for labels, value in list(shard.items()):
+                total[labels] = self._merge(total.get(labels), value)
+        return total
+
+
+class Counter(_Instrument):
+    """Монотонно возрастающий счетчик."""
+    
+    kind = 'counter'
+    
+    def inc(self, amount=1, *labels):
+        """Увеличивает счетчик с заданными значениями меток."""
+        self._check_labels(labels)
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+    
+    def values(self):
+        """Возвращает словарь {значения меток: сумма по шардам}."""
+        return self._merged()
+    
+    def total(self, **match):
+        """Сумма счетчика по всем меткам, совпадающим с match."""
+        indexes = [(self.labelnames.index(name), value) for name, value in match.items()]
+        return sum(value for labels, value in self.values().items()
+                   if all(labels[i] in (wanted if isinstance(wanted, tuple) else (wanted,))
+                          for i, wanted in indexes))
+
+
+class Gauge(_Instrument):
+    """
+    Текущее значение.
+    
+    Значение либо накапливается через inc/dec (сумма шардов), либо
+    вычисляется функцией при снятии снимка (set_function).
+    """
+    
+    kind = 'gauge'
+    
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._function = None
+    
+    def inc(self, amount=1, *labels):
+        self._check_labels(labels)
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+    
+    def dec(self, amount=1, *labels):
+        self.inc(-amount, *labels)
+    
+    def set_function(self, function):
+        """Задает функцию без аргументов, возвращающую значение датчика."""
+        self._function = function
+    
+    def values(self):
+        if self._function is not None:
+            return {(): self._function()}
+        return self._merged()
+
+
+class Histogram(_Instrument):
+    """
+    Гистограмма с фиксированными границами корзин.
+    
+    Шард хранит для каждого набора меток список [счетчики корзин, сумма,
+    количество]; последняя корзина считает значения выше верхней границы.
+    """
+    
+    kind = 'histogram'
+    
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+    
+    def observe(self, value, *labels):
+        """Учитывает одно наблюдение."""
+        self._check_labels(labels)
+        shard = self._shard()
+        state = shard.get(labels)
+        if state is None:
+            state = shard[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+    
+    @staticmethod
+    def _merge(total, value):
+        counts, total_sum, count = value
+        if total is None:
+            return list(counts), total_sum, count
+        return [a + b for a, b in zip(total[0], counts)], total[1] + total_sum, total[2] + count
+    
+    def values(self):
+        """Возвращает словарь {значения меток: (счетчики корзин, сумма, количество)}."""
+        return self._merged()
+    
+    def quantile(self, q, counts):
+        """
+        Оценивает квантиль по счетчикам корзин линейной интерполяцией.
+        
+        Args:
+            q (float): Квантиль от 0 до 1
+            counts (list): Счетчики корзин из values()
+        
+        Returns:
+            float: Оценка квантиля или None, если наблюдений нет
+        """
+        return bucket_quantile(self.buckets, counts, q)
+
+
+def bucket_quantile(bounds, counts, q):
+    """Оценивает квантиль q по счетчикам корзин с границами bounds."""
+    total = sum(counts)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for index, count in enumerate(counts):
+        if seen + count >= rank and count:
+            if index == len(bounds):
+                return bounds[-1]
+            lower = bounds[index - 1] if index else 0.0
+            upper = bounds[index]
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+    return bounds[-1]
+
+
+class MetricsRegistry:
+    """Реестр инструментов метрик сервера."""
+    
+    def __init__(self):
+        self._instruments = {}
+        self._lock = threading.Lock()
+    
+    def _register(self, instrument):
+        with self._lock:
+            if instrument.name in self._instruments:
+                raise ValueError(f"Метрика {instrument.name} уже зарегистрирована")
+            self._instruments[instrument.name] = instrument
+        return instrument
+    
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+    
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+    
+    def snapshot(self):
+        """
+        Снимает текущие значения всех инструментов.
+        
+        Returns:
+            dict: {имя метрики: {'type', 'labels', 'values'}}; для гистограмм
+                значение - словарь с count, sum, buckets и оценками квантилей
+        """
+        with self._lock:
+            instruments = list(self._instruments.values())
+        
+        snapshot = {}
+        for instrument in instruments:
+            values = {}
+            for labels, value in instrument.values().items():
+                if instrument.kind == 'histogram':
+                    counts, total_sum, count = value
+                    value = {
+                        'count': count,
+                        'sum': total_sum,
+                        'buckets': counts,
+                        'quantiles': {q: instrument.quantile(q, counts) for q in QUANTILES},
+                    }
+                values[labels] = value
+            snapshot[instrument.name] = {
+                'type': instrument.kind,
+                'help': instrument.documentation,
+                'labels': instrument.labelnames,
+                'values': values,
+            }
+            if instrument.kind == 'histogram':
+                snapshot[instrument.name]['bounds'] = instrument.buckets
+        return snapshot
+    
+    def to_prometheus(self):
+        """Формирует снимок в текстовом формате экспозиции Prometheus."""
+        return format_prometheus(self.snapshot())
+
+
+def format_prometheus(snapshot):
+    """Форматирует снимок метрик в текстовом формате экспозиции Prometheus."""
+    lines = []
+    for name, metric in snapshot.items():
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for labels, value in sorted(metric['values'].items(), key=lambda item: str(item[0])):
+            pairs = list(zip(metric['labels'], labels))
+            if metric['type'] != 'histogram':
+                lines.append(f"{name}{_format_labels(pairs)} {value}")
+                continue
+            cumulative = 0
+            for bound, count in zip(metric['bounds'] + ('+Inf',), value['buckets']):
+                cumulative += count
+                le = bound if bound == '+Inf' else repr(float(bound))
+                lines.append(f"{name}_bucket{_format_labels(pairs + [('le', le)])} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(pairs)} {value['sum']}")
+            lines.append(f"{name}_count{_format_labels(pairs)} {value['count']}")
+    return '\n'.join(lines) + '\n'
+
+
+def merge_snapshots(snapshots):
+    """
+    Объединяет снимки нескольких реестров с одинаковым набором метрик.
+    
+    Счетчики и датчики складываются, у гистограмм складываются корзины,
+    суммы и количества, а квантили оцениваются заново по общим корзинам.
+    
+    Args:
+        snapshots (list): Снимки MetricsRegistry.snapshot()
+    
+    Returns:
+        dict: Объединенный снимок в том же формате
+    """
+    merged = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.get(name)
+            if target is None:
+                target = merged[name] = dict(metric, values={})
+            values = target['values']
+            for labels, value in metric['values'].items():
+                current = values.get(labels)
+                if metric['type'] != 'histogram':
+                    values[labels] = (current or 0) + value
+                elif current is None:
+                    values[labels] = dict(value, buckets=list(value['buckets']))
+                else:
+                    current['buckets'] = [a + b for a, b in zip(current['buckets'], value['buckets'])]
+                    current['sum'] += value['sum']
+                    current['count'] += value['count']
+    
+    for metric in merged.values():
+        if metric['type'] == 'histogram':
+            for value in metric['values'].values():
+                value['quantiles'] = {q: bucket_quantile(metric['bounds'], value['buckets'], q)
+                                      for q in QUANTILES}
+    return merged
+
+
+def _format_labels(pairs):
+    """Форматирует метки Prometheus: {name="value",...}."""
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class PrometheusFileExporter:
+    """
+    Периодически записывает метрики в файл в формате Prometheus.
+    
+    Файл заменяется атомарно (запись во временный файл и os.replace),
+    поэтому читатель никогда не видит частично записанный снимок.
+    """
+    
+    def __init__(self, registry, path, interval=10.0):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="MetricsFileExporter", daemon=True)
+    
+    def start(self):
+        self._thread.start()
+        return self
+    
+    def export(self):
+        """Записывает текущий снимок в файл."""
+        temporary = f"{self.path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as file:
+            file.write(self.registry.to_prometheus())
+        os.replace(temporary, self.path)
+    
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.export()
+    
+    def stop(self):
+        """Останавливает выгрузку, записав последний снимок."""
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.export()
+
+
+def start_http_server(registry, port, host='127.0.0.1'):
+    """
+    Запускает HTTP-сервер с метриками по адресу http://host:port/metrics.
+    
+    Returns:
+        ThreadingHTTPServer: Сервер; остановка - shutdown() и server_close()
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.to_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            # Запросы к метрикам не засоряют консоль демонстрации
+            pass
+    
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="MetricsHTTPServer", daemon=True).start()
+    return server
@@ -0,0 +1,309 @@
+"""
+Модуль двоичного протокола обмена матрицами.
+
+Каждое сообщение (кадр) состоит из заголовка фиксированной длины,
+имени клиента и полезной нагрузки. Запросы и ответы имеют одинаковый формат.
+
+Заголовок (HEADER_SIZE байт, little-endian):
+    magic       - 4 байта b'MXRP'
+    version     - 1 байт, версия протокола
+    op          - 1 байт, код операции (OP_ROTATE, OP_RESULT, OP_ERROR)
+    direction   - 1 байт, направление поворота (0 - не задано)
+    dtype       - 1 байт, код типа элементов array.array фиксированного размера
+    name_len    - 2 байта, длина имени клиента в UTF-8
+    rows, cols  - по 8 байт, размеры матрицы
+    request_id  - 8 байт, идентификатор запроса, повторяемый в ответе
+    payload_len - 8 байт, длина полезной нагрузки
+
+Полезная нагрузка - элементы матрицы по строкам в little-endian
+(для OP_ROTATE и OP_RESULT) или текст ошибки в UTF-8 (для OP_ERROR).
+
+Кодирование не копирует буфер матрицы: кадр - это список из заголовка и
+memoryview над Matrix.data, который уходит в сокет через sendmsg.
+Декодер FrameDecoder выдает для recv_into участки заранее выделенных
+буферов, и элементы матрицы записываются прямо в array.array результата.
+"""
+
+import struct
+import sys
+from array import array
+from matrix import Matrix
+
+
+MAGIC = b'MXRP'
+VERSION = 1
+HEADER = struct.Struct('<4sBBBcH6xQQQQ')
+HEADER_SIZE = HEADER.size
+
+# Коды операций
+OP_ROTATE = 1
+OP_RESULT = 2
+OP_ERROR = 3
+OPERATIONS = (OP_ROTATE, OP_RESULT, OP_ERROR)
+
+# Коды направлений поворота
+DIRECTIONS = {'clockwise': 1, 'counterclockwise': 2}
+DIRECTION_NAMES = {code: name for name, code in DIRECTIONS.items()}
+
+# Типы элементов, которые можно передавать в кадре: только коды
+# фиксированного размера, одинакового на всех платформах
+DTYPES = frozenset('bBhHiIqQfd')
+
+# Коды, размер которых зависит от платформы, и их аналоги фиксированного
+# размера с тем же представлением в памяти
+WIRE_DTYPES = {
+    'l': 'i' if array('l').itemsize == array('i').itemsize else 'q',
+    'L': 'I' if array('L').itemsize == array('I').itemsize else 'Q',
+}
+
+# Предельный размер полезной нагрузки кадра по умолчанию: буфер выделяется
+# по заголовку до получения данных, поэтому предел ограничивает память,
+# которую может занять одно соединение
+MAX_PAYLOAD = 256 * 1024 * 1024
+
+
+class ProtocolError(ValueError):
+    """Исключение для кадров, нарушающих формат протокола."""
+    pass
+
+
+class Frame:
+    """
+    Декодированный кадр протокола.
+
+    Attributes:
+        op (int): Код операции
+        request_id (int): Идентификатор запроса
+        direction (str): Направление поворота или None
+        client_name (str): Имя клиента (может быть пустым)
+        matrix (Matrix): Матрица из кадра OP_ROTATE или OP_RESULT
+        error (str): Текст ошибки из кадра OP_ERROR
+    """
+
+    __slots__ = ('op', 'request_id', 'direction', 'client_name', 'matrix', 'error')
+
+    def __init__(self, op, request_id, direction=None, client_name='', matrix=None, error=None):
+        self.op = op
+        self.request_id = request_id
+        self.direction = direction
+        self.client_name = client_name
+        self.matrix = matrix
+        self.error = error
+
+    def __repr__(self):
+        return f"Frame(op={self.op}, request_id={self.request_id}, direction={self.direction!r})"
+
+
+def _payload_view(matrix):
+    """Байтовое представление буфера матрицы в little-endian."""
+    data = matrix.data
+    if sys.byteorder != 'little':
+        data = array(matrix.dtype, data)
+        data.byteswap()
+    return memoryview(data).cast('B')
+
+
+def encode_frame(op, request_id=0, matrix=None, direction=None, client_name='', error=None):
+    """
+    Кодирует кадр протокола.
+
+    Args:
+        op (int): Код операции
+        request_id (int): Идентификатор запроса
+        matrix (Matrix): Матрица для OP_ROTATE и OP_RESULT
+        direction (str): Направление поворота для OP_ROTATE
+        client_name (str): Имя клиента
+        error (str): Текст ошибки для OP_ERROR
+
+    Returns:
+        list: Буферы кадра для sendmsg или transport.writelines:
+            заголовок с именем клиента и полезная нагрузка
+    """
+    name = client_name.encode('utf-8')
+    if matrix is not None:
+        matrix = Matrix.coerce(matrix)
+        payload = _payload_view(matrix)
+        dtype, rows, cols = WIRE_DTYPES.get(matrix.dtype, matrix.dtype), matrix.rows, matrix.cols
+    else:
+        payload = (error or '').encode('utf-8')
+        dtype, rows, cols = 'B', 0, 0
+
+    header = HEADER.pack(MAGIC, VERSION, op, DIRECTIONS.get(direction, 0), dtype.encode('ascii'),
+                         len(name), rows, cols, request_id, len(payload))
+    return [header + name, payload]
+
+
+def encode_request(matrix, direction, request_id=0, client_name=''):
+    """Кодирует запрос на поворот матрицы."""
+    return encode_frame(OP_ROTATE, request_id, matrix, direction, client_name)
+
+
+def encode_result(matrix, request_id=0):
+    """Кодирует ответ с повернутой матрицей."""
+    return encode_frame(OP_RESULT, request_id, matrix)
+
+
+def encode_error(message, request_id=0):
+    """Кодирует ответ с сообщением об ошибке."""
+    return encode_frame(OP_ERROR, request_id, error=message)
+
+
+class FrameDecoder:
+    """
+    Пошаговый декодер кадров для чтения через recv_into.
+
+    Декодер по очереди заполняет заголовок, имя клиента и полезную
+    нагрузку. buffer() возвращает memoryview над еще не заполненной частью
+    текущего буфера, advance(n) сообщает, сколько байт в нее записано.
+    Буфер полезной нагрузки матрицы - это сам array.array результата,
+    поэтому при декодировании данные не копируются.
+
+    Attributes:
+        max_payload (int): Предельный размер полезной нагрузки в байтах
+    """
+
+    def __init__(self, max_payload=MAX_PAYLOAD):
+        self.max_payload = max_payload
+        self._header = bytearray(HEADER_SIZE)
+        self._reset()
+
+    def _reset(self):
+        """Подготавливает декодер к чтению следующего кадра."""
+        self._fields = None
+        self._name = None
+        self._payload = None
+        self._stage = 'header'
+        self._view = memoryview(self._header)
+        self._filled = 0
+
+    @property
+    def at_boundary(self):
+        """True, если декодер находится на границе кадров."""
+        return self._stage == 'header' and self._filled == 0
+
+    def buffer(self):
+        """Возвращает незаполненную часть текущего буфера."""
+        return self._view[self._filled:]
+
+    def advance(self, nbytes):
+        """
+        Учитывает nbytes байт, записанных в buffer().
+
+        Returns:
+            Frame: Декодированный кадр, если он получен целиком, иначе None
+
+        Raises:
+            ProtocolError: Если заголовок кадра некорректен
+        """
+        self._filled += nbytes
+        if self._filled < len(self._view):
+            return None
+
+        if self._stage == 'header':
+            self._parse_header()
+            self._stage = 'name'
+            self._view = memoryview(self._name)
+            self._filled = 0
+            if self._view:
+                return None
+        if self._stage == 'name':
+            self._stage = 'payload'
+            self._view = memoryview(self._payload).cast('B')
+            self._filled = 0
+            if self._view:
+                return None
+        return self._finish()
+
+    def _parse_header(self):
+        """Проверяет заголовок и выделяет буферы имени и полезной нагрузки."""
+        (magic, version, op, direction, dtype, name_len,
+         rows, cols, request_id, payload_len) = HEADER.unpack(self._header)
+        if magic != MAGIC or version != VERSION:
+            raise ProtocolError(f"Неизвестный формат кадра: {magic!r}, версия {version}")
+        if op not in OPERATIONS:
+            raise ProtocolError(f"Неизвестный код операции: {op}")
+        if direction and direction not in DIRECTION_NAMES:
+            raise ProtocolError(f"Неизвестный код направления: {direction}")
+        if payload_len > self.max_payload:
+            raise ProtocolError(f"Кадр превышает допустимый размер: {payload_len} байт")
+
+        dtype = dtype.decode('ascii')
+        if op == OP_ERROR:
+            payload = bytearray(payload_len)
+        else:
+            if dtype not in DTYPES:
+                raise ProtocolError(f"Неподдерживаемый тип элементов: {dtype}")
+            # Размер проверяется до выделения буфера: заголовок не должен
+            # заставлять декодер выделять память сверх заявленной (и ограниченной) длины
+            if rows * cols * array(dtype).itemsize != payload_len:
+                raise ProtocolError(f"Длина данных {payload_len} не соответствует матрице {rows}x{cols}")
+            payload = array(dtype, [0]) * (rows * cols)
+
+        self._fields = (op, direction, dtype, rows, cols, request_id)
+        self._name = bytearray(name_len)
+        self._payload = payload
+
+    def _finish(self):
+        """Собирает кадр из заполненных буферов и сбрасывает декодер."""
+        op, direction, dtype, rows, cols, request_id = self._fields
+        name = self._name.decode('utf-8', errors='replace')
+        payload = self._payload
+        self._view.release()
+        self._reset()
+
+        if op == OP_ERROR:
+            return Frame(op, request_id, client_name=name, error=payload.decode('utf-8', errors='replace'))
+        if sys.byteorder != 'little':
+            payload.byteswap()
+        return Frame(op, request_id, DIRECTION_NAMES.get(direction), name, Matrix(rows, cols, dtype, payload))
+
+
+def send_frame(sock, buffers):
+    """
+    Отправляет кадр в блокирующий сокет без склейки буферов.
+
+    Args:
+        sock (socket.socket): Сокет
+        buffers (list): Буферы кадра из encode_frame
+    """
+    views = [memoryview(buffer).cast('B') for buffer in buffers if len(buffer)]
+    if not hasattr(sock, 'sendmsg'):
+        for view in views:
+            sock.sendall(view)
+        return
+
+    while views:
+        sent = sock.sendmsg(views)
+        # Отбрасываем полностью отправленные буферы и сдвигаем частично отправленный
+        while views and sent >= len(views[0]):
+            sent -= len(views[0])
+            views.pop(0)
+        if views and sent:
+            views[0] = views[0][sent:]
+
+
+def recv_frame(sock, decoder=None):
+    """
+    Читает один кадр из блокирующего сокета через recv_into.
+
+    Args:
+        sock (socket.socket): Сокет
+        decoder (FrameDecoder): Декодер соединения (создается, если не задан)
+
+    Returns:
+        Frame: Кадр или None, если соединение закрыто на границе кадров
+
+    Raises:
+        ConnectionError: Если соединение оборвалось посреди кадра
+        ProtocolError: Если кадр некорректен
+    """
+    decoder = decoder or FrameDecoder()
+    while True:
+        received = sock.recv_into(decoder.buffer())
+        if not received:
+            if decoder.at_boundary:
+                return None
+            raise ConnectionError("Соединение закрыто посреди кадра")
+        frame = decoder.advance(received)
+        if frame is not None:
+            return frame
@@ -0,0 +1,254 @@
+"""
+Модуль ограниченной очереди запросов с честным обслуживанием клиентов.
+
+Очередь ограничена глубиной (количеством запросов) и суммарной оценкой
+памяти запросов в байтах. Запрос, который не помещается в очередь,
+отклоняется сразу исключением OverloadedError, а не ждет, пока освободится
+место: так время ответа при перегрузке остается предсказуемым.
+
+Порядок извлечения задает политика планирования (POLICIES):
+    fair - запросы каждого клиента хранятся в отдельной очереди, а
+           извлекаются по кругу (round-robin) между клиентами, поэтому
+           клиент, отправивший много тяжелых запросов, не может задержать
+           остальных дольше одного своего запроса
+    fifo - в порядке поступления
+    edf  - первым запрос с самым ранним сроком выполнения
+           (earliest deadline first); запросы без срока - последними
+    sjf  - первым запрос с наименьшим объемом работы, например
+           количеством элементов матрицы (shortest job first)
+Во всех политиках запрос с большим приоритетом извлекается раньше,
+а при равенстве ключей сохраняется порядок поступления.
+"""
+
+import heapq
+import itertools
+import threading
+from collections import deque
+
+
+class OverloadedError(Exception):
+    """
+    Исключение для запроса, не принятого переполненной очередью.
+
+    Attributes:
+        depth (int): Количество запросов в очереди в момент отказа
+        nbytes (int): Оценка памяти запросов в очереди в байтах
+    """
+
+    def __init__(self, message, depth, nbytes):
+        super().__init__(message)
+        self.depth = depth
+        self.nbytes = nbytes
+
+
+class QueuedRequest:
+    """
+    Запрос в очереди вместе с параметрами планирования.
+
+    Attributes:
+        client_name (str): Идентификатор клиента
+        item: Запрос
+        cost (int): Оценка памяти запроса в байтах
+        deadline (float): Срок выполнения по time.monotonic() или None
+        priority (int): Приоритет; больше - раньше
+        work (int): Оценка объема работы
+        seq (int): Порядковый номер постановки в очередь
+    """
+
+    __slots__ = ('client_name', 'item', 'cost', 'deadline', 'priority', 'work', 'seq')
+
+    def __init__(self, client_name, item, cost, deadline, priority, work, seq):
+        self.client_name = client_name
+        self.item = item
+        self.cost = cost
+        self.deadline = deadline
+        self.priority = priority
+        self.work = work
+        self.seq = seq
+
+
+class RoundRobinPolicy:
+    """Обход клиентов по кругу; запросы одного клиента - по приоритету и порядку поступления."""
+
+    def __init__(self):
+        self._clients = {}
+        self._ready = deque()
+        self._size = 0
+
+    def push(self, entry):
+        queue = self._clients.get(entry.client_name)
+        if queue is None:
+            queue = self._clients[entry.client_name] = []
+            self._ready.append(entry.client_name)
+        heapq.heappush(queue, (-entry.priority, entry.seq, entry))
+        self._size += 1
+
+    def pop(self):
+        client_name = self._ready.popleft()
+        queue = self._clients[client_name]
+        entry = heapq.heappop(queue)[-1]
+        if queue:
+            self._ready.append(client_name)
+        else:
+            del self._clients[client_name]
+        self._size -= 1
+        return entry
+
+    def clear(self):
+        entries = [entry for queue in self._clients.values() for *_, entry in queue]
+        self._clients.clear()
+        self._ready.clear()
+        self._size = 0
+        return entries
+
+    def __len__(self):
+        return self._size
+
+
+class HeapPolicy:
+    """Общая очередь с приоритетами, упорядоченная ключом key(QueuedRequest)."""
+
+    def __init__(self, key):
+        self._key = key
+        self._heap = []
+
+    def push(self, entry):
+        heapq.heappush(self._heap, (self._key(entry), entry.seq, entry))
+
+    def pop(self):
+        return heapq.heappop(self._heap)[-1]
+
+    def clear(self):
+        entries = [entry for *_, entry in self._heap]
+        self._heap.clear()
+        return entries
+
+    def __len__(self):
+        return len(self._heap)
+
+
+def _deadline_key(entry):
+    return -entry.priority, float('inf') if entry.deadline is None else entry.deadline
+
+
+# Политики планирования: название -> фабрика политики
+POLICIES = {
+    'fair': RoundRobinPolicy,
+    'fifo': lambda: HeapPolicy(lambda entry: -entry.priority),
+    'edf': lambda: HeapPolicy(_deadline_key),
+    'sjf': lambda: HeapPolicy(lambda entry: (-entry.priority, entry.work)),
+}
+
+
+class FairRequestQueue:
+    """
+    Ограниченная потокобезопасная очередь с политикой планирования.
+
+    Оценка памяти запроса учитывается с момента приема и до вызова release(),
+    то есть и пока запрос ждет в очереди, и пока он выполняется.
+
+    Attributes:
+        max_depth (int): Предельное количество ожидающих запросов
+        max_bytes (int): Предельная оценка памяти принятых запросов в байтах
+        policy (str): Политика планирования из POLICIES
+        depth (int): Количество ожидающих запросов
+        nbytes (int): Оценка памяти принятых и еще не освобожденных запросов
+        rejected (int): Количество отклоненных запросов
+    """
+
+    def __init__(self, max_depth=1024, max_bytes=256 * 1024 * 1024, policy='fair'):
+        """
+        Raises:
+            ValueError: Если политика планирования неизвестна
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Неизвестная политика планирования: {policy}")
+        self.max_depth = max_depth
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.depth = 0
+        self.nbytes = 0
+        self.rejected = 0
+        self._entries = POLICIES[policy]()
+        self._seq = itertools.count()
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def put(self, client_name, item, cost=0, deadline=None, priority=0, work=0):
+        """
+        Ставит запрос в очередь.
+
+        Запрос дороже всего бюджета памяти принимается только в пустую
+        очередь, чтобы он не отклонялся навсегда.
+
+        Args:
+            client_name (str): Идентификатор клиента
+            item: Запрос
+            cost (int): Оценка памяти запроса в байтах
+            deadline (float): Срок выполнения по time.monotonic() (политика edf)
+            priority (int): Приоритет; больше - раньше
+            work (int): Оценка объема работы (политика sjf)
+
+        Raises:
+            OverloadedError: Если очередь заполнена или бюджет памяти исчерпан
+            RuntimeError: Если очередь закрыта
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Очередь запросов закрыта")
+            if self.depth >= self.max_depth:
+                self.rejected += 1
+                raise OverloadedError("Очередь запросов заполнена", self.depth, self.nbytes)
+            if self.nbytes and self.nbytes + cost > self.max_bytes:
+                self.rejected += 1
+                raise OverloadedError("Превышен бюджет памяти очереди", self.depth, self.nbytes)
+
+            self._entries.push(QueuedRequest(client_name, item, cost, deadline, priority, work,
+                                             next(self._seq)))
+            self.depth += 1
+            self.nbytes += cost
+            self._condition.notify()
+
+    def get(self, timeout=None):
+        """
+        Извлекает следующий запрос согласно политике планирования.
+
+        Args:
+            timeout (float): Наибольшее время ожидания в секундах
+
+        Returns:
+            tuple: (client_name, item, cost) или None, если очередь закрыта
+                или время ожидания истекло
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._entries or self._closed, timeout):
+                return None
+            if not self._entries:
+                return None
+
+            entry = self._entries.pop()
+            self.depth -= 1
+            return entry.client_name, entry.item, entry.cost
+
+    def release(self, cost):
+        """Освобождает оценку памяти выполненного запроса."""
+        with self._condition:
+            self.nbytes -= cost
+
+    def close(self):
+        """
+        Закрывает очередь и возвращает запросы, которые не успели начаться.
+
+        Returns:
+            list: Кортежи (client_name, item, cost) в порядке постановки
+        """
+        with self._condition:
+            self._closed = True
+            entries = sorted(self._entries.clear(), key=lambda entry: entry.seq)
+            pending = [(entry.client_name, entry.item, entry.cost) for entry in entries]
+            self.depth = 0
+            self._condition.notify_all()
+            return pending
+
+    def __len__(self):
+        return self.depth
@@ -0,0 +1,151 @@
+"""
+Модуль кэша результатов матричных операций.
+
+Ключ кэша - хэш содержимого запроса: размеры и тип матрицы, байты ее
+буфера, операция и направление. Поэтому повторный запрос с той же
+матрицей получает готовый результат, даже если клиент построил матрицу
+заново.
+
+Кэш ограничен объемом памяти в байтах и вытесняет давно не использованные
+записи (LRU); записи могут устаревать по времени жизни (TTL). Кэш защищен
+собственной блокировкой и не держит блокировку сервера.
+"""
+
+import hashlib
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+
+# Заголовок ключа: строки, столбцы и код типа элементов
+KEY_HEADER = struct.Struct('<QQc')
+
+
+class ResultCache:
+    """
+    Потокобезопасный LRU-кэш результатов с ограничением по памяти.
+
+    Кэш хранит собственные копии матриц и выдает копии при попадании,
+    поэтому изменение результата клиентом не портит кэш.
+
+    Attributes:
+        max_bytes (int): Предельный объем буферов матриц в кэше
+        ttl (float): Время жизни записи в секундах или None
+        nbytes (int): Текущий объем буферов матриц в кэше
+        hits (int): Количество попаданий
+        misses (int): Количество промахов
+        evictions (int): Количество записей, вытесненных по памяти
+        expirations (int): Количество записей, удаленных по TTL
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=None, clock=time.monotonic):
+        """
+        Args:
+            max_bytes (int): Предельный объем кэша в байтах
+            ttl (float): Время жизни записи в секундах (None - без ограничения)
+            clock: Функция текущего времени в секундах
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(matrix, operation, direction):
+        """
+        Вычисляет ключ кэша по содержимому запроса.
+
+        Args:
+            matrix (Matrix): Исходная матрица
+            operation (str): Название операции
+            direction (str): Направление поворота
+
+        Returns:
+            bytes: 16-байтовый хэш BLAKE2b
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(KEY_HEADER.pack(matrix.rows, matrix.cols, matrix.dtype.encode('ascii')))
+        digest.update(f"{operation}:{direction}".encode('utf-8'))
+        digest.update(memoryview(matrix.data).cast('B'))
+        return digest.digest()
+
+    def get(self, key):
+        """
+        Возвращает копию закэшированного результата.
+
+        Returns:
+            Matrix: Результат или None, если записи нет или она устарела
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= self._clock():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            matrix = entry[0]
+        return matrix.copy()
+
+    def put(self, key, matrix):
+        """
+        Сохраняет копию результата, вытесняя давно не использованные записи.
+
+        Результат, который больше всего объема кэша, не сохраняется.
+        """
+        size = matrix.nbytes
+        if size > self.max_bytes:
+            return
+        matrix = matrix.copy()
+        expires = self._clock() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            while self._entries and self.nbytes + size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            self._entries[key] = (matrix, expires)
+            self.nbytes += size
+
+    def _remove(self, key):
+        """Удаляет запись; вызывается под блокировкой."""
+        matrix, _ = self._entries.pop(key)
+        self.nbytes -= matrix.nbytes
+
+    def clear(self):
+        """Удаляет все записи, сохраняя счетчики."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        """
+        Возвращает снимок счетчиков кэша.
+
+        Returns:
+            dict: Количество записей, объем и счетчики попаданий и вытеснений
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'nbytes': self.nbytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+    def __len__(self):
+        return len(self._entries)
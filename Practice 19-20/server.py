@@ -4,117 +4,859 @@
 Сервер обрабатывает запросы от клиентов на выполнение операций с матрицами.
 Эмулирует длительные вычисления для демонстрации работы с I/O-bound
 операциями в многопоточной среде.
+
+Вычисления выполняются в пуле рабочих потоков или процессов сервера:
+submit(request) возвращает Future, а блокирующий process_request
+лишь ожидает его результат. Перед пулом стоит ограниченная очередь
+с честным обслуживанием клиентов: при перегрузке запрос сразу получает
+ответ {'error': 'overloaded', 'retry_after': секунды}.
+
+Логирование асинхронное (модуль server_logging): на каждый запрос
+пишется одна итоговая запись, а пошаговые отладочные записи - только
+для выборки запросов (debug_sample_rate). Сообщения о запросах в консоль
+передаются общему потоку вывода (модуль console), и рабочие
+потоки не ждут терминал.
+
+Метрики (модуль metrics) - гистограммы задержек, счетчики запросов по
+итогам, объем обработанных данных, запросы в работе и глубина очереди -
+доступны через metrics.snapshot() и выгружаются в формате Prometheus
+в файл или по HTTP на localhost.
+
+В пуле процессов матрицы от shm_threshold байт передаются рабочим через
+разделяемую память (модуль shm_transport), а не сериализуются pickle.
+
+stream_request выдает результат блоками строк по мере вычисления, так что
+клиент начинает выводить результат, не дожидаясь последней строки.
+
+Запрос может нести срок выполнения ('timeout' - секунды от приема или
+'deadline' - момент по time.monotonic()) и приоритет ('priority'), а
+порядок выборки из очереди задает политика планирования (policy: fair,
+fifo, edf или sjf). Просроченный запрос снимается с очереди, не занимая
+рабочего, а начатый поворот прерывается на ближайшей проверке в ядре;
+клиент получает ответ {'error': 'deadline_exceeded'}. Так же прерывается
+запрос, Future ответа которого отменен клиентом.
 """
 
 import logging
+import os
 import time
 import random
 import threading
-from matrix_operations import rotate_matrix
+from collections import deque
+from concurrent.futures import Future, InvalidStateError, ProcessPoolExecutor, ThreadPoolExecutor
+from console import get_console
+from exceptions import DeadlineExceededError, OperationCancelledError
+from matrix import Matrix
+from matrix_operations import CancelToken, execute_batch, execute_operation, execute_rows, resolve_backend
+from metrics import MetricsRegistry, PrometheusFileExporter, start_http_server
+from request_queue import FairRequestQueue, OverloadedError
+from result_cache import ResultCache
+from server_logging import DebugSampler, setup_logging
+from shm_transport import SharedMemoryPool, execute_shared, read_matrix
+
+
+# Поддерживаемые виды пула исполнителей
+EXECUTORS = {
+    'thread': ThreadPoolExecutor,
+    'process': ProcessPoolExecutor,
+}
+
+logger = logging.getLogger(__name__)
+
+# Итоговая запись о запросе: одна строка с полями ключ=значение
+SUMMARY_FORMAT = ("Сервер %s: op=%s direction=%s rows=%d cols=%d dtype=%s status=%s "
+                  "delay_s=%.2f total_ms=%.2f error=%s")
+
+# Итоги запросов, которые считаются успешно обработанными
+SUCCESS_STATUSES = ('ok', 'cached')
+
+# Имя, под которым в очереди учитываются группы запросов rotate_many
+BATCH_CLIENT = 'rotate_many'
+
+# Вес нового замера в скользящем среднем времени обслуживания
+SERVICE_TIME_WEIGHT = 0.2
+
+# Размер матрицы, начиная с которого пул процессов получает ее через разделяемую память
+SHM_THRESHOLD = 1024 * 1024
+
+# Строк результата в одном блоке потокового ответа
+STREAM_BLOCK_ROWS = 256
+
+# Сколько блоков потокового ответа вычисляется впереди потребителя
+STREAM_WINDOW = 2
+
+
+def default_workers(executor):
+    """Размер пула по умолчанию для вида пула исполнителей."""
+    cpus = os.cpu_count() or 1
+    if executor == 'thread':
+        return min(32, cpus + 4)
+    return cpus
+
+
+def _warm_up():
+    """Пустая задача для предварительного запуска рабочих потоков и процессов."""
+    return os.getpid()
 
 
 class MatrixServer:
     """
     Класс сервера для обработки матричных операций.
     
-    Сервер работает в одном потоке и обрабатывает запросы от многопоточных
-    клиентов. Эмулирует длительные вычисления (2-5 секунд) для демонстрации
+    Сервер принимает запросы от многопоточных клиентов и выполняет их в пуле
+    исполнителей: пул потоков подходит для эмуляции I/O-bound вычислений,
+    пул процессов позволяет загрузить CPU-bound поворотом все ядра.
+    Эмулирует длительные вычисления (2-5 секунд) для демонстрации
     работы GIL при I/O операциях.
     
     Attributes:
-        requests_processed (int): Счетчик успешно обработанных запросов
+        requests_processed (int): Количество успешно обработанных запросов
         lock (threading.Lock): Блокировка для потокобезопасности
+        backend (str): Бэкенд поворота матриц ('python' или 'numpy')
+        executor_kind (str): Вид пула исполнителей ('thread' или 'process')
+        max_workers (int): Количество рабочих потоков или процессов
+        processing_delay (tuple): Диапазон эмулируемого времени вычислений
+            в секундах или None, если эмуляция отключена
+        cache (ResultCache): Кэш результатов или None, если кэш отключен
+        queue (FairRequestQueue): Очередь запросов перед пулом исполнителей
+        metrics (MetricsRegistry): Реестр метрик сервера
+        console (ConsoleRenderer): Общий поток вывода в консоль
     """
     
-    def __init__(self):
+    def __init__(self, backend='auto', executor='thread', max_workers=None, processing_delay=(2, 5),
+                 cache_bytes=64 * 1024 * 1024, cache_ttl=None,
+                 queue_depth=1024, queue_bytes=256 * 1024 * 1024, debug_sample_rate=0.0,
+                 metrics_file=None, metrics_port=None, metrics_interval=10.0,
+                 shm_threshold=SHM_THRESHOLD, policy='fair'):
         """
-        Инициализирует сервер и настраивает систему логирования.
+        Инициализирует сервер, пул исполнителей и систему логирования.
+        
+        Args:
+            backend (str): Бэкенд поворота - 'auto' (NumPy, если установлен),
+                'python' или 'numpy'
+            executor (str): Вид пула - 'thread' или 'process'
+            max_workers (int): Размер пула; по умолчанию для пула процессов - число
+                ядер, для пула потоков - как у ThreadPoolExecutor, так как
+                рабочие потоки в основном ждут эмулируемого ввода-вывода
+            processing_delay (tuple): Диапазон (мин, макс) эмуляции вычислений
+                в секундах; None отключает эмуляцию
+            cache_bytes (int): Объем кэша результатов в байтах; 0 отключает кэш
+            cache_ttl (float): Время жизни результата в кэше в секундах
+            queue_depth (int): Наибольшее количество ожидающих запросов
+            queue_bytes (int): Бюджет памяти принятых запросов в байтах
+            debug_sample_rate (float): Доля запросов, для которых пишутся
+                пошаговые отладочные записи
+            metrics_file (str): Файл для периодической выгрузки метрик Prometheus
+            metrics_port (int): Порт HTTP-сервера метрик на localhost
+            metrics_interval (float): Период выгрузки метрик в файл в секундах
+            shm_threshold (int): Размер матрицы в байтах, начиная с которого пул
+                процессов получает ее через разделяемую память; None отключает
+            policy (str): Политика планирования очереди - 'fair' (по кругу между
+                клиентами), 'fifo', 'edf' (по сроку выполнения) или 'sjf'
+                (по размеру матрицы)
+        
+        Raises:
+            ValueError: Если вид пула или политика планирования неизвестны
         """
-        self.requests_processed = 0
+        if executor not in EXECUTORS:
+            raise ValueError(f"Неизвестный вид пула исполнителей: {executor}")
+        
         self.lock = threading.Lock()
+        self.backend = resolve_backend(backend)
+        self.executor_kind = executor
+        self.max_workers = max_workers or default_workers(executor)
+        self.processing_delay = processing_delay
+        self.cache = ResultCache(cache_bytes, cache_ttl) if cache_bytes else None
+        self.shm_threshold = shm_threshold
+        self.shm_pool = SharedMemoryPool() if executor == 'process' and shm_threshold is not None else None
+        self.queue = FairRequestQueue(queue_depth, queue_bytes, policy)
+        self._slots = threading.Semaphore(self.max_workers)
+        self._service_time = sum(processing_delay) / 2 if processing_delay else 0.0
+        self._setup_metrics(metrics_file, metrics_port, metrics_interval)
         
-        # Настройка логирования
-        logging.basicConfig(
-            filename="Practice 19-20/server.log",
-            level=logging.INFO,
-            format="%(asctime)s - %(levelname)s - %(message)s",
-            encoding='utf-8'
-        )
+        # Настройка логирования: запись в файл выполняет отдельный поток
+        setup_logging("Practice 19-20/server.log")
+        self.sampler = DebugSampler(logger, debug_sample_rate)
+        self.console = get_console()
+        
+        # Пул создается сразу, и все рабочие запускаются заранее
+        self.executor = EXECUTORS[executor](max_workers=self.max_workers)
+        for warm_up in [self.executor.submit(_warm_up) for _ in range(self.max_workers)]:
+            warm_up.result()
         
-        logging.info("Сервер матричных операций инициализирован")
+        # Диспетчер передает запросы из очереди в пул, только когда есть свободный рабочий
+        self._dispatcher = threading.Thread(target=self._dispatch, name="MatrixServerDispatcher", daemon=True)
+        self._dispatcher.start()
+        
+        logger.info("Сервер матричных операций инициализирован (бэкенд: %s, пул: %s x %d)",
+                    self.backend, self.executor_kind, self.max_workers)
         print("Сервер: инициализирован и готов к обработке запросов")
     
+    def _setup_metrics(self, metrics_file, metrics_port, metrics_interval):
+        """
+        Регистрирует инструменты метрик и запускает их выгрузку.
+        """
+        self.metrics = MetricsRegistry()
+        self._requests = self.metrics.counter(
+            'matrix_requests_total', "Завершенные запросы по операции и итогу", ('operation', 'status'))
+        self._latency = self.metrics.histogram(
+            'matrix_request_latency_seconds', "Время от приема запроса до ответа", ('operation',))
+        self._bytes = self.metrics.counter(
+            'matrix_processed_bytes_total', "Объем обработанных матриц в байтах")
+        self._inflight = self.metrics.gauge(
+            'matrix_inflight_requests', "Запросы, выполняющиеся в пуле")
+        self.metrics.gauge(
+            'matrix_queue_depth', "Запросы, ожидающие в очереди").set_function(lambda: self.queue.depth)
+        self.metrics.gauge(
+            'matrix_queue_bytes', "Оценка памяти принятых запросов").set_function(lambda: self.queue.nbytes)
+        
+        self._metrics_exporter = None
+        self._metrics_http = None
+        if metrics_file:
+            self._metrics_exporter = PrometheusFileExporter(self.metrics, metrics_file, metrics_interval).start()
+        if metrics_port is not None:
+            self._metrics_http = start_http_server(self.metrics, metrics_port)
+    
+    @property
+    def requests_processed(self):
+        """Количество успешно обработанных запросов, включая ответы из кэша."""
+        return self._requests.total(status=SUCCESS_STATUSES)
+    
+    def submit(self, request, client_name=None):
+        """
+        Принимает запрос и передает вычисления в пул исполнителей.
+        
+        Проверка запроса выполняется сразу в вызывающем потоке, а ошибки
+        проверки возвращаются уже завершенным Future. Отмена Future ответа
+        (cancel()) снимает запрос с очереди или прерывает его вычисление.
+        
+        Args:
+            request (dict): Словарь с данными запроса; матрица передается
+                как Matrix или как список списков, необязательные поля
+                'timeout', 'deadline' и 'priority' задают срок и приоритет
+            client_name (str): Идентификатор клиента
+                (по умолчанию берется из request['client_name'])
+        
+        Returns:
+            Future: Будущий ответ - {'result': Matrix} или {'error': str}
+        """
+        client_name = client_name or request.get('client_name')
+        started = time.perf_counter()
+        trace = self.sampler.sample()
+        operation = request.get('operation')
+        direction = request.get('direction')
+        matrix = None
+        try:
+            matrix = request.get('matrix')
+            if matrix is not None:
+                matrix = Matrix.coerce(matrix)
+            deadline = self._deadline(request)
+            priority = int(request.get('priority') or 0)
+            
+            if trace:
+                logger.debug("Сервер %s: получен запрос на операцию '%s', направление %s, матрица %r",
+                             client_name, operation, direction, matrix)
+            
+            self.console.print(f"{time.strftime('%H:%M:%S')} {client_name}: получен запрос на поворот матрицы")
+            
+            # Валидация входных данных
+            error_msg = self._validate(operation, matrix, direction)
+            if error_msg:
+                self._log_summary(logging.ERROR, client_name, operation, direction, matrix,
+                                  'rejected', started, error=error_msg)
+                return self._completed({'error': error_msg})
+            
+            # Повторный запрос получает готовый результат без вычислений
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.make_key(matrix, operation, direction)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return self._completed(self._cache_hit(client_name, cached, operation, direction, started))
+        
+        except Exception as e:
+            # Обработка и логирование непредвиденных ошибок вместе с traceback
+            error_msg = f"Ошибка выполнения операции: {e}"
+            self._log_summary(logging.ERROR, client_name, operation, direction, matrix,
+                              'error', started, error=error_msg, exc_info=True)
+            return self._completed({'error': error_msg})
+        
+        if deadline is not None and time.monotonic() >= deadline:
+            self._log_summary(logging.WARNING, client_name, operation, direction, matrix,
+                              'expired', started, error="срок истек до постановки в очередь")
+            return self._completed({'error': 'deadline_exceeded'})
+        
+        # Эмуляция длительных вычислений (2-5 секунд) выполняется в рабочем пула
+        processing_time = random.uniform(*self.processing_delay) if self.processing_delay else 0.0
+        if trace:
+            logger.debug("Сервер %s: запрос поставлен в очередь, эмуляция вычислений %.2f сек",
+                         client_name, processing_time)
+        
+        token = CancelToken(deadline)
+        try:
+            if self.shm_pool is not None and matrix.nbytes >= self.shm_threshold:
+                task = self._enqueue_shared(client_name, operation, matrix, direction, processing_time,
+                                            token, priority)
+            else:
+                task = self._enqueue(client_name, matrix.nbytes * 2, execute_operation,
+                                     operation, matrix, direction, self.backend, processing_time, token,
+                                     cancel=token, priority=priority, work=matrix.rows * matrix.cols)
+        except OverloadedError as e:
+            response = self._overloaded(client_name, e)
+            self._log_summary(logging.WARNING, client_name, operation, direction, matrix,
+                              'overloaded', started, error=e)
+            return self._completed(response)
+        
+        response = Future()
+        
+        def on_response(done):
+            # Клиент отменил ожидание: вычисление прерывается на ближайшей проверке
+            if done.cancelled():
+                token.cancel()
+        
+        response.add_done_callback(on_response)
+        task.add_done_callback(
+            lambda done: self._complete(done, response, client_name, processing_time, cache_key,
+                                        (operation, direction, matrix, started, trace))
+        )
+        return response
+    
     def process_request(self, request, client_name):
         """
         Обрабатывает запрос на матричную операцию с эмуляцией вычислений.
         
+        Блокирующая обертка над submit: ждет завершения вычислений в пуле.
+        
         Args:
-            request (dict): Словарь с данными запроса
+            request (dict): Словарь с данными запроса; матрица передается
+                как Matrix или как список списков
             client_name (str): Идентификатор клиента
-            
+        
         Returns:
-            dict: Результат операции или сообщение об ошибке
+            dict: Результат операции (Matrix) или сообщение об ошибке
         """
+        return self.submit(request, client_name).result()
+    
+    def stream_request(self, request, client_name=None, block_rows=STREAM_BLOCK_ROWS, window=STREAM_WINDOW):
+        """
+        Обрабатывает запрос с выдачей результата блоками строк.
+        
+        Каждый блок вычисляется в пуле отдельной задачей в очереди клиента,
+        причем не дальше window блоков впереди потребителя: пока клиент
+        выводит очередной блок, следующие уже считаются, а если клиент не
+        успевает, сервер не накапливает результат в памяти. Эмуляция
+        вычислений выполняется один раз, перед первым блоком. Если генератор
+        закрыт досрочно или срок запроса истек, блоки в очереди отменяются, а уже
+        выполняющиеся останавливаются на ближайшей проверке признака отмены.
+        
+        Args:
+            request (dict): Словарь с данными запроса, как в submit
+            client_name (str): Идентификатор клиента
+                (по умолчанию берется из request['client_name'])
+            block_rows (int): Количество строк результата в блоке
+            window (int): Количество блоков, вычисляемых впереди потребителя
+        
+        Yields:
+            dict: {'start': номер первой строки блока, 'block': Matrix};
+                при ошибке последним выдается ответ с ключом 'error'
+        """
+        client_name = client_name or request.get('client_name')
+        started = time.perf_counter()
+        operation = request.get('operation')
+        direction = request.get('direction')
+        matrix = None
         try:
+            matrix = request.get('matrix')
+            if matrix is not None:
+                matrix = Matrix.coerce(matrix)
+            self.console.print(f"{time.strftime('%H:%M:%S')} {client_name}: получен запрос на потоковый поворот матрицы")
+            deadline = self._deadline(request)
+            priority = int(request.get('priority') or 0)
+            error_msg = self._validate(operation, matrix, direction)
+        except Exception as e:
+            error_msg = f"Ошибка выполнения операции: {e}"
+        if error_msg:
+            self._log_summary(logging.ERROR, client_name, operation, direction, matrix,
+                              'rejected', started, error=error_msg)
+            yield {'error': error_msg}
+            return
+        
+        processing_time = random.uniform(*self.processing_delay) if self.processing_delay else 0.0
+        total_rows = matrix.cols
+        block_rows = max(1, block_rows)
+        starts = iter(range(0, total_rows, block_rows))
+        pending = deque()
+        token = CancelToken(deadline)
+        
+        def schedule():
+            start = next(starts, None)
+            if start is None:
+                return
+            stop = min(start + block_rows, total_rows)
+            cost = (stop - start) * matrix.rows * matrix.data.itemsize * 2
+            task = self._enqueue(client_name, cost, execute_rows, operation, matrix, direction,
+                                 start, stop, self.backend, processing_time if start == 0 else 0.0, token,
+                                 cancel=token, priority=priority, work=(stop - start) * matrix.rows)
+            pending.append((start, task))
+        
+        status, error = 'cancelled', '-'
+        try:
+            for _ in range(max(1, window)):
+                schedule()
+            while pending:
+                start, task = pending.popleft()
+                block = task.result()
+                schedule()
+                yield {'start': start, 'block': block}
+            status = 'ok'
+        except OverloadedError as e:
+            status, error = 'overloaded', e
+            yield self._overloaded(client_name, e)
+        except OperationCancelledError as e:
+            status, response = self._cancelled(e)
+            error = e
+            yield response
+        except Exception as e:
+            status, error = 'error', f"Ошибка выполнения операции: {e}"
+            yield {'error': error}
+        finally:
+            # Отмена признака останавливает и уже выполняющийся блок на ближайшей
+            # проверке (в пуле процессов действует только срок выполнения)
+            token.cancel()
+            for _, task in pending:
+                task.cancel()
+            level = {'ok': logging.INFO, 'cancelled': logging.INFO, 'expired': logging.WARNING}.get(
+                status, logging.ERROR)
+            self._log_summary(level, client_name, operation, direction, matrix, status,
+                              started, processing_time, error=error)
+    
+    def rotate_many(self, requests):
+        """
+        Обрабатывает пачку запросов на поворот как набор пакетных операций.
+        
+        Корректные запросы группируются по размеру матрицы, типу элементов и
+        направлению поворота. Каждая группа поворачивается в пуле одним
+        вызовом ядра над общим буфером, а логирование, эмуляция вычислений
+        и обновление метрик выполняются один раз на пачку, а не на запрос.
+        
+        Args:
+            requests (list): Словари запросов в формате process_request
+        
+        Returns:
+            list: Ответы в порядке запросов - {'result': Matrix} или {'error': str}
+        """
+        responses = [None] * len(requests)
+        groups = {}
+        cached_count = 0
+        rejected_count = 0
+        nbytes = 0
+        
+        for index, request in enumerate(requests):
             operation = request.get('operation')
             matrix = request.get('matrix')
             direction = request.get('direction')
+            try:
+                if matrix is not None:
+                    matrix = Matrix.coerce(matrix)
+                error_msg = self._validate(operation, matrix, direction)
+            except Exception as e:
+                error_msg = f"Ошибка выполнения операции: {e}"
             
-            # Логирование начала обработки с деталями запроса
-            logging.info(f"Сервер {client_name}: получен запрос на операцию '{operation}'")
-            logging.info(f"Сервер {client_name}: направление поворота - {direction}")
-            logging.info(f"Сервер {client_name}: размер матрицы - {len(matrix)}x{len(matrix[0])}")
-            
-            print(f"{time.strftime('%H:%M:%S')} {client_name}: получен запрос на поворот матрицы")
+            if error_msg:
+                logger.error("Сервер %s: %s", request.get('client_name'), error_msg)
+                responses[index] = {'error': error_msg}
+                rejected_count += 1
+                continue
             
-            # Эмуляция длительных вычислений (2-5 секунд)
-            processing_time = random.uniform(2, 5)
-            logging.info(f"Сервер {client_name}: эмуляция вычислений {processing_time:.2f} сек")
-            time.sleep(processing_time)  # I/O операция - GIL освобождается
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.make_key(matrix, operation, direction)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    responses[index] = {'result': cached}
+                    cached_count += 1
+                    nbytes += cached.nbytes
+                    continue
+            groups.setdefault((matrix.shape, matrix.dtype, direction), []).append((index, matrix, cache_key))
+        
+        # Эмуляция длительных вычислений один раз на пачку
+        processing_time = random.uniform(*self.processing_delay) if self.processing_delay else 0.0
+        started = time.perf_counter()
+        
+        tasks = []
+        for (shape, dtype, direction), members in groups.items():
+            matrices = [matrix for _, matrix, _ in members]
+            cost = sum(matrix.nbytes for matrix in matrices) * 2
+            try:
+                task = self._enqueue(BATCH_CLIENT, cost, execute_batch,
+                                     matrices, direction, self.backend, processing_time,
+                                     work=len(matrices) * shape[0] * shape[1])
+            except OverloadedError as e:
+                overloaded = self._overloaded(BATCH_CLIENT, e)
+                for index, _, _ in members:
+                    responses[index] = dict(overloaded)
+                self._requests.inc(len(members), BATCH_CLIENT, 'overloaded')
+                continue
+            tasks.append((members, task))
+        
+        processed = 0
+        for members, task in tasks:
+            try:
+                results = task.result()
+            except Exception as e:
+                error_msg = f"Ошибка выполнения операции: {e}"
+                logger.error("Сервер: %s", error_msg, exc_info=e)
+                for index, _, _ in members:
+                    responses[index] = {'error': error_msg}
+                self._requests.inc(len(members), BATCH_CLIENT, 'error')
+                continue
+            for (index, _, cache_key), result in zip(members, results):
+                if cache_key is not None:
+                    self.cache.put(cache_key, result)
+                responses[index] = {'result': result}
+                nbytes += result.nbytes
+            processed += len(members)
+        
+        # Метрики пачки обновляются одним вызовом на итог, а не на каждый запрос
+        elapsed = time.perf_counter() - started
+        self._requests.inc(processed, BATCH_CLIENT, 'ok')
+        self._requests.inc(cached_count, BATCH_CLIENT, 'cached')
+        self._requests.inc(rejected_count, BATCH_CLIENT, 'rejected')
+        self._bytes.inc(nbytes)
+        self._latency.observe(elapsed, BATCH_CLIENT)
+        
+        logger.info("Сервер: пачка requests=%d groups=%d ok=%d cached=%d delay_s=%.2f total_ms=%.2f",
+                    len(requests), len(groups), processed, cached_count, processing_time, elapsed * 1000)
+        return responses
+    
+    def shutdown(self, wait=True):
+        """
+        Останавливает очередь и пул исполнителей.
+        
+        Запросы, ожидавшие в очереди, завершаются ошибкой.
+        
+        Args:
+            wait (bool): Дождаться завершения уже выполняющихся запросов
+        """
+        for _, (task, _, _, _), cost in self.queue.close():
+            self.queue.release(cost)
+            if task.set_running_or_notify_cancel():
+                task.set_exception(RuntimeError("Сервер остановлен"))
+        self._dispatcher.join()
+        self.executor.shutdown(wait=wait)
+        if self.shm_pool is not None:
+            self.shm_pool.close()
+            logger.info("Статистика разделяемой памяти: %s", self.shm_pool.stats())
+        if self._metrics_exporter is not None:
+            self._metrics_exporter.stop()
+        if self._metrics_http is not None:
+            self._metrics_http.shutdown()
+            self._metrics_http.server_close()
+        if self.cache is not None:
+            logger.info("Статистика кэша результатов: %s", self.cache.stats())
+        logger.info("Сервер матричных операций остановлен")
+    
+    def _enqueue(self, client_name, cost, fn, *args, cancel=None, priority=0, work=0):
+        """
+        Ставит вычисление в очередь перед пулом исполнителей.
+        
+        Args:
+            client_name (str): Клиент, в очереди которого учитывается запрос
+            cost (int): Оценка памяти запроса в байтах
+            fn: Функция, выполняемая в пуле
+            *args: Аргументы функции
+            cancel (CancelToken): Признак отмены со сроком выполнения; если он
+                сработал до начала вычисления, запрос снимается с очереди
+            priority (int): Приоритет запроса в очереди
+            work (int): Оценка объема работы для политики sjf
+        
+        Returns:
+            Future: Результат fn после выполнения в пуле
+        
+        Raises:
+            OverloadedError: Если очередь заполнена или бюджет памяти исчерпан
+        """
+        task = Future()
+        deadline = cancel.deadline if cancel is not None else None
+        self.queue.put(client_name, (task, fn, args, cancel), cost, deadline, priority, work)
+        return task
+    
+    def _enqueue_shared(self, client_name, operation, matrix, direction, processing_time,
+                        cancel=None, priority=0):
+        """
+        Ставит в очередь операцию над матрицей в разделяемой памяти.
+        
+        Матрица копируется в сегмент пула, для результата выделяется второй
+        сегмент; рабочему процессу передаются только их дескрипторы. Оба
+        сегмента возвращаются в пул, когда результат скопирован из памяти
+        или вычисление завершилось ошибкой.
+        
+        Returns:
+            Future: Результат операции (Matrix)
+        
+        Raises:
+            OverloadedError: Если очередь заполнена или бюджет памяти исчерпан
+        """
+        source, handle = self.shm_pool.put(matrix)
+        target = self.shm_pool.acquire(matrix.nbytes)
+        try:
+            shared = self._enqueue(client_name, matrix.nbytes * 2, execute_shared,
+                                   operation, handle, target.name, direction, self.backend, processing_time,
+                                   cancel, cancel=cancel, priority=priority, work=matrix.rows * matrix.cols)
+        except BaseException:
+            self.shm_pool.release(source)
+            self.shm_pool.release(target)
+            raise
+        
+        task = Future()
+        
+        def collect(done):
+            try:
+                task.set_result(read_matrix(target, done.result()))
+            except BaseException as e:
+                task.set_exception(e)
+            finally:
+                self.shm_pool.release(source)
+                self.shm_pool.release(target)
+        
+        shared.add_done_callback(collect)
+        return task
+    
+    def _dispatch(self):
+        """
+        Цикл потока-диспетчера: берет запросы из очереди в порядке политики
+        планирования и передает в пул не больше max_workers одновременно.
+        
+        Поэтому внутренняя очередь пула всегда пуста, и порядок
+        обслуживания определяет только очередь сервера.
+        """
+        while True:
+            self._slots.acquire()
+            entry = self.queue.get()
+            if entry is None:
+                self._slots.release()
+                return
             
-            if operation == 'rotate':
-                # Валидация входных данных
-                if not matrix:
-                    error_msg = "Матрица не предоставлена"
-                    logging.error(f"Сервер {client_name}: {error_msg}")
-                    return {'error': error_msg}
-                
-                if direction not in ['clockwise', 'counterclockwise']:
-                    error_msg = f"Неверное направление поворота: {direction}"
-                    logging.error(f"Сервер {client_name}: {error_msg}")
-                    return {'error': error_msg}
-                
-                # Логирование перед выполнением операции
-                logging.info(f"Сервер {client_name}: выполнение операции поворота")
-                
-                # Выполнение матричной операции
-                result = rotate_matrix(matrix, direction)
-                
-                # Потокобезопасное обновление счетчика
-                with self.lock:
-                    self.requests_processed += 1
-                
-                # Логирование успешного завершения с деталями
-                logging.info(f"Сервер {client_name}: операция поворота завершена успешно")
-                logging.info(f"Сервер {client_name}: размер результата - {len(result)}x{len(result[0])}")
-                logging.info(f"Сервер {client_name}: общее время обработки - {processing_time:.2f} сек")
-                logging.info(f"Сервер {client_name}: всего обработано запросов - {self.requests_processed}")
-                
-                print(f"{time.strftime('%H:%M:%S')} {client_name}: выполнен поворот матрицы")
-                
-                return {'result': result}
-            else:
-                error_msg = f'Неподдерживаемая операция: {operation}'
-                logging.error(f"Сервер {client_name}: {error_msg}")
-                return {'error': error_msg}
-                
+            _, (task, fn, args, cancel), cost = entry
+            # Отмененный запрос (например, блок закрытого потокового ответа) не занимает рабочего
+            if not task.set_running_or_notify_cancel():
+                self._slots.release()
+                self.queue.release(cost)
+                continue
+            # Так же снимается запрос, срок которого истек в очереди
+            error = cancel.error() if cancel is not None else None
+            if error is not None:
+                self._slots.release()
+                self.queue.release(cost)
+                task.set_exception(error)
+                continue
+            started = time.monotonic()
+            self._inflight.inc()
+            try:
+                work = self.executor.submit(fn, *args)
+            except Exception as e:
+                self._finish_job(None, task, cost, started, e)
+                continue
+            work.add_done_callback(
+                lambda done, task=task, cost=cost, started=started: self._finish_job(done, task, cost, started)
+            )
+    
+    def _finish_job(self, work, task, cost, started, error=None):
+        """
+        Освобождает место рабочего и память запроса и передает результат.
+        """
+        self._slots.release()
+        self.queue.release(cost)
+        self._inflight.dec()
+        
+        if error is None:
+            error = work.exception()
+        if error is not None:
+            task.set_exception(error)
+            return
+        
+        elapsed = time.monotonic() - started
+        with self.lock:
+            self._service_time += SERVICE_TIME_WEIGHT * (elapsed - self._service_time)
+        task.set_result(work.result())
+    
+    def _overloaded(self, client_name, error):
+        """
+        Формирует быстрый отказ для запроса, не принятого очередью.
+        
+        Время повторной попытки оценивается по глубине очереди и среднему
+        времени обслуживания одного запроса.
+        """
+        with self.lock:
+            service_time = self._service_time
+        retry_after = round(max(0.1, (error.depth + 1) * service_time / self.max_workers), 2)
+        return {'error': 'overloaded', 'retry_after': retry_after}
+    
+    @staticmethod
+    def _cancelled(error):
+        """
+        Итог и ответ для запроса, прерванного отменой или истечением срока.
+        
+        Returns:
+            tuple: (итог - 'expired' или 'cancelled', ответ клиенту)
+        """
+        if isinstance(error, DeadlineExceededError):
+            return 'expired', {'error': 'deadline_exceeded'}
+        return 'cancelled', {'error': 'cancelled'}
+    
+    def _complete(self, task, response, client_name, processing_time, cache_key, context):
+        """
+        Завершает запрос по результату задачи из пула.
+        
+        Args:
+            task (Future): Задача пула исполнителей
+            response (Future): Future ответа, возвращенный клиенту
+            client_name (str): Идентификатор клиента
+            processing_time (float): Эмулированное время вычислений
+            cache_key (bytes): Ключ для сохранения результата в кэше
+            context (tuple): Операция, направление, матрица, время приема
+                запроса и признак отладочной выборки
+        """
+        operation, direction, matrix, started, trace = context
+        try:
+            result = task.result()
+        except OperationCancelledError as e:
+            status, reply = self._cancelled(e)
+            level = logging.INFO if status == 'cancelled' else logging.WARNING
+            self._log_summary(level, client_name, operation, direction, matrix, status,
+                              started, processing_time, error=e)
+            self._respond(response, reply)
+            return
         except Exception as e:
-            # Обработка и логирование непредвиденных ошибок
             error_msg = f"Ошибка выполнения операции: {e}"
-            logging.error(f"Сервер {client_name}: {error_msg}")
-            logging.exception(f"Сервер {client_name}: детали исключения")  # Добавляет traceback
-            return {'error': error_msg}
+            self._log_summary(logging.ERROR, client_name, operation, direction, matrix, 'error',
+                              started, processing_time, error=error_msg, exc_info=e)
+            self._respond(response, {'error': error_msg})
+            return
+        
+        if cache_key is not None:
+            self.cache.put(cache_key, result)
+        
+        if trace:
+            logger.debug("Сервер %s: результат %r получен из пула", client_name, result)
+        self._log_summary(logging.INFO, client_name, operation, direction, matrix, 'ok',
+                          started, processing_time)
+        
+        self.console.print(f"{time.strftime('%H:%M:%S')} {client_name}: выполнен поворот матрицы")
+        
+        self._respond(response, {'result': result})
+    
+    def _cache_hit(self, client_name, result, operation, direction, started):
+        """
+        Учитывает запрос, обслуженный из кэша, и формирует ответ.
+        """
+        self._log_summary(logging.INFO, client_name, operation, direction, result, 'cached', started)
+        self.console.print(f"{time.strftime('%H:%M:%S')} {client_name}: выполнен поворот матрицы (из кэша)")
+        return {'result': result}
+    
+    @staticmethod
+    def _deadline(request):
+        """
+        Срок выполнения запроса по time.monotonic().
+        
+        Если заданы и 'deadline', и 'timeout', действует более ранний срок.
+        
+        Returns:
+            float: Срок или None, если запрос без срока
+        
+        Raises:
+            ValueError: Если срок задан не числом
+        """
+        deadlines = []
+        if request.get('deadline') is not None:
+            deadlines.append(float(request['deadline']))
+        if request.get('timeout') is not None:
+            deadlines.append(time.monotonic() + float(request['timeout']))
+        return min(deadlines, default=None)
+    
+    @staticmethod
+    def _validate(operation, matrix, direction):
+        """
+        Проверяет параметры запроса на поворот.
+        
+        Returns:
+            str: Сообщение об ошибке или None, если запрос корректен
+        """
+        if operation != 'rotate':
+            return f'Неподдерживаемая операция: {operation}'
+        if not matrix:
+            return "Матрица не предоставлена"
+        if direction not in ['clockwise', 'counterclockwise']:
+            return f"Неверное направление поворота: {direction}"
+        return None
+    
+    def _log_summary(self, level, client_name, operation, direction, matrix, status, started,
+                     delay=0.0, error='-', **kwargs):
+        """
+        Учитывает завершенный запрос в метриках и пишет одну итоговую запись.
+        
+        Сообщение форматируется лениво в потоке записи логов; в потоке
+        запроса вычисляются только время обработки и метрики.
+        
+        Args:
+            level (int): Уровень записи
+            client_name (str): Идентификатор клиента
+            operation (str): Операция запроса
+            direction (str): Направление поворота
+            matrix (Matrix): Матрица запроса (может отсутствовать)
+            status (str): Итог - ok, cached, rejected, overloaded, expired,
+                cancelled или error
+            started (float): Время приема запроса по time.perf_counter
+            delay (float): Эмулированное время вычислений
+            error: Текст ошибки или исключение
+            **kwargs: Параметры logger.log, например exc_info
+        """
+        elapsed = time.perf_counter() - started
+        self._requests.inc(1, operation, status)
+        self._latency.observe(elapsed, operation)
+        if status in SUCCESS_STATUSES:
+            self._bytes.inc(matrix.nbytes)
+        
+        if not logger.isEnabledFor(level):
+            return
+        if isinstance(matrix, Matrix):
+            rows, cols, dtype = matrix.rows, matrix.cols, matrix.dtype
+        else:
+            rows, cols, dtype = 0, 0, '-'
+        logger.log(level, SUMMARY_FORMAT, client_name, operation, direction, rows, cols, dtype, status,
+                   delay, elapsed * 1000, error, **kwargs)
+    
+    @staticmethod
+    def _completed(response):
+        """Возвращает уже завершенный Future с заданным ответом."""
+        future = Future()
+        future.set_result(response)
+        return future
+    
+    @staticmethod
+    def _respond(response, reply):
+        """Передает ответ в Future, если клиент не отменил ожидание."""
+        try:
+            response.set_result(reply)
+        except InvalidStateError:
+            pass
 
 
-# Глобальный экземпляр сервера
-server_instance = MatrixServer()
\ No newline at end of file
+# Общий экземпляр сервера; создается при первом обращении, поэтому процессы
+# шардов и пула, импортирующие модуль, не запускают собственный сервер
+_server_instance = None
+_server_instance_lock = threading.Lock()
+
+
+def get_server_instance():
+    """
+    Возвращает общий экземпляр сервера, создавая его при первом вызове.
+    
+    Returns:
+        MatrixServer: Сервер с параметрами по умолчанию
+    """
+    global _server_instance
+    with _server_instance_lock:
+        if _server_instance is None:
+            _server_instance = MatrixServer()
+        return _server_instance
@@ -0,0 +1,87 @@
+"""
+Модуль асинхронного логирования сервера.
+
+Потоки, обрабатывающие запросы, не пишут в файл сами: обработчик
+QueueHandler лишь кладет запись в очередь в памяти, а форматирование и
+запись в server.log выполняет отдельный поток QueueListener. Поэтому
+дисковый ввод-вывод логирования никогда не блокирует обработку запросов.
+
+Записи передаются в очередь без предварительного форматирования:
+сообщения с аргументами в стиле % форматируются только в потоке записи.
+"""
+
+import atexit
+import logging
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+# Единственный на процесс поток записи логов
+_listener = None
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler, который не форматирует запись в вызывающем потоке.
+
+    Стандартный QueueHandler.prepare форматирует сообщение до постановки
+    в очередь, чтобы запись можно было передать в другой процесс. Очередь
+    здесь работает в пределах процесса, поэтому запись передается как есть,
+    а форматирование выполняет поток записи.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class DebugSampler:
+    """
+    Выборка запросов, для которых пишутся пошаговые отладочные записи.
+
+    Attributes:
+        rate (float): Доля запросов с отладочными записями (от 0 до 1)
+    """
+
+    def __init__(self, logger, rate=0.0):
+        self.rate = rate
+        if rate > 0 and not logger.isEnabledFor(logging.DEBUG):
+            logger.setLevel(logging.DEBUG)
+
+    def sample(self):
+        """Решает, писать ли отладочные записи для очередного запроса."""
+        return self.rate > 0 and (self.rate >= 1 or random.random() < self.rate)
+
+
+def setup_logging(filename, level=logging.INFO):
+    """
+    Подключает корневой логгер к файлу через очередь и поток записи.
+
+    Повторные вызовы не создают новых потоков и обработчиков.
+
+    Args:
+        filename (str): Путь к файлу журнала
+        level (int): Уровень корневого логгера
+
+    Returns:
+        QueueListener: Поток записи логов
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    file_handler = logging.FileHandler(filename, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    records = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.addHandler(DeferredQueueHandler(records))
+    root.setLevel(level)
+
+    _listener = QueueListener(records, file_handler, respect_handler_level=True)
+    _listener.start()
+    # При выходе поток записи дописывает очередь в файл
+    atexit.register(_listener.stop)
+    return _listener
@@ -0,0 +1,335 @@
+"""
+Модуль многопроцессного сервера матричных операций с шардированием.
+
+Фронт ShardedMatrixServer запускает K процессов-шардов, в каждом из
+которых работает собственный MatrixServer со своим пулом, кэшем и
+очередью. Поэтому шарды не делят GIL, и пропускная способность поворотов
+растет с количеством ядер.
+
+Запрос направляется в шард по консистентному хэшу имени клиента
+(модуль hash_ring): все запросы клиента попадают в один шард, где
+остаются его кэш результатов и место в честной очереди. Если процесс
+шарда завершается, шард убирается с кольца, его клиенты переходят к
+соседним шардам, а запросы, оставшиеся без ответа, отправляются повторно.
+
+Шарды можно закрепить за ядрами процессора (только Linux,
+os.sched_setaffinity). Метрики всех шардов объединяются в один снимок.
+
+Используемые модули:
+    multiprocessing - процессы шардов и очереди сообщений
+    hash_ring - консистентное хэширование имен клиентов
+    server - MatrixServer, работающий в каждом шарде
+"""
+
+import atexit
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future
+from multiprocessing.connection import wait
+from hash_ring import HashRing
+from metrics import merge_snapshots
+from server import MatrixServer, SUCCESS_STATUSES
+from server_logging import setup_logging
+
+
+logger = logging.getLogger(__name__)
+
+# Шарды запускаются методом spawn: дочерний процесс не наследует потоки фронта
+CONTEXT = multiprocessing.get_context('spawn')
+
+# Виды сообщений фронта к шарду
+MSG_REQUEST = 'request'
+MSG_METRICS = 'metrics'
+
+
+def _shard_main(index, requests, responses, options, cpu):
+    """
+    Главная функция процесса шарда.
+    
+    Читает сообщения фронта из очереди requests и передает запросы
+    в MatrixServer; ответы с идентификатором запроса кладутся в общую
+    очередь responses. Сообщение None останавливает шард.
+    
+    Args:
+        index (int): Номер шарда
+        requests (multiprocessing.Queue): Очередь сообщений шарда
+        responses (multiprocessing.Queue): Общая очередь ответов
+        options (dict): Параметры MatrixServer
+        cpu (int): Ядро, за которым закрепляется процесс, или None
+    """
+    if cpu is not None:
+        os.sched_setaffinity(0, {cpu})
+    server = MatrixServer(**options)
+    logger.info("Шард %d запущен (pid %d, ядро %s)", index, os.getpid(), cpu)
+    
+    def reply(request_id, done):
+        try:
+            responses.put((request_id, done.result()))
+        except Exception as e:
+            responses.put((request_id, {'error': f"Ошибка выполнения операции: {e}"}))
+    
+    while True:
+        message = requests.get()
+        if message is None:
+            break
+        kind, request_id, payload = message
+        if kind == MSG_METRICS:
+            responses.put((request_id, server.metrics.snapshot()))
+            continue
+        request, client_name = payload
+        server.submit(request, client_name).add_done_callback(
+            lambda done, request_id=request_id: reply(request_id, done))
+    
+    server.shutdown()
+
+
+class Shard:
+    """
+    Процесс шарда, видимый со стороны фронта.
+    
+    Attributes:
+        index (int): Номер шарда
+        process (multiprocessing.Process): Процесс шарда
+        requests (multiprocessing.Queue): Очередь сообщений шарда
+        cpu (int): Ядро, за которым закреплен процесс, или None
+    """
+    
+    def __init__(self, index, responses, options, cpu=None):
+        self.index = index
+        self.cpu = cpu
+        self.requests = CONTEXT.Queue()
+        self.process = CONTEXT.Process(target=_shard_main, name=f"MatrixShard-{index}",
+                                       args=(index, self.requests, responses, options, cpu))
+    
+    def __repr__(self):
+        return f"Shard({self.index}, pid={self.process.pid})"
+
+
+class ShardedMatrixServer:
+    """
+    Фронт, распределяющий запросы по процессам-шардам.
+    
+    Интерфейс совпадает с MatrixServer: submit возвращает Future ответа,
+    process_request ожидает ответ.
+    
+    Attributes:
+        shards (list): Все запущенные шарды
+        ring (HashRing): Кольцо живых шардов
+        lock (threading.Lock): Блокировка таблицы ожидающих ответов и кольца
+    """
+    
+    def __init__(self, shards=None, pin_cpus=False, replicas=64, **options):
+        """
+        Запускает процессы шардов и потоки фронта.
+        
+        Args:
+            shards (int): Количество шардов (по умолчанию - число доступных ядер)
+            pin_cpus (bool): Закрепить шарды за ядрами (только Linux)
+            replicas (int): Количество виртуальных точек шарда на кольце
+            **options: Параметры MatrixServer каждого шарда
+        """
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else None
+        count = shards or (len(cpus) if cpus else os.cpu_count() or 1)
+        if pin_cpus and cpus is None:
+            logger.warning("Закрепление шардов за ядрами не поддерживается на этой платформе")
+            pin_cpus = False
+        
+        setup_logging("Practice 19-20/server.log")
+        self.lock = threading.Lock()
+        self._ids = itertools.count()
+        self._pending = {}
+        self._responses = CONTEXT.Queue()
+        self.shards = [Shard(index, self._responses, options, cpus[index % len(cpus)] if pin_cpus else None)
+                       for index in range(count)]
+        for shard in self.shards:
+            shard.process.start()
+        self.ring = HashRing((shard.index for shard in self.shards), replicas)
+        
+        self._stopping = False
+        self._reader = threading.Thread(target=self._read_responses, name="ShardResponseReader", daemon=True)
+        self._reader.start()
+        self._monitor = threading.Thread(target=self._watch_shards, name="ShardMonitor", daemon=True)
+        self._monitor.start()
+        # Шарды не демонические (иначе они не смогут запускать пул процессов),
+        # поэтому при выходе без явного shutdown они останавливаются здесь
+        atexit.register(self.shutdown)
+        logger.info("Шардированный сервер запущен: %d шардов, закрепление за ядрами: %s", count, pin_cpus)
+    
+    def shard_for(self, client_name):
+        """Возвращает шард, обслуживающий клиента, или None, если живых шардов нет."""
+        index = self.ring.get(client_name)
+        return None if index is None else self.shards[index]
+    
+    def submit(self, request, client_name=None):
+        """
+        Направляет запрос в шард клиента.
+        
+        Args:
+            request (dict): Запрос в формате MatrixServer.process_request
+            client_name (str): Идентификатор клиента
+                (по умолчанию берется из request['client_name'])
+        
+        Returns:
+            Future: Будущий ответ - {'result': Matrix} или {'error': str}
+        """
+        client_name = client_name or request.get('client_name')
+        future = Future()
+        self._send(next(self._ids), client_name, (MSG_REQUEST, (request, client_name)), future)
+        return future
+    
+    def process_request(self, request, client_name=None):
+        """Обрабатывает запрос и ожидает ответ шарда."""
+        return self.submit(request, client_name).result()
+    
+    def snapshot(self, timeout=5.0):
+        """
+        Собирает метрики живых шардов в один снимок.
+        
+        Returns:
+            dict: Объединенный снимок в формате MetricsRegistry.snapshot()
+        """
+        futures = []
+        for index in sorted(self.ring.nodes):
+            future = Future()
+            self._send(next(self._ids), None, (MSG_METRICS, None), future, self.shards[index])
+            futures.append(future)
+        return merge_snapshots([snapshot for snapshot in (future.result(timeout) for future in futures)
+                                if snapshot is not None])
+    
+    @property
+    def requests_processed(self):
+        """Количество успешно обработанных запросов во всех живых шардах."""
+        requests = self.snapshot().get('matrix_requests_total', {'values': {}})['values']
+        return sum(count for (_, status), count in requests.items() if status in SUCCESS_STATUSES)
+    
+    def shutdown(self, timeout=10.0):
+        """
+        Останавливает шарды и потоки фронта.
+        
+        Запросы, оставшиеся без ответа, завершаются ошибкой. Повторный
+        вызов ничего не делает.
+        """
+        with self.lock:
+            if self._stopping:
+                return
+            self._stopping = True
+        atexit.unregister(self.shutdown)
+        for shard in self.shards:
+            if shard.process.is_alive():
+                shard.requests.put(None)
+        for shard in self.shards:
+            shard.process.join(timeout)
+            if shard.process.is_alive():
+                shard.process.terminate()
+        self._responses.put(None)
+        self._reader.join()
+        self._monitor.join()
+        
+        with self.lock:
+            pending, self._pending = self._pending, {}
+        for _, _, _, future in pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError("Сервер остановлен"))
+        logger.info("Шардированный сервер остановлен")
+    
+    def _send(self, request_id, client_name, message, future, shard=None):
+        """
+        Запоминает ожидающий ответ и отправляет сообщение шарду.
+        
+        Args:
+            request_id (int): Идентификатор сообщения
+            client_name (str): Клиент, по которому выбирается шард
+            message (tuple): (вид сообщения, данные)
+            future (Future): Будущий ответ
+            shard (Shard): Шард-получатель (по умолчанию - шард клиента)
+        """
+        kind, payload = message
+        with self.lock:
+            if shard is None:
+                shard = self.shard_for(client_name)
+            if shard is None or self._stopping:
+                future.set_result({'error': "Нет доступных шардов"})
+                return
+            self._pending[request_id] = (shard.index, client_name, message, future)
+        shard.requests.put((kind, request_id, payload))
+    
+    def _read_responses(self):
+        """Поток фронта, сопоставляющий ответы шардов с ожидающими Future."""
+        while True:
+            item = self._responses.get()
+            if item is None:
+                break
+            request_id, response = item
+            with self.lock:
+                entry = self._pending.pop(request_id, None)
+            # Ответ мог прийти повторно после перезапуска запроса в другом шарде
+            if entry is not None and not entry[3].done():
+                entry[3].set_result(response)
+    
+    def _watch_shards(self):
+        """Поток фронта, обнаруживающий завершение процессов шардов."""
+        alive = {shard.process.sentinel: shard for shard in self.shards}
+        while alive:
+            for sentinel in wait(list(alive), timeout=0.5):
+                self._shard_failed(alive.pop(sentinel))
+            with self.lock:
+                if self._stopping:
+                    return
+    
+    def _shard_failed(self, shard):
+        """
+        Убирает завершившийся шард с кольца и перезапускает его запросы.
+        
+        Клиенты шарда переходят к соседним шардам по кольцу; ответ на
+        запрос метрик от завершившегося шарда считается пустым.
+        """
+        with self.lock:
+            if self._stopping:
+                return
+            self.ring.remove(shard.index)
+            orphaned = [(request_id, entry) for request_id, entry in self._pending.items()
+                        if entry[0] == shard.index]
+            for request_id, _ in orphaned:
+                del self._pending[request_id]
+        
+        logger.warning("Шард %d завершился (код %s), запросов для повторной отправки: %d",
+                       shard.index, shard.process.exitcode, len(orphaned))
+        for request_id, (_, client_name, message, future) in orphaned:
+            if message[0] == MSG_METRICS:
+                future.set_result(None)
+            else:
+                self._send(request_id, client_name, message, future)
+
+
+def main():
+    """Демонстрация шардированного сервера и перехода клиентов при отказе шарда."""
+    from matrix_generate import generate_matrix
+    
+    server = ShardedMatrixServer(shards=4, processing_delay=(0.05, 0.1))
+    clients = [f"Клиент{index + 1}" for index in range(12)]
+    try:
+        before = {client: server.shard_for(client).index for client in clients}
+        futures = [server.submit({'operation': 'rotate', 'matrix': generate_matrix(64, 64),
+                                  'direction': 'clockwise'}, client)
+                   for client in clients for _ in range(5)]
+        print(f"Ответов без ошибок: {sum('result' in future.result() for future in futures)} из {len(futures)}")
+        print(f"Распределение клиентов по шардам: {before}")
+        
+        failed = server.shards[before[clients[0]]]
+        failed.process.terminate()
+        failed.process.join()
+        response = server.process_request({'operation': 'rotate', 'matrix': [[1, 2], [3, 4]],
+                                           'direction': 'clockwise'}, clients[0])
+        after = {client: server.shard_for(client).index for client in clients}
+        moved = [client for client in clients if before[client] != after[client]]
+        print(f"Шард {failed.index} остановлен; перешли к другим шардам: {moved}; ответ: {response}")
+        print(f"Обработано запросов живыми шардами: {server.requests_processed}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Модуль передачи матриц между процессами через разделяемую память.
+
+При работе с пулом процессов матрица запроса и результат обычно
+сериализуются pickle при каждой передаче. Для больших матриц это дороже
+самого поворота. Здесь матрица один раз записывается в именованный
+сегмент multiprocessing.shared_memory, рабочий процесс поворачивает ее
+прямо из этого сегмента во второй сегмент, а через очередь пула
+передаются только дескрипторы SharedMatrix (имя сегмента, размеры и тип).
+
+Сегментами владеет пул SharedMemoryPool в процессе сервера: он создает
+сегменты по классам размеров (степени двойки), переиспользует
+освобожденные и удаляет (unlink) лишние, а при закрытии - все оставшиеся.
+Рабочие процессы только подключаются к сегментам и держат кэш
+подключений, ограниченный суммарным объемом: подключение держит сегмент
+в памяти даже после его удаления пулом.
+"""
+
+import atexit
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from multiprocessing import resource_tracker, shared_memory
+from matrix import Matrix
+from matrix_operations import resolve_backend
+
+try:
+    import numpy as np
+except ImportError:  # NumPy - необязательная зависимость
+    np = None
+
+
+# Наименьший размер сегмента в байтах
+MIN_SEGMENT = 64 * 1024
+
+# Предельный объем сегментов, подключенных в одном рабочем процессе
+ATTACH_CACHE_BYTES = 64 * 1024 * 1024
+
+# Подключенные сегменты рабочего процесса: имя -> SharedMemory
+_attached = OrderedDict()
+_attached_bytes = 0
+
+
+class SharedMatrix:
+    """
+    Дескриптор матрицы в сегменте разделяемой памяти.
+    
+    Передается между процессами вместо самой матрицы.
+    
+    Attributes:
+        name (str): Имя сегмента
+        rows (int): Количество строк
+        cols (int): Количество столбцов
+        dtype (str): Код типа элементов array.array
+    """
+    
+    __slots__ = ('name', 'rows', 'cols', 'dtype')
+    
+    def __init__(self, name, rows, cols, dtype):
+        self.name = name
+        self.rows = rows
+        self.cols = cols
+        self.dtype = dtype
+    
+    @property
+    def nbytes(self):
+        return self.rows * self.cols * array(self.dtype).itemsize
+    
+    def __repr__(self):
+        return f"SharedMatrix({self.name!r}, rows={self.rows}, cols={self.cols}, dtype='{self.dtype}')"
+
+
+def _size_class(nbytes):
+    """Размер сегмента для nbytes байт: степень двойки не меньше MIN_SEGMENT."""
+    return max(MIN_SEGMENT, 1 << (nbytes - 1).bit_length())
+
+
+class SharedMemoryPool:
+    """
+    Пул именованных сегментов разделяемой памяти.
+    
+    Каждый сегмент, выданный acquire(), должен быть возвращен release().
+    Освобожденные сегменты остаются в пуле для следующих запросов, пока
+    их суммарный объем не превышает max_free_bytes; остальные удаляются.
+    
+    Attributes:
+        max_free_bytes (int): Предельный объем свободных сегментов в пуле
+        created (int): Количество созданных сегментов
+        reused (int): Количество выдач уже существующих сегментов
+        unlinked (int): Количество удаленных сегментов
+    """
+    
+    def __init__(self, max_free_bytes=256 * 1024 * 1024):
+        self.max_free_bytes = max_free_bytes
+        self.created = 0
+        self.reused = 0
+        self.unlinked = 0
+        self._free = {}
+        self._free_bytes = 0
+        self._in_use = {}
+        self._closed = False
+        self._lock = threading.Lock()
+        # Рабочие процессы, запущенные после пула, используют тот же трекер ресурсов
+        # и не удаляют сегменты пула при своем завершении
+        resource_tracker.ensure_running()
+        atexit.register(self.close)
+    
+    def acquire(self, nbytes):
+        """
+        Выдает сегмент не меньше nbytes байт.
+        
+        Returns:
+            SharedMemory: Сегмент, принадлежащий пулу
+        
+        Raises:
+            RuntimeError: Если пул закрыт
+        """
+        size = _size_class(nbytes)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Пул разделяемой памяти закрыт")
+            free = self._free.get(size)
+            if free:
+                segment = free.pop()
+                self._free_bytes -= size
+                self.reused += 1
+            else:
+                segment = shared_memory.SharedMemory(create=True, size=size)
+                self.created += 1
+            self._in_use[segment.name] = segment
+        return segment
+    
+    def release(self, segment):
+        """Возвращает сегмент в пул или удаляет его, если пул заполнен или закрыт."""
+        with self._lock:
+            self._in_use.pop(segment.name, None)
+            keep = not self._closed and self._free_bytes + segment.size <= self.max_free_bytes
+            if keep:
+                self._free.setdefault(segment.size, []).append(segment)
+                self._free_bytes += segment.size
+                return
+            self.unlinked += 1
+        segment.close()
+        segment.unlink()
+    
+    def put(self, matrix):
+        """
+        Копирует матрицу в сегмент пула.
+        
+        Returns:
+            tuple: (сегмент, дескриптор SharedMatrix)
+        """
+        matrix = Matrix.coerce(matrix)
+        source = memoryview(matrix.data).cast('B')
+        segment = self.acquire(len(source))
+        segment.buf[:len(source)] = source
+        return segment, SharedMatrix(segment.name, matrix.rows, matrix.cols, matrix.dtype)
+    
+    def close(self):
+        """
+        Удаляет все свободные сегменты; сегменты, выданные в работу,
+        удаляются при возврате.
+        """
+        with self._lock:
+            self._closed = True
+            segments = [segment for free in self._free.values() for segment in free]
+            self._free.clear()
+            self._free_bytes = 0
+            self.unlinked += len(segments)
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+    
+    def stats(self):
+        """
+        Возвращает снимок счетчиков пула.
+        
+        Returns:
+            dict: Количество созданных, переиспользованных, удаленных
+                и выданных в работу сегментов и объем свободных
+        """
+        with self._lock:
+            return {
+                'created': self.created,
+                'reused': self.reused,
+                'unlinked': self.unlinked,
+                'in_use': len(self._in_use),
+                'free_bytes': self._free_bytes,
+            }
+
+
+def read_matrix(segment, handle):
+    """Копирует матрицу из сегмента в новую Matrix."""
+    data = array(handle.dtype)
+    data.frombytes(segment.buf[:handle.nbytes])
+    return Matrix(handle.rows, handle.cols, handle.dtype, data)
+
+
+def _attach(name):
+    """Подключает сегмент в рабочем процессе, переиспользуя подключения."""
+    global _attached_bytes
+    segment = _attached.get(name)
+    if segment is not None:
+        _attached.move_to_end(name)
+        return segment
+    segment = _attached[name] = shared_memory.SharedMemory(name=name)
+    _attached_bytes += segment.size
+    return segment
+
+
+def _trim_attached():
+    """
+    Отключает давно не использованные сегменты сверх ATTACH_CACHE_BYTES.
+    
+    Вызывается после задачи, когда представления буферов уже освобождены;
+    сегмент больше всего предела отключается сразу после своей задачи.
+    """
+    global _attached_bytes
+    while _attached_bytes > ATTACH_CACHE_BYTES:
+        segment = _attached.popitem(last=False)[1]
+        _attached_bytes -= segment.size
+        segment.close()
+
+
+def _rotate_view(source, target, rows, cols, dtype, clockwise, backend):
+    """
+    Поворачивает матрицу из буфера source в буфер target.
+    
+    Бэкенд numpy работает с представлениями буферов без копий, бэкенд
+    python переносит столбцы срезами с шагом cols.
+    """
+    count = rows * cols
+    if backend == 'numpy':
+        src = np.frombuffer(source, dtype=dtype, count=count).reshape(rows, cols)
+        out = np.frombuffer(target, dtype=dtype, count=count).reshape(cols, rows)
+        np.copyto(out, np.rot90(src, k=-1 if clockwise else 1))
+        return
+    
+    # Исходный буфер копируется в array одним memcpy: срезы array с шагом
+    # быстрее срезов memoryview, а запись идет прямо в сегмент результата
+    itemsize = array(dtype).itemsize
+    data = array(dtype)
+    data.frombytes(source[:count * itemsize])
+    out = target[:count * itemsize].cast(dtype)
+    if clockwise:
+        last = (rows - 1) * cols
+        for j in range(cols):
+            out[j * rows:(j + 1) * rows] = data[last + j::-cols]
+    else:
+        for k, j in enumerate(range(cols - 1, -1, -1)):
+            out[k * rows:(k + 1) * rows] = data[j::cols]
+    out.release()
+
+
+def execute_shared(operation, source, target, direction, backend='auto', delay=0.0, cancel=None):
+    """
+    Выполняет операцию над матрицей в разделяемой памяти в рабочем процессе.
+    
+    Args:
+        operation (str): Название операции (поддерживается 'rotate')
+        source (SharedMatrix): Исходная матрица
+        target (str): Имя сегмента для результата
+        direction (str): Направление поворота
+        backend (str): Бэкенд поворота
+        delay (float): Эмулируемое время вычислений в секундах
+        cancel (CancelToken): Признак отмены; в рабочем процессе действует
+            только срок выполнения, который проверяется перед поворотом
+    
+    Returns:
+        SharedMatrix: Дескриптор результата в сегменте target
+    
+    Raises:
+        ValueError: Если операция или направление не поддерживаются
+        DeadlineExceededError: Если срок выполнения истек
+    """
+    if cancel is not None:
+        cancel.sleep(delay)
+    elif delay:
+        time.sleep(delay)  # I/O операция - GIL освобождается
+    
+    if operation != 'rotate':
+        raise ValueError(f"Неподдерживаемая операция: {operation}")
+    if direction not in ('clockwise', 'counterclockwise'):
+        raise ValueError("Некорректное направление поворота")
+    
+    backend = resolve_backend(backend)
+    try:
+        _rotate_view(_attach(source.name).buf, _attach(target).buf, source.rows, source.cols,
+                     source.dtype, direction == 'clockwise', backend)
+    finally:
+        _trim_attached()
+    return SharedMatrix(target, source.cols, source.rows, source.dtype)
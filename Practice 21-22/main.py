@@ -111,7 +111,8 @@ def print_matrix(matrix, title="Матрица"):
     Выводит матрицу в консоль с форматированием и заголовком.
     
     Args:
-        matrix: Матрица для вывода в виде списка списков элементов
+        matrix: Матрица для вывода (Matrix или список списков)
+            или ленивое представление RotatedView (строки читаются по одной)
         title: Заголовок, который будет отображен над матрицей
     """
     print(f"\n{title}:")
@@ -124,7 +125,7 @@ def handle_manual_input():
     Обрабатывает ручной ввод матрицы пользователем.
     
     Returns:
-        Введенная пользователем матрица в виде списка списков
+        Введенная пользователем матрица (Matrix)
         
     Side effects:
         - Запрашивает ввод у пользователя через консоль
@@ -151,7 +152,7 @@ def handle_generate_matrix():
     Обрабатывает генерацию случайной матрицы заданного размера.
     
     Returns:
-        Сгенерированная матрица заданного размера со случайными значениями
+        Сгенерированная матрица (Matrix) заданного размера со случайными значениями
         
     Raises:
         InvalidInputError: Если размеры матрицы не положительные числа
@@ -186,7 +187,7 @@ def handle_rotate_matrix(data):
         data: Исходная матрица для поворота
         
     Returns:
-        Повернутая матрица
+        Ленивое представление повернутой матрицы (RotatedView)
         
     Raises:
         InvalidInputError: Если направление поворота некорректно
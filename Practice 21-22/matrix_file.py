@@ -0,0 +1,184 @@
+"""
+Модуль двоичного файлового формата матриц.
+
+Формат файла:
+    Заголовок фиксированного размера (HEADER_SIZE байт, little-endian):
+        magic   - 4 байта b'MTRX'
+        version - 1 байт, версия формата
+        dtype   - 1 байт, код типа элементов array.array ('b', 'h', 'i', 'q', 'd')
+        rows    - 8 байт, количество строк
+        cols    - 8 байт, количество столбцов
+    Данные - элементы матрицы по строкам (row-major) в little-endian.
+
+Файл открывается через mmap, поэтому с ним можно работать, не загружая
+матрицу в оперативную память целиком: страницы подгружает операционная система.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+from matrix import Matrix
+
+
+MAGIC = b'MTRX'
+VERSION = 1
+HEADER = struct.Struct('<4sBc2xQQ')
+HEADER_SIZE = HEADER.size
+
+
+class MatrixFile:
+    """
+    Матрица в двоичном файле, отображенном в память через mmap.
+
+    Attributes:
+        path (str): Путь к файлу
+        rows (int): Количество строк
+        cols (int): Количество столбцов
+        dtype (str): Код типа элементов array.array
+        data (memoryview): Плоский буфер элементов поверх mmap
+    """
+
+    def __init__(self, path, file, rows, cols, dtype, writable):
+        self.path = path
+        self.rows = rows
+        self.cols = cols
+        self.dtype = dtype
+        self._file = file
+        access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+        self._mmap = mmap.mmap(file.fileno(), 0, access=access)
+        self._raw = memoryview(self._mmap)
+        self.data = self._raw[HEADER_SIZE:].cast(dtype)
+
+    @staticmethod
+    def _check_byteorder():
+        """Данные хранятся в little-endian и отображаются без преобразования."""
+        if sys.byteorder != 'little':
+            raise ValueError("Файловый формат матриц поддерживается только на little-endian платформах")
+
+    @classmethod
+    def create(cls, path, rows, cols, dtype='q'):
+        """
+        Создает файл матрицы заданного размера, заполненный нулями.
+
+        Args:
+            path: Путь к создаваемому файлу
+            rows: Количество строк
+            cols: Количество столбцов
+            dtype: Код типа элементов array.array
+
+        Returns:
+            MatrixFile, открытый на запись
+        """
+        cls._check_byteorder()
+        itemsize = array(dtype).itemsize
+        file = open(path, 'w+b')
+        file.write(HEADER.pack(MAGIC, VERSION, dtype.encode('ascii'), rows, cols))
+        file.truncate(HEADER_SIZE + rows * cols * itemsize)
+        file.flush()
+        return cls(path, file, rows, cols, dtype, writable=True)
+
+    @classmethod
+    def open(cls, path, writable=False):
+        """
+        Открывает существующий файл матрицы.
+
+        Raises:
+            ValueError: Если файл не является файлом матрицы или поврежден
+        """
+        cls._check_byteorder()
+        file = open(path, 'r+b' if writable else 'rb')
+        try:
+            header = file.read(HEADER_SIZE)
+            if len(header) != HEADER_SIZE:
+                raise ValueError(f"Файл {path} слишком короткий для заголовка матрицы")
+            magic, version, dtype, rows, cols = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Файл {path} не является файлом матрицы версии {VERSION}")
+            dtype = dtype.decode('ascii')
+            expected = HEADER_SIZE + rows * cols * array(dtype).itemsize
+            if os.fstat(file.fileno()).st_size != expected:
+                raise ValueError(f"Размер файла {path} не соответствует матрице {rows}x{cols}")
+            return cls(path, file, rows, cols, dtype, writable)
+        except Exception:
+            file.close()
+            raise
+
+    @property
+    def shape(self):
+        """Размеры матрицы в виде кортежа (строки, столбцы)."""
+        return self.rows, self.cols
+
+    def row(self, i):
+        """Возвращает строку i в виде memoryview без копирования."""
+        start = i * self.cols
+        return self.data[start:start + self.cols]
+
+    def as_matrix(self):
+        """
+        Возвращает Matrix поверх отображенного файла без копирования данных.
+
+        Matrix остается действительной, пока файл не закрыт.
+        """
+        return Matrix(self.rows, self.cols, self.dtype, self.data)
+
+    def to_matrix(self):
+        """Загружает матрицу из файла в оперативную память."""
+        data = array(self.dtype)
+        data.frombytes(self.data.cast('B'))
+        return Matrix(self.rows, self.cols, self.dtype, data)
+
+    def flush(self):
+        """Сбрасывает измененные страницы на диск."""
+        self._mmap.flush()
+
+    def close(self):
+        """
+        Освобождает отображение и закрывает файл.
+
+        Все memoryview и Matrix, полученные из файла, после этого недействительны.
+        """
+        if self._mmap.closed:
+            return
+        self.data.release()
+        self._raw.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return f"MatrixFile(path={self.path!r}, rows={self.rows}, cols={self.cols}, dtype='{self.dtype}')"
+
+
+def save_matrix(path, matrix):
+    """
+    Сохраняет матрицу в двоичный файл.
+
+    Args:
+        path: Путь к файлу
+        matrix: Матрица (Matrix или список списков)
+    """
+    matrix = Matrix.coerce(matrix)
+    with MatrixFile.create(path, matrix.rows, matrix.cols, matrix.dtype) as target:
+        if matrix.data:
+            target.data[:] = matrix.data
+        target.flush()
+    logging.info(f"Матрица {matrix.rows}x{matrix.cols} сохранена в файл {path}")
+
+
+def load_matrix_file(path):
+    """
+    Загружает матрицу из двоичного файла в оперативную память.
+
+    Returns:
+        Матрица (Matrix)
+    """
+    with MatrixFile.open(path) as source:
+        return source.to_matrix()
@@ -1,21 +1,100 @@
+import hashlib
 import random
 import logging
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from matrix import Matrix, fit_typecode
 
-def generate_matrix(n, m):
+try:
+    import numpy as np
+except ImportError:  # NumPy - необязательная зависимость
+    np = None
+
+
+# Количество элементов в одном блоке генерации по умолчанию
+CHUNK_CELLS = 1 << 20
+
+# Беззнаковые типы array для сырых случайных значений
+RAW_TYPECODES = ('B', 'H', 'I', 'Q')
+
+
+def _chunk_seed(seed, index):
+    """
+    Зерно независимого потока для блока строк, выведенное из общего seed.
+    """
+    digest = hashlib.blake2b(f"{seed}:{index}".encode(), digest_size=16).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def _generate_chunk(count, min_val, max_val, seed, dtype):
+    """
+    Генерация блока из count случайных значений за один вызов генератора.
+
+    Без NumPy случайные байты берутся через randbytes (getrandbits), а значения
+    вне равномерного диапазона отбрасываются; с NumPy используется Generator.integers.
+    """
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        values = rng.integers(min_val, max_val, size=count, dtype=np.dtype(dtype), endpoint=True)
+        return array(dtype, values.tobytes())
+
+    rng = random.Random(seed)
+    span = max_val - min_val + 1
+    raw_type = next((code for code in RAW_TYPECODES if span <= 1 << (array(code).itemsize * 8)), None)
+    if raw_type is None:
+        return array(dtype, (rng.randint(min_val, max_val) for _ in range(count)))
+
+    itemsize = array(raw_type).itemsize
+    limit = ((1 << (itemsize * 8)) // span) * span
+    values = array(dtype)
+    while len(values) < count:
+        raw = array(raw_type)
+        raw.frombytes(rng.randbytes((count - len(values)) * itemsize))
+        values.extend(value % span + min_val for value in raw if value < limit)
+    return values
+
+
+def generate_matrix(n, m, min_val=0, max_val=9, seed=None, workers=1, chunk_rows=None):
     """
     Генерация случайной матрицы с обработкой ошибок.
+
+    Матрица генерируется блоками строк; у каждого блока свой независимый
+    генератор, поэтому при workers > 1 блоки строятся параллельно в процессах,
+    а при заданном seed результат не зависит от числа процессов.
     """
     try:
         logging.info(f"Функция generate_matrix({n}, {m}) вызвана")
 
         if n <= 0 or m <= 0:
             raise ValueError("Размеры матрицы должны быть положительными")
+        if min_val > max_val:
+            raise ValueError("Минимальное значение больше максимального")
+
+        dtype = fit_typecode(min_val, max_val)
+        if seed is None:
+            seed = random.getrandbits(64)
+        if chunk_rows is None:
+            chunk_rows = max(1, CHUNK_CELLS // m)
+
+        tasks = [
+            (min(chunk_rows, n - start) * m, min_val, max_val, _chunk_seed(seed, index), dtype)
+            for index, start in enumerate(range(0, n, chunk_rows))
+        ]
+
+        data = array(dtype)
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for chunk in pool.map(_generate_chunk, *zip(*tasks)):
+                    data.extend(chunk)
+        else:
+            for task in tasks:
+                data.extend(_generate_chunk(*task))
 
-        matrix = [[random.randint(0, 9) for _ in range(m)] for _ in range(n)]
+        matrix = Matrix(n, m, dtype, data)
         logging.info("Функция generate_matrix() завершила генерацию")
         return matrix
 
     except Exception as e:
         logging.error(f"Ошибка в generate_matrix: {e}")
         print("Произошла ошибка при генерации матрицы. Попробуйте снова.")
-        return []
+        return Matrix(0, 0)
@@ -1,33 +1,120 @@
+import itertools
 import logging
+import sys
+from array import array
+from exceptions import InvalidInputError
+from matrix import Matrix, fit_typecode
+
+
+def parse_matrix(lines, rows=None, cols=None):
+    """
+    Разбор строк текста в матрицу за один проход.
+
+    Пустые строки пропускаются, а все ошибки собираются с номерами строк
+    и сообщаются одним исключением InvalidInputError после разбора.
+    """
+    data = array('q')
+    errors = []
+    row_count = 0
+
+    for line_number, line in enumerate(lines, 1):
+        values = line.split()
+        if not values:
+            continue
+        row_count += 1
+
+        if cols is None:
+            cols = len(values)
+        if len(values) != cols:
+            errors.append(f"строка {line_number}: ожидалось {cols} чисел, получено {len(values)}")
+            continue
+
+        try:
+            data.extend(map(int, values))
+        except (ValueError, OverflowError):
+            errors.append(f"строка {line_number}: ожидались целые числа через пробел")
+
+    if rows is not None and row_count != rows:
+        errors.append(f"ожидалось {rows} строк, получено {row_count}")
+    if row_count == 0 and not errors:
+        errors.append("матрица не содержит ни одной строки")
+
+    if errors:
+        raise InvalidInputError("Ошибка ввода матрицы: " + "; ".join(errors))
+
+    return _build_matrix(data, row_count, cols)
+
+
+def _build_matrix(data, rows, cols):
+    """Создание матрицы из буфера 'q' с сужением типа элементов по диапазону значений."""
+    dtype = fit_typecode(min(data), max(data))
+    if dtype != 'q':
+        data = array(dtype, data)
+    return Matrix(rows, cols, dtype, data)
+
+
+def load_matrix(stream, rows=None, cols=None):
+    """
+    Пакетная загрузка матрицы из потока (stdin или файла) без запросов input().
+
+    Без rows весь блок читается одним вызовом, а с rows - ровно rows непустых строк,
+    так что остаток потока (например, следующие команды меню) не затрагивается.
+    Блок разбирается за один проход.
+    """
+    logging.info("Функция load_matrix() вызвана")
+    if rows is None:
+        lines = stream.read()
+        lines = (lines.decode('utf-8') if isinstance(lines, bytes) else lines).splitlines()
+    else:
+        lines = [line.decode('utf-8') if isinstance(line, bytes) else line
+                 # Пустые строки (например, разделитель после размеров) не считаются строками матрицы
+                 for line in itertools.islice((line for line in stream if line.strip()), rows)]
+    matrix = parse_matrix(lines, rows, cols)
+    logging.info(f"Функция load_matrix() загрузила матрицу {matrix.rows}x{matrix.cols}")
+    return matrix
+
 
 def input_matrix():
     """
     Ручной ввод матрицы пользователем с обработкой ошибок.
+
+    При ошибке повторно запрашивается только некорректное значение,
+    без перезапуска всего ввода. Если стандартный ввод не терминал
+    (конвейер или файл), строки матрицы после размеров загружаются одним
+    блоком через load_matrix, а ошибка в них сообщается InvalidInputError.
     """
-    try:
-        logging.info("Функция input_matrix() вызвана")
-        n = int(input("Введите количество строк: "))
-        m = int(input("Введите количество столбцов: "))
+    logging.info("Функция input_matrix() вызвана")
+
+    while True:
+        try:
+            n = int(input("Введите количество строк: "))
+            m = int(input("Введите количество столбцов: "))
+
+            if n <= 0 or m <= 0:
+                raise ValueError("Размеры матрицы должны быть положительными числами")
+            break
+
+        except ValueError as e:
+            logging.error(f"Ошибка при вводе размеров матрицы: {e}")
+            print("Ошибка ввода! Попробуйте снова.")
 
-        if n <= 0 or m <= 0:
-            raise ValueError("Размеры матрицы должны быть положительными числами")
+    if not sys.stdin.isatty():
+        return load_matrix(sys.stdin, n, m)
 
-        matrix = []
-        for i in range(n):
+    data = array('q')
+    for i in range(n):
+        while True:
+            line = input(f"Введите {m} чисел через пробел для строки {i+1}: ")
             try:
-                row = list(map(int, input(f"Введите {m} чисел через пробел для строки {i+1}: ").split()))
-                if len(row) != m:
-                    raise ValueError("Количество элементов не совпадает с числом столбцов")
-                matrix.append(row)
-            except ValueError as e:
+                row = parse_matrix([line], 1, m)
+            except InvalidInputError as e:
                 logging.error(f"Ошибка ввода строки {i+1}: {e}")
                 print("Ошибка ввода! Повторите попытку.")
-                return input_matrix()  # повторный ввод
+                continue
 
-        logging.info("Функция input_matrix() завершила ввод матрицы")
-        return matrix
+            # Строка уже разобрана, поэтому ее элементы переносятся без повторного разбора
+            data.extend(row.data.tolist())
+            break
 
-    except ValueError as e:
-        logging.error(f"Ошибка при вводе размеров матрицы: {e}")
-        print("Ошибка ввода! Попробуйте снова.")
-        return input_matrix()
+    logging.info("Функция input_matrix() завершила ввод матрицы")
+    return _build_matrix(data, n, m)
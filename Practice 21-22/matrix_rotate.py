@@ -1,8 +1,304 @@
 import logging
+from array import array
+from matrix import Matrix
+from matrix_file import MatrixFile
 
-def rotate_matrix(matrix, direction):
+
+# Размер стороны плитки для блочных ядер поворота
+DEFAULT_TILE = 64
+
+
+class RotatedView:
+    """
+    Ленивое представление повернутой матрицы без копирования данных.
+
+    Хранит ссылку на исходную матрицу и количество поворотов на 90 градусов
+    по часовой стрелке, а обращения view[i][j] пересчитывает в индексы
+    исходной матрицы. Поворот поэтому выполняется за O(1), а полная копия
+    строится только при вызове materialize().
+
+    Attributes:
+        source: Исходная матрица (Matrix)
+        turns: Количество поворотов по часовой стрелке (от 0 до 3)
+    """
+
+    def __init__(self, source, turns=1):
+        # Поворот представления сводится к одному представлению над исходником
+        if isinstance(source, RotatedView):
+            turns += source.turns
+            source = source.source
+        self.source = Matrix.coerce(source)
+        self.turns = turns % 4
+
+    @property
+    def shape(self):
+        """Размеры представления в виде кортежа (строки, столбцы)."""
+        rows, cols = self.source.shape
+        if self.turns % 2:
+            return cols, rows
+        return rows, cols
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield RotatedRow(self, i)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [RotatedRow(self, i) for i in range(*index.indices(len(self)))]
+        if isinstance(index, tuple):
+            return self.element(*index)
+        return RotatedRow(self, self._normalize(index, len(self)))
+
+    def __eq__(self, other):
+        if isinstance(other, RotatedView):
+            return self.materialize() == other.materialize()
+        if isinstance(other, (Matrix, list)):
+            return self.materialize() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"RotatedView(shape={self.shape}, turns={self.turns})"
+
+    @staticmethod
+    def _normalize(index, size):
+        """Приводит отрицательный индекс к положительному и проверяет границы."""
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("Индекс вне границ матрицы")
+        return index
+
+    def element(self, i, j):
+        """
+        Возвращает элемент представления по индексам без построения строки.
+
+        Args:
+            i: Индекс строки в повернутой матрице
+            j: Индекс столбца в повернутой матрице
+        """
+        rows, cols = self.shape
+        i = self._normalize(i, rows)
+        j = self._normalize(j, cols)
+        src_rows, src_cols = self.source.shape
+
+        if self.turns == 0:
+            return self.source[i, j]
+        if self.turns == 1:
+            return self.source[src_rows - 1 - j, i]
+        if self.turns == 2:
+            return self.source[src_rows - 1 - i, src_cols - 1 - j]
+        return self.source[j, src_cols - 1 - i]
+
+    def row_array(self, i):
+        """
+        Строит одну строку представления срезом плоского буфера исходника.
+
+        Память выделяется только под эту строку, остальные строки не копируются.
+
+        Returns:
+            Строка в виде array.array
+        """
+        i = self._normalize(i, len(self))
+        src_rows, src_cols = self.source.shape
+        data = self.source.data
+
+        if self.turns == 0:
+            return self.source.row(i)
+        if self.turns == 1:
+            # Столбец i исходной матрицы снизу вверх
+            return data[(src_rows - 1) * src_cols + i::-src_cols]
+        if self.turns == 2:
+            return self.source.row(src_rows - 1 - i)[::-1]
+        # Столбец справа налево сверху вниз
+        return data[src_cols - 1 - i::src_cols]
+
+    def row_values(self, i):
+        """Возвращает строку i представления в виде списка."""
+        return self.row_array(i).tolist()
+
+    def materialize(self):
+        """
+        Строит полную копию повернутой матрицы.
+
+        Returns:
+            Новая матрица (Matrix)
+        """
+        rows, cols = self.shape
+        rotated = array(self.source.dtype)
+        for i in range(rows):
+            rotated.extend(self.row_array(i))
+        return Matrix(rows, cols, self.source.dtype, rotated)
+
+
+class RotatedRow:
+    """
+    Строка ленивого представления RotatedView.
+
+    Поддерживает индексацию, срезы, len и итерацию, а при выводе через print
+    выглядит так же, как обычный список.
+    """
+
+    def __init__(self, view, index):
+        self.view = view
+        self.index = index
+
+    def __len__(self):
+        return self.view.shape[1]
+
+    def __iter__(self):
+        return iter(self.view.row_values(self.index))
+
+    def __getitem__(self, j):
+        if isinstance(j, slice):
+            return self.view.row_values(self.index)[j]
+        return self.view.element(self.index, j)
+
+    def __eq__(self, other):
+        if isinstance(other, (RotatedRow, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(self.view.row_values(self.index))
+
+
+def _rotate_tiled(matrix, clockwise, tile=DEFAULT_TILE):
+    """
+    Блочный поворот прямоугольной матрицы в новый буфер.
+
+    Исходная матрица обходится плитками tile x tile; каждая плитка целиком
+    переносится в результат отрезками столбцов, поэтому чтение и запись
+    затрагивают ограниченный участок памяти.
+    """
+    rows, cols = matrix.shape
+    data = matrix.data
+    rotated = Matrix(cols, rows, matrix.dtype)
+    out = rotated.data
+
+    for i0 in range(0, rows, tile):
+        i1 = min(i0 + tile, rows)
+        for j0 in range(0, cols, tile):
+            j1 = min(j0 + tile, cols)
+            for j in range(j0, j1):
+                if clockwise:
+                    # Строка j результата: столбец j снизу вверх
+                    stop = (i0 - 1) * cols + j if i0 else None
+                    start = j * rows + rows - i1
+                    out[start:start + i1 - i0] = data[(i1 - 1) * cols + j:stop:-cols]
+                else:
+                    # Строка cols-1-j результата: столбец j сверху вниз
+                    start = (cols - 1 - j) * rows + i0
+                    out[start:start + i1 - i0] = data[i0 * cols + j:i1 * cols + j:cols]
+
+    return rotated
+
+
+def _rotate_inplace(matrix, clockwise, tile=DEFAULT_TILE):
+    """
+    Поворот квадратной матрицы на месте четверными перестановками.
+
+    Каждый элемент левой верхней четверти образует цикл из четырех позиций
+    (A - верх, B - лево, C - низ, D - право). Четверть обходится плитками,
+    и для каждой строки плитки цикл выполняется срезами буфера, так что
+    дополнительная память ограничена одной строкой плитки.
+    """
+    n = matrix.rows
+    data = matrix.data
+
+    for i0 in range(0, n // 2, tile):
+        i1 = min(i0 + tile, n // 2)
+        for j0 in range(0, (n + 1) // 2, tile):
+            j1 = min(j0 + tile, (n + 1) // 2)
+            for i in range(i0, i1):
+                top = slice(i * n + j0, i * n + j1)
+                left = slice((n - 1 - j0) * n + i, (n - 1 - j1) * n + i, -n)
+                bottom = slice((n - 1 - i) * n + n - 1 - j0, (n - 1 - i) * n + n - 1 - j1, -1)
+                right = slice(j0 * n + n - 1 - i, j1 * n + n - 1 - i, n)
+
+                saved = data[top]
+                if clockwise:
+                    data[top] = data[left]
+                    data[left] = data[bottom]
+                    data[bottom] = data[right]
+                    data[right] = saved
+                else:
+                    data[top] = data[right]
+                    data[right] = data[bottom]
+                    data[bottom] = data[left]
+                    data[left] = saved
+
+    return matrix
+
+
+def rotate_file(source_path, target_path, direction, tile=DEFAULT_TILE):
+    """
+    Потоковый блочный поворот матрицы из файла в файл.
+
+    Исходный и выходной файлы отображаются в память через mmap. Исходная
+    матрица читается плитками tile x tile, и каждая повернутая плитка сразу
+    записывается в выходной файл, поэтому в оперативной памяти одновременно
+    находится только одна плитка, а размер матрицы ограничен лишь диском.
+
+    Args:
+        source_path: Путь к файлу исходной матрицы
+        target_path: Путь к создаваемому файлу результата
+        direction: Направление поворота - 'clockwise' или 'counterclockwise'
+        tile: Размер стороны плитки
+
+    Returns:
+        Размеры повернутой матрицы в виде кортежа (строки, столбцы)
+
+    Raises:
+        ValueError: Если направление поворота некорректно или файл поврежден
+    """
+    if direction not in ("clockwise", "counterclockwise"):
+        raise ValueError("Некорректное направление поворота. Используйте 'clockwise' или 'counterclockwise'.")
+    clockwise = direction == "clockwise"
+    logging.info(f"Функция rotate_file({source_path}, {target_path}, direction={direction}) вызвана")
+
+    with MatrixFile.open(source_path) as source:
+        rows, cols = source.shape
+        with MatrixFile.create(target_path, cols, rows, source.dtype) as target:
+            src = source.data
+            out = target.data
+            for i0 in range(0, rows, tile):
+                i1 = min(i0 + tile, rows)
+                height = i1 - i0
+                for j0 in range(0, cols, tile):
+                    j1 = min(j0 + tile, cols)
+                    width = j1 - j0
+
+                    # Чтение плитки исходной матрицы в локальный буфер
+                    block = array(source.dtype)
+                    for i in range(i0, i1):
+                        block.frombytes(src[i * cols + j0:i * cols + j1].cast('B'))
+
+                    # Столбцы плитки становятся отрезками строк результата
+                    for k in range(width):
+                        if clockwise:
+                            start = (j0 + k) * rows + rows - i1
+                            out[start:start + height] = block[(height - 1) * width + k::-width]
+                        else:
+                            start = (cols - 1 - j0 - k) * rows + i0
+                            out[start:start + height] = block[k::width]
+            target.flush()
+
+    logging.info("Функция rotate_file() завершила выполнение")
+    return cols, rows
+
+
+def rotate_matrix(matrix, direction, inplace=False, tile=None):
     """
     Поворот матрицы с обработкой ошибок.
+
+    По умолчанию возвращает ленивое представление RotatedView: данные
+    не копируются, полную матрицу можно получить через materialize().
+    С inplace=True квадратная Matrix поворачивается на месте блочным ядром,
+    а с заданным tile прямоугольная матрица поворачивается в новую Matrix
+    плитками tile x tile.
     """
     try:
         logging.info(f"Функция rotate_matrix(direction={direction}) вызвана")
@@ -10,12 +306,18 @@ def rotate_matrix(matrix, direction):
         if not matrix:
             raise ValueError("Матрица пуста — нечего поворачивать")
 
-        if direction == "clockwise":
-            rotated = [list(row) for row in zip(*matrix[::-1])]
-        elif direction == "counterclockwise":
-            rotated = [list(row) for row in zip(*matrix)][::-1]
-        else:
+        if direction not in ("clockwise", "counterclockwise"):
             raise ValueError("Некорректное направление поворота. Используйте 'clockwise' или 'counterclockwise'.")
+        clockwise = direction == "clockwise"
+
+        if inplace:
+            if not isinstance(matrix, Matrix) or matrix.rows != matrix.cols:
+                raise ValueError("Поворот на месте возможен только для квадратной матрицы Matrix")
+            rotated = _rotate_inplace(matrix, clockwise, tile or DEFAULT_TILE)
+        elif tile is not None:
+            rotated = _rotate_tiled(Matrix.coerce(matrix), clockwise, tile)
+        else:
+            rotated = RotatedView(matrix, 1 if clockwise else 3)
 
         logging.info("Функция rotate_matrix() завершила выполнение")
         return rotated
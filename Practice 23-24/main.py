@@ -44,7 +44,8 @@ def print_matrix(matrix, title="Матрица"):
     Выводит матрицу в консоль с форматированием и заголовком.
     
     Args:
-        matrix: Матрица для вывода в виде списка списков
+        matrix: Матрица для вывода (Matrix или список списков)
+            или ленивое представление RotatedView (строки читаются по одной)
         title: Заголовок для отображения над матрицей
     """
     print(f"\n{title}:")
@@ -220,7 +221,7 @@ def state_has_result(data, result):
     
     Args:
         data: Текущая матрица
-        result: Результат последней операции
+        result: Результат последней операции (RotatedView над data, без копии)
     """
     logging.info("Состояние: HAS_RESULT")
     current_data = data
@@ -0,0 +1,190 @@
+"""
+Модуль компактного представления матрицы.
+
+Матрица хранится в одном плоском буфере array.array по строкам (row-major),
+поэтому каждый элемент занимает ровно itemsize байт, а строки лежат в памяти
+непрерывно. Для совместимости на входе принимаются и списки списков.
+
+Пример использования:
+    >>> m = Matrix.from_rows([[1, 2], [3, 4]])
+    >>> m.shape
+    (2, 2)
+    >>> m[1]
+    [3, 4]
+"""
+
+from array import array
+
+
+# Целочисленные типы array от самого компактного к самому широкому
+INT_TYPECODES = ('b', 'h', 'i', 'q')
+
+
+def fit_typecode(min_val, max_val):
+    """
+    Подбирает самый компактный целочисленный тип для диапазона значений.
+
+    Args:
+        min_val: Минимальное значение элемента
+        max_val: Максимальное значение элемента
+
+    Returns:
+        Код типа array.array ('b', 'h', 'i' или 'q')
+
+    Raises:
+        OverflowError: Если диапазон не помещается даже в 64 бита
+    """
+    for typecode in INT_TYPECODES:
+        bits = array(typecode).itemsize * 8
+        if -(1 << (bits - 1)) <= min_val and max_val < (1 << (bits - 1)):
+            return typecode
+    raise OverflowError("Значения матрицы не помещаются в 64-битное целое")
+
+
+class Matrix:
+    """
+    Матрица на основе одного плоского буфера array.array.
+
+    Attributes:
+        rows (int): Количество строк
+        cols (int): Количество столбцов
+        dtype (str): Код типа элементов array.array
+        data (array): Элементы матрицы по строкам, длина rows * cols
+    """
+
+    __slots__ = ('rows', 'cols', 'dtype', 'data')
+
+    def __init__(self, rows, cols, dtype='q', data=None):
+        """
+        Создает матрицу заданного размера.
+
+        Args:
+            rows: Количество строк
+            cols: Количество столбцов
+            dtype: Код типа элементов array.array
+            data: Готовый плоский буфер; если не указан, матрица заполняется нулями
+
+        Raises:
+            ValueError: Если длина буфера не совпадает с rows * cols
+        """
+        if data is None:
+            data = array(dtype, [0]) * (rows * cols)
+        if len(data) != rows * cols:
+            raise ValueError(f"Буфер из {len(data)} элементов не соответствует размеру {rows}x{cols}")
+        self.rows = rows
+        self.cols = cols
+        self.dtype = dtype
+        self.data = data
+
+    @classmethod
+    def from_rows(cls, rows, dtype=None):
+        """
+        Строит матрицу из списка списков.
+
+        Args:
+            rows: Строки матрицы
+            dtype: Код типа элементов; если не указан, подбирается
+                самый компактный по диапазону значений
+
+        Raises:
+            ValueError: Если строки имеют разную длину
+        """
+        rows = list(rows)
+        cols = len(rows[0]) if rows else 0
+        flat = array(dtype or 'q')
+        try:
+            for row in rows:
+                if len(row) != cols:
+                    raise ValueError("Все строки матрицы должны иметь одинаковую длину")
+                flat.extend(row)
+        except TypeError:
+            # Нецелые значения храним как числа с плавающей точкой
+            if dtype is not None:
+                raise
+            flat = array('d')
+            for row in rows:
+                flat.extend(row)
+
+        if dtype is None and flat.typecode == 'q' and flat:
+            typecode = fit_typecode(min(flat), max(flat))
+            if typecode != 'q':
+                flat = array(typecode, flat)
+        return cls(len(rows), cols, flat.typecode, flat)
+
+    @classmethod
+    def coerce(cls, matrix):
+        """
+        Приводит матрицу к типу Matrix, не копируя уже готовые матрицы.
+
+        Используется на границах модулей для совместимости со списками списков.
+        """
+        if isinstance(matrix, cls):
+            return matrix
+        return cls.from_rows(matrix)
+
+    @property
+    def shape(self):
+        """Размеры матрицы в виде кортежа (строки, столбцы)."""
+        return self.rows, self.cols
+
+    @property
+    def nbytes(self):
+        """Размер буфера с элементами в байтах."""
+        return len(self.data) * self.data.itemsize
+
+    def row(self, i):
+        """Возвращает строку i в виде среза буфера (array)."""
+        start = i * self.cols
+        return self.data[start:start + self.cols]
+
+    def tolist(self):
+        """Преобразует матрицу в список списков."""
+        return [self.row(i).tolist() for i in range(self.rows)]
+
+    def copy(self):
+        """Возвращает независимую копию матрицы."""
+        return Matrix(self.rows, self.cols, self.dtype, array(self.dtype, self.data))
+
+    def __len__(self):
+        return self.rows
+
+    def __iter__(self):
+        for i in range(self.rows):
+            yield self.row(i).tolist()
+
+    def _offset(self, i, j):
+        """Позиция элемента (i, j) в плоском буфере; отрицательные индексы отсчитываются с конца."""
+        if i < 0:
+            i += self.rows
+        if j < 0:
+            j += self.cols
+        if not (0 <= i < self.rows and 0 <= j < self.cols):
+            raise IndexError("Индекс элемента вне границ матрицы")
+        return i * self.cols + j
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            return self.data[self._offset(*index)]
+        if isinstance(index, slice):
+            return [self.row(i).tolist() for i in range(*index.indices(self.rows))]
+        if index < 0:
+            index += self.rows
+        if not 0 <= index < self.rows:
+            raise IndexError("Индекс строки вне границ матрицы")
+        return self.row(index).tolist()
+
+    def __setitem__(self, index, value):
+        self.data[self._offset(*index)] = value
+
+    def __eq__(self, other):
+        if isinstance(other, Matrix):
+            return self.shape == other.shape and self.data == other.data
+        if isinstance(other, list):
+            return self.tolist() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Matrix(rows={self.rows}, cols={self.cols}, dtype='{self.dtype}')"
+
+    def __reduce__(self):
+        return Matrix, (self.rows, self.cols, self.dtype, self.data)
@@ -1,4 +1,5 @@
 import random
+from array import array
 
 
 def main():
@@ -91,21 +92,107 @@ def random_input():
     min_val = int(input("Минимальное значение элемента: "))
     max_val = int(input("Максимальное значение элемента: "))
 
-    matrix = [[random.randint(min_val, max_val) for _ in range(cols)] for _ in range(rows)]
+    matrix = random_matrix(rows, cols, min_val, max_val)
 
     print("Сгенерирована матрица:")
     print_matrix(matrix)
     return matrix
 
+
+def random_matrix(rows, cols, min_val, max_val, seed=None):
+    """
+    Генерация случайной матрицы целыми строками вместо randint для каждого элемента.
+
+    Случайные байты для всей матрицы берутся одним вызовом randbytes
+    (на основе getrandbits), а значения, выходящие за равномерный диапазон,
+    отбрасываются и добираются следующим блоком.
+    """
+    if min_val > max_val:
+        raise ValueError("Минимальное значение больше максимального")
+
+    rng = random.Random(seed)
+    span = max_val - min_val + 1
+    raw_type = next((code for code in ('B', 'H', 'I', 'Q') if span <= 1 << (array(code).itemsize * 8)), None)
+    if raw_type is None:
+        return [[rng.randint(min_val, max_val) for _ in range(cols)] for _ in range(rows)]
+
+    itemsize = array(raw_type).itemsize
+    limit = ((1 << (itemsize * 8)) // span) * span
+    values = []
+    while len(values) < rows * cols:
+        raw = array(raw_type)
+        raw.frombytes(rng.randbytes((rows * cols - len(values)) * itemsize))
+        values.extend(value % span + min_val for value in raw if value < limit)
+
+    return [values[i * cols:(i + 1) * cols] for i in range(rows)]
+
 # Алгоритм обработки
+class PermutedMatrix:
+    """
+    Представление матрицы с переставленными строками и столбцами.
+
+    Хранит только ссылку на исходную матрицу и два вектора индексов,
+    строки собираются по одной при обращении, копия матрицы не создается.
+    """
+
+    def __init__(self, matrix, row_order, col_order):
+        self.matrix = matrix
+        self.row_order = row_order
+        self.col_order = col_order
+
+    def __len__(self):
+        return len(self.row_order)
+
+    def __getitem__(self, i):
+        row = self.matrix[self.row_order[i]]
+        return [row[j] for j in self.col_order]
+
+    def __iter__(self):
+        for i in range(len(self.row_order)):
+            yield self[i]
+
+    def tolist(self):
+        """
+        Возвращает матрицу в виде списка списков.
+        """
+        return list(self)
+
+
+def line_sums(matrix):
+    """
+    Вычисляет суммы всех строк и всех столбцов за один проход по матрице.
+    """
+    row_sums = []
+    col_sums = [0] * (len(matrix[0]) if matrix else 0)
+    for row in matrix:
+        row_sums.append(sum(row))
+        col_sums = [total + value for total, value in zip(col_sums, row)]
+    return row_sums, col_sums
+
+
+def argsort_desc(values):
+    """
+    Возвращает перестановку индексов, упорядочивающую значения по убыванию.
+    Равные значения сохраняют исходный порядок, как и у sorted(reverse=True).
+    """
+    return sorted(range(len(values)), key=values.__getitem__, reverse=True)
+
+
 def run_algorithm(matrix):
     """
     Выполняет два шага обработки матрицы:
     1. Сортировка строк по убыванию среднего арифметического.
     2. Сортировка столбцов по убыванию среднего арифметического.
+
+    Суммы строк и столбцов считаются один раз. Длина всех строк (и всех
+    столбцов) одинакова, поэтому сравнение средних равносильно сравнению
+    целых сумм. Перестановка строк не меняет суммы столбцов, так что оба
+    результата - это представления исходной матрицы с векторами индексов.
     """
-    result1 = sort_rows(matrix)
-    result2 = sort_columns(result1)
+    row_sums, col_sums = line_sums(matrix)
+    row_order = argsort_desc(row_sums)
+    result1 = PermutedMatrix(matrix, row_order, list(range(len(col_sums))))
+    result2 = PermutedMatrix(matrix, row_order, argsort_desc(col_sums))
     return result1, result2
 
 
@@ -113,27 +200,25 @@ def sort_rows(matrix):
     """
     Сортирует строки матрицы по убыванию среднего арифметического их элементов.
     """
-    return sorted(matrix, key=lambda row: sum(row) / len(row), reverse=True)
+    row_sums, col_sums = line_sums(matrix)
+    return PermutedMatrix(matrix, argsort_desc(row_sums), list(range(len(col_sums))))
 
 
 def sort_columns(matrix):
     """
     Сортирует столбцы матрицы по убыванию среднего арифметического их элементов.
 
-    Алгоритм:
-    1. Транспонируем матрицу (строки -> столбцы).
-    2. Сортируем столбцы по убыванию среднего значения.
-    3. Транспонируем обратно для получения исходного вида.
+    Столбцы не транспонируются: суммы столбцов сортируются как индексы,
+    и результат остается представлением над исходной матрицей.
     """
-    # транспонирование (строки → столбцы)
-    cols = [list(col) for col in zip(*matrix)]
-
-    # сортировка по среднему арифметическому каждого столбца
-    sorted_cols = sorted(cols, key=lambda col: sum(col) / len(col), reverse=True)
+    if isinstance(matrix, PermutedMatrix):
+        # Перестановка строк не влияет на суммы столбцов
+        _, col_sums = line_sums(matrix.matrix)
+        col_order = [matrix.col_order[j] for j in argsort_desc([col_sums[j] for j in matrix.col_order])]
+        return PermutedMatrix(matrix.matrix, matrix.row_order, col_order)
 
-    # обратное транспонирование
-    sorted_matrix = [list(row) for row in zip(*sorted_cols)]
-    return sorted_matrix
+    row_sums, col_sums = line_sums(matrix)
+    return PermutedMatrix(matrix, list(range(len(row_sums))), argsort_desc(col_sums))
 
 # Вывод результатов
 def print_result(result1, result2):
@@ -0,0 +1,285 @@
+"""
+Сравнительный бенчмарк всех реализаций поворота матрицы.
+
+Замеряет ядра поворота из Practice 19-20 (matrix_operations) и
+Practice 21-22 / 23-24 (matrix_rotate), а также исходные реализации
+(вложенные циклы и zip по спискам списков) как точку отсчета.
+
+Для каждого ядра и класса формы (квадратная, высокая, широкая, 1xN)
+выводится время на элемент в наносекундах (медиана, среднее, дисперсия)
+и пиковое потребление памяти по tracemalloc. Результаты можно сохранить
+в JSON, чтобы сравнивать прогоны между собой.
+
+Использование:
+    python benchmarks/bench_rotate.py --sizes 10 100 1000 --output bench.json
+    python benchmarks/bench_rotate.py --list
+"""
+
+import argparse
+import importlib
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Модули практик с одинаковыми именами, которые нельзя смешивать в sys.modules
+PRACTICE_MODULES = ('matrix', 'matrix_file', 'matrix_rotate', 'matrix_operations', 'exceptions')
+
+SHAPE_CLASSES = ('square', 'tall', 'wide', 'row')
+DEFAULT_SIZES = (10, 100, 1000)
+MAX_SIZE = 4000
+
+
+def load_practice_module(practice, name):
+    """
+    Импортирует модуль из папки практики, изолируя одноименные модули.
+
+    Args:
+        practice: Имя папки практики, например 'Practice 19-20'
+        name: Имя модуля внутри папки
+
+    Returns:
+        Загруженный модуль
+    """
+    path = str(ROOT / practice)
+    saved = {module: sys.modules.pop(module) for module in PRACTICE_MODULES if module in sys.modules}
+    sys.path.insert(0, path)
+    try:
+        return importlib.import_module(name)
+    finally:
+        sys.path.remove(path)
+        for module in PRACTICE_MODULES:
+            sys.modules.pop(module, None)
+        sys.modules.update(saved)
+
+
+def rotate_nested_loops(matrix, direction):
+    """Исходное ядро Practice 19-20: вложенные циклы с append по элементу."""
+    rows = len(matrix)
+    cols = len(matrix[0])
+    rotated = []
+    if direction == 'clockwise':
+        for j in range(cols):
+            new_row = []
+            for i in range(rows - 1, -1, -1):
+                new_row.append(matrix[i][j])
+            rotated.append(new_row)
+    else:
+        for j in range(cols - 1, -1, -1):
+            new_row = []
+            for i in range(rows):
+                new_row.append(matrix[i][j])
+            rotated.append(new_row)
+    return rotated
+
+
+def rotate_zip(matrix, direction):
+    """Исходное ядро Practice 21-22 / 23-24: zip по списку списков."""
+    if direction == 'clockwise':
+        return [list(row) for row in zip(*matrix[::-1])]
+    return [list(row) for row in zip(*matrix)][::-1]
+
+
+def build_kernels():
+    """
+    Собирает реестр ядер поворота.
+
+    Returns:
+        Словарь: имя ядра -> (подготовка входа, функция поворота, только квадратные)
+    """
+    operations = load_practice_module('Practice 19-20', 'matrix_operations')
+    rotate_21 = load_practice_module('Practice 21-22', 'matrix_rotate')
+    rotate_23 = load_practice_module('Practice 23-24', 'matrix_rotate')
+
+    def as_list(rows):
+        return rows
+
+    kernels = {
+        'baseline/nested-loops': (as_list, rotate_nested_loops, False),
+        'baseline/zip': (as_list, rotate_zip, False),
+        '19-20/python': (
+            operations.Matrix.from_rows,
+            lambda m, d: operations.rotate_matrix(m, d, backend='python'),
+            False,
+        ),
+        '19-20/tiled': (
+            operations.Matrix.from_rows,
+            lambda m, d: operations.rotate_matrix(m, d, tile=operations.DEFAULT_TILE),
+            False,
+        ),
+        '19-20/inplace': (
+            operations.Matrix.from_rows,
+            lambda m, d: operations.rotate_matrix(m, d, inplace=True),
+            True,
+        ),
+        '21-22/lazy-view': (
+            rotate_21.Matrix.from_rows,
+            lambda m, d: rotate_21.RotatedView(m, 1 if d == 'clockwise' else 3),
+            False,
+        ),
+        '21-22/materialize': (
+            rotate_21.Matrix.from_rows,
+            lambda m, d: rotate_21.RotatedView(m, 1 if d == 'clockwise' else 3).materialize(),
+            False,
+        ),
+        '23-24/materialize': (
+            rotate_23.Matrix.from_rows,
+            lambda m, d: rotate_23.RotatedView(m, 1 if d == 'clockwise' else 3).materialize(),
+            False,
+        ),
+        '23-24/tiled': (
+            rotate_23.Matrix.from_rows,
+            lambda m, d: rotate_23._rotate_tiled(m, d == 'clockwise', rotate_23.DEFAULT_TILE),
+            False,
+        ),
+    }
+    if 'numpy' in operations.available_backends():
+        kernels['19-20/numpy'] = (
+            operations.Matrix.from_rows,
+            lambda m, d: operations.rotate_matrix(m, d, backend='numpy'),
+            False,
+        )
+    return kernels
+
+
+def shape_for(shape_class, size):
+    """
+    Размеры матрицы класса формы с тем же числом элементов, что size x size.
+    """
+    if shape_class == 'square':
+        return size, size
+    if shape_class == 'tall':
+        return size * 4, max(1, size // 4)
+    if shape_class == 'wide':
+        return max(1, size // 4), size * 4
+    return 1, size * size
+
+
+def measure(prepare, kernel, rows, cols, direction, repeat, seed):
+    """
+    Замеряет одно ядро на одной форме.
+
+    Время измеряется без tracemalloc, пиковая память - отдельным прогоном.
+
+    Returns:
+        Словарь с метриками замера
+    """
+    rng = random.Random(seed)
+    source = [[rng.randint(-1000, 1000) for _ in range(cols)] for _ in range(rows)]
+    matrix = prepare(source)
+    elements = rows * cols
+
+    kernel(matrix, direction)  # прогрев
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        kernel(matrix, direction)
+        samples.append((time.perf_counter_ns() - start) / elements)
+
+    tracemalloc.start()
+    kernel(matrix, direction)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'rows': rows,
+        'cols': cols,
+        'elements': elements,
+        'repeat': repeat,
+        'ns_per_element_median': statistics.median(samples),
+        'ns_per_element_mean': statistics.fmean(samples),
+        'ns_per_element_min': min(samples),
+        'ns_per_element_variance': statistics.pvariance(samples),
+        'peak_bytes': peak,
+    }
+
+
+def print_table(results):
+    """Выводит результаты в виде таблицы."""
+    header = f"{'ядро':<22} {'форма':<7} {'размер':>11} {'нс/эл (мед)':>12} {'дисперсия':>11} {'пик, КБ':>10}"
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        size = f"{result['rows']}x{result['cols']}"
+        print(
+            f"{result['kernel']:<22} {result['shape']:<7} {size:>11} "
+            f"{result['ns_per_element_median']:>12.2f} {result['ns_per_element_variance']:>11.3f} "
+            f"{result['peak_bytes'] / 1024:>10.1f}"
+        )
+
+
+def parse_args(argv=None):
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(description="Бенчмарк реализаций поворота матрицы")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help=f"стороны эквивалентной квадратной матрицы (до {MAX_SIZE})")
+    parser.add_argument('--shapes', nargs='+', choices=SHAPE_CLASSES, default=list(SHAPE_CLASSES),
+                        help="классы форм матриц")
+    parser.add_argument('--kernels', nargs='+', help="имена ядер (по умолчанию все)")
+    parser.add_argument('--direction', choices=('clockwise', 'counterclockwise'), default='clockwise')
+    parser.add_argument('--repeat', type=int, default=5, help="количество замеров на точку")
+    parser.add_argument('--seed', type=int, default=0, help="зерно генератора входных матриц")
+    parser.add_argument('--output', help="путь к JSON-файлу с результатами")
+    parser.add_argument('--list', action='store_true', help="вывести доступные ядра и выйти")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Точка входа бенчмарка."""
+    args = parse_args(argv)
+    kernels = build_kernels()
+
+    if args.list:
+        for name in kernels:
+            print(name)
+        return
+
+    selected = args.kernels or list(kernels)
+    unknown = [name for name in selected if name not in kernels]
+    if unknown:
+        raise SystemExit(f"Неизвестные ядра: {', '.join(unknown)}")
+    if any(size < 1 or size > MAX_SIZE for size in args.sizes):
+        raise SystemExit(f"Размеры должны быть от 1 до {MAX_SIZE}")
+
+    results = []
+    for size in args.sizes:
+        for shape_class in args.shapes:
+            rows, cols = shape_for(shape_class, size)
+            for name in selected:
+                prepare, kernel, square_only = kernels[name]
+                if square_only and rows != cols:
+                    continue
+                result = measure(prepare, kernel, rows, cols, args.direction, args.repeat, args.seed)
+                result.update(kernel=name, shape=shape_class, size=size)
+                results.append(result)
+                print(f"{name} {shape_class} {rows}x{cols}: {result['ns_per_element_median']:.2f} нс/эл",
+                      file=sys.stderr)
+
+    print_table(results)
+
+    if args.output:
+        report = {
+            'meta': {
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'direction': args.direction,
+                'repeat': args.repeat,
+                'seed': args.seed,
+            },
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        print(f"\nРезультаты сохранены в {args.output}")
+
+
+if __name__ == "__main__":
+    main()